@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import threading
+
+from six.moves import socketserver
+from six.moves.BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from google.protobuf import message
+
+from pgoapi import proto_loader
+from pgoapi.utilities import get_time_ms
+
+import fixtures
+
+log = logging.getLogger(__name__)
+
+# Local stand-in for the RPC endpoint: takes a RequestEnvelope via HTTP POST and
+# answers with a ResponseEnvelope built from the synthesized fixtures. Can be run
+# standalone (python benchmarks/fake_server.py --port 8080) or started in
+# process, see load_test.py.
+#
+# Simulated server behaviour:
+#  - requests with an oauth token get an auth ticket, later requests must send
+#    a known, unexpired ticket or a token, otherwise status code 102 is returned
+#  - status code 52 (throttled) at random (throttle_rate) and if a client sends
+#    more than rate_limit requests per second
+#  - HTTP 403 at random (forbidden_rate)
+#  - latency + random jitter (in seconds) per request
+#  - with redirect, requests with an oauth token are answered with status code
+#    53 and the api_url /plfe/1 instead of sub responses, like the entry endpoint
+
+STATUS_OK = 1
+STATUS_THROTTLED = 52
+STATUS_REDIRECT = 53
+STATUS_INVALID_AUTH = 102
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class FakeServer:
+
+    def __init__(self, host = '127.0.0.1', port = 0, latency = 0.0, jitter = 0.0, throttle_rate = 0.0, forbidden_rate = 0.0,
+                 rate_limit = None, ticket_lifetime = 1800, seed = 0, cells = 21, pokemon_per_cell = 8, inventory_pokemon = 1000, redirect = False):
+        self.log = logging.getLogger(__name__)
+
+        self._host = host
+        self._port = port
+        self._latency = latency
+        self._jitter = jitter
+        self._throttle_rate = throttle_rate
+        self._forbidden_rate = forbidden_rate
+        self._rate_limit = rate_limit
+        self._ticket_lifetime_ms = int(ticket_lifetime * 1000)
+        self._redirect = redirect
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._server = None
+        self._thread = None
+
+        # ticket end -> (client, expire timestamp)
+        self._tickets = {}
+        # client -> (current second, number of requests in it)
+        self._rates = {}
+        self._stats = {'requests': 0, 'subrequests': 0, 'tickets_issued': 0, 'throttled': 0, 'forbidden': 0, 'invalid_auth': 0, 'bad_request': 0, 'redirects': 0}
+
+        self._responses = self._build_responses(seed, cells, pokemon_per_cell, inventory_pokemon)
+
+    def _build_responses(self, seed, cells, pokemon_per_cell, inventory_pokemon):
+        RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+        get_response_class = fixtures._get_response_class
+
+        responses = {
+            RequestType.Value('GET_MAP_OBJECTS'): fixtures.build_map_objects(seed, cells = cells, pokemon_per_cell = pokemon_per_cell)[1],
+            RequestType.Value('GET_INVENTORY'): fixtures.build_inventory(seed, pokemon = inventory_pokemon)[1],
+            RequestType.Value('DOWNLOAD_ITEM_TEMPLATES'): fixtures.build_item_templates(seed)[1],
+        }
+
+        player = get_response_class('GetPlayerResponse')()
+        player.success = True
+        player.player_data.creation_timestamp_ms = 1469000000000
+        player.player_data.username = 'FakeTrainer'
+        player.player_data.max_pokemon_storage = 250
+        player.player_data.max_item_storage = 350
+        responses[RequestType.Value('GET_PLAYER')] = player
+
+        settings = get_response_class('DownloadSettingsResponse')()
+        settings.hash = 'fakeserver{}'.format(seed)
+        responses[RequestType.Value('DOWNLOAD_SETTINGS')] = settings
+
+        for name in ('GET_HATCHED_EGGS', 'CHECK_AWARDED_BADGES'):
+            response = get_response_class(''.join(part.title() for part in name.split('_')) + 'Response')()
+            response.success = True
+            responses[RequestType.Value(name)] = response
+
+        # sub responses are static, serialize them once
+        return dict((request_type, response.SerializeToString()) for (request_type, response) in responses.items())
+
+    def start(self):
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                http_status, body = server.handle(self.rfile.read(length))
+                self.send_response(http_status)
+                self.send_header('Content-Type', 'application/x-protobuf')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self._host, self._port), RequestHandler)
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+        self.log.info('Fake RPC server listening on %s', self.get_url())
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def get_url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}/plfe/rpc'.format(host, port)
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _chance(self, rate):
+        if not rate:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    # returns (http status, response body)
+    def handle(self, data):
+        RequestEnvelope = proto_loader.get_message_class('POGOProtos.Networking.Envelopes.RequestEnvelope')
+        ResponseEnvelope = proto_loader.get_message_class('POGOProtos.Networking.Envelopes.ResponseEnvelope')
+
+        self._count('requests')
+
+        if self._latency or self._jitter:
+            with self._lock:
+                delay = self._latency + self._random.uniform(0, self._jitter)
+            time.sleep(delay)
+
+        if self._chance(self._forbidden_rate):
+            self._count('forbidden')
+            return 403, b''
+
+        request = RequestEnvelope()
+        try:
+            request.ParseFromString(data)
+        except message.DecodeError:
+            self._count('bad_request')
+            return 400, b''
+
+        response = ResponseEnvelope()
+        response.request_id = request.request_id
+        response.api_url = '{}:{}/plfe'.format(*self._server.server_address[:2]) if self._server else 'localhost/plfe'
+        if self._redirect:
+            response.api_url += '/1'
+
+        has_ticket = request.HasField('auth_ticket')
+        client = self._authenticate(request, response)
+        if client is None:
+            self._count('invalid_auth')
+            response.status_code = STATUS_INVALID_AUTH
+        elif self._redirect and not has_ticket:
+            self._count('redirects')
+            response.status_code = STATUS_REDIRECT
+        elif self._is_throttled(client) or self._chance(self._throttle_rate):
+            self._count('throttled')
+            response.status_code = STATUS_THROTTLED
+        else:
+            response.status_code = STATUS_OK
+            for subrequest in request.requests:
+                response.returns.append(self._responses.get(subrequest.request_type, b''))
+            with self._lock:
+                self._stats['subrequests'] += len(request.requests)
+
+        return 200, response.SerializeToString()
+
+    # returns the client key of a valid ticket or token and issues new tickets
+    def _authenticate(self, request, response):
+        now_ms = get_time_ms()
+
+        if request.HasField('auth_ticket'):
+            with self._lock:
+                client, expire = self._tickets.get(request.auth_ticket.end, (None, 0))
+            return client if expire > now_ms else None
+
+        token = request.auth_info.token.contents
+        if not token:
+            return None
+
+        with self._lock:
+            ticket_end = os.urandom(16)
+            expire = now_ms + self._ticket_lifetime_ms
+            self._tickets[ticket_end] = (token, expire)
+            self._stats['tickets_issued'] += 1
+
+        response.auth_ticket.start = os.urandom(16)
+        response.auth_ticket.end = ticket_end
+        response.auth_ticket.expire_timestamp_ms = expire
+        return token
+
+    def _is_throttled(self, client):
+        if not self._rate_limit:
+            return False
+
+        second = int(time.time())
+        with self._lock:
+            current, count = self._rates.get(client, (second, 0))
+            if current != second:
+                current, count = second, 0
+            count += 1
+            self._rates[client] = (current, count)
+        return count > self._rate_limit
+
+def get_argument_parser():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Pokemon Go RPC endpoint')
+    parser.add_argument("--host", help="Address to listen on", default='127.0.0.1')
+    parser.add_argument("--port", help="Port to listen on", type=int, default=8080)
+    add_server_arguments(parser)
+    return parser
+
+def add_server_arguments(parser):
+    parser.add_argument("--latency", help="Delay of every response in seconds", type=float, default=0.0)
+    parser.add_argument("--jitter", help="Random additional delay in seconds", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", help="Fraction of requests answered with status code 52", type=float, default=0.0)
+    parser.add_argument("--forbidden-rate", help="Fraction of requests answered with HTTP 403", type=float, default=0.0)
+    parser.add_argument("--rate-limit", help="Requests per second per client before status code 52 is returned", type=int)
+    parser.add_argument("--ticket-lifetime", help="Lifetime of issued auth tickets in seconds", type=float, default=1800)
+    parser.add_argument("--cells", help="Map cells in GET_MAP_OBJECTS responses", type=int, default=21)
+    parser.add_argument("--pokemon-per-cell", help="Pokemon per map cell in GET_MAP_OBJECTS responses", type=int, default=8)
+    parser.add_argument("--inventory-pokemon", help="Pokemon in GET_INVENTORY responses", type=int, default=1000)
+    parser.add_argument("--redirect", help="Redirect requests without auth ticket with status code 53", action='store_true')
+
+def create_server(args, host = '127.0.0.1', port = 0):
+    return FakeServer(host, port, latency=args.latency, jitter=args.jitter, throttle_rate=args.throttle_rate,
+                      forbidden_rate=args.forbidden_rate, rate_limit=args.rate_limit, ticket_lifetime=args.ticket_lifetime,
+                      cells=args.cells, pokemon_per_cell=args.pokemon_per_cell, inventory_pokemon=args.inventory_pokemon,
+                      redirect=args.redirect)
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(module)10s] [%(levelname)5s] %(message)s')
+
+    args = get_argument_parser().parse_args()
+    server = create_server(args, args.host, args.port).start()
+    try:
+        while True:
+            time.sleep(10)
+            log.info('Stats: %s', server.get_stats())
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import sys
+import random
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if repo_dir not in sys.path:
+    sys.path.insert(0, repo_dir)
+
+from pgoapi import proto_loader
+from pgoapi.utilities import f2i
+
+# Synthesized ResponseEnvelope fixtures with payload sizes as seen on a busy
+# map and a full account. Everything is generated from a fixed seed, so the
+# bytes are identical between runs and no network or account is needed.
+
+POSITION = (40.7589, -73.9851, 10.0)
+
+def _get_request_type(name):
+    return proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType').Value(name)
+
+def _get_response_class(name):
+    return proto_loader.get_class('POGOProtos.Networking.Responses_pb2.' + name)
+
+def _build_envelope(subresponses, request_id = 1):
+    ResponseEnvelope = proto_loader.get_message_class('POGOProtos.Networking.Envelopes.ResponseEnvelope')
+
+    envelope = ResponseEnvelope()
+    envelope.status_code = 1
+    envelope.request_id = request_id
+    envelope.api_url = 'pgorelease.nianticlabs.com/plfe/123'
+    for subresponse in subresponses:
+        envelope.returns.append(subresponse.SerializeToString())
+    return envelope.SerializeToString()
+
+def _cell_ids(rnd, count):
+    base = 9926595610352287744
+    return [base + rnd.randint(0, 2 ** 32) * 2 for i in range(count)]
+
+def _fill_pokemon_data(rnd, pokemon_data, pokemon_id):
+    pokemon_data.id = rnd.getrandbits(64)
+    pokemon_data.pokemon_id = pokemon_id
+    pokemon_data.cp = rnd.randint(10, 3000)
+    pokemon_data.stamina = pokemon_data.stamina_max = rnd.randint(10, 300)
+    pokemon_data.move_1 = rnd.randint(13, 140)
+    pokemon_data.move_2 = rnd.randint(13, 140)
+    pokemon_data.height_m = rnd.uniform(0.2, 3.0)
+    pokemon_data.weight_kg = rnd.uniform(1.0, 400.0)
+    pokemon_data.individual_attack = rnd.randint(0, 15)
+    pokemon_data.individual_defense = rnd.randint(0, 15)
+    pokemon_data.individual_stamina = rnd.randint(0, 15)
+    pokemon_data.cp_multiplier = rnd.uniform(0.09, 0.79)
+    pokemon_data.pokeball = rnd.randint(1, 3)
+    pokemon_data.captured_cell_id = _cell_ids(rnd, 1)[0]
+    pokemon_data.creation_time_ms = 1469000000000 + rnd.randint(0, 10 ** 9)
+
+# 21 cells (the usual get_cell_ids() radius) with forts, spawn points and
+# wild/catchable/nearby pokemon in every cell
+def build_map_objects(seed = 0, cells = 21, forts_per_cell = 6, spawns_per_cell = 25, pokemon_per_cell = 8):
+    rnd = random.Random(seed)
+    GetMapObjectsResponse = _get_response_class('GetMapObjectsResponse')
+
+    lat, lng = POSITION[0], POSITION[1]
+    response = GetMapObjectsResponse()
+    response.status = 1
+    cell_ids = _cell_ids(rnd, cells)
+    for cell_id in cell_ids:
+        cell = response.map_cells.add()
+        cell.s2_cell_id = cell_id
+        cell.current_timestamp_ms = 1470000000000
+
+        for i in range(forts_per_cell):
+            fort = cell.forts.add()
+            fort.id = '{:032x}.16'.format(rnd.getrandbits(128))
+            fort.last_modified_timestamp_ms = 1470000000000 - rnd.randint(0, 10 ** 7)
+            fort.latitude = lat + rnd.uniform(-0.01, 0.01)
+            fort.longitude = lng + rnd.uniform(-0.01, 0.01)
+            fort.enabled = True
+            if i % 3 == 0:
+                fort.owned_by_team = rnd.randint(1, 3)
+                fort.guard_pokemon_id = rnd.randint(1, 151)
+                fort.gym_points = rnd.randint(0, 50000)
+            else:
+                fort.type = 1
+                if i % 3 == 1:
+                    fort.lure_info.fort_id = fort.id
+                    fort.lure_info.encounter_id = rnd.getrandbits(64)
+                    fort.lure_info.active_pokemon_id = rnd.randint(1, 151)
+                    fort.lure_info.lure_expires_timestamp_ms = 1470001800000
+
+        for i in range(spawns_per_cell):
+            spawn_point = cell.spawn_points.add()
+            spawn_point.latitude = lat + rnd.uniform(-0.01, 0.01)
+            spawn_point.longitude = lng + rnd.uniform(-0.01, 0.01)
+
+        for i in range(pokemon_per_cell):
+            encounter_id = rnd.getrandbits(64)
+            spawn_point_id = '{:x}'.format(rnd.getrandbits(44))
+            pokemon_id = rnd.randint(1, 151)
+            latitude, longitude = lat + rnd.uniform(-0.01, 0.01), lng + rnd.uniform(-0.01, 0.01)
+
+            wild = cell.wild_pokemons.add()
+            wild.encounter_id = encounter_id
+            wild.last_modified_timestamp_ms = 1470000000000
+            wild.latitude, wild.longitude = latitude, longitude
+            wild.spawn_point_id = spawn_point_id
+            wild.pokemon_data.pokemon_id = pokemon_id
+            wild.time_till_hidden_ms = rnd.randint(0, 900000)
+
+            catchable = cell.catchable_pokemons.add()
+            catchable.spawn_point_id = spawn_point_id
+            catchable.encounter_id = encounter_id
+            catchable.pokemon_id = pokemon_id
+            catchable.expiration_timestamp_ms = 1470000900000
+            catchable.latitude, catchable.longitude = latitude, longitude
+
+            nearby = cell.nearby_pokemons.add()
+            nearby.pokemon_id = pokemon_id
+            nearby.distance_in_meters = rnd.uniform(0, 200)
+            nearby.encounter_id = encounter_id
+
+    subrequests = [{_get_request_type('GET_MAP_OBJECTS'): {
+        'latitude': f2i(lat),
+        'longitude': f2i(lng),
+        'since_timestamp_ms': [0] * cells,
+        'cell_id': cell_ids,
+    }}]
+    return subrequests, response
+
+def build_inventory(seed = 0, pokemon = 1000, items = 20, candies = 151):
+    rnd = random.Random(seed)
+    GetInventoryResponse = _get_response_class('GetInventoryResponse')
+
+    response = GetInventoryResponse()
+    response.success = True
+    delta = response.inventory_delta
+    delta.original_timestamp_ms = 1469000000000
+    delta.new_timestamp_ms = 1470000000000
+
+    for i in range(pokemon):
+        inventory_item = delta.inventory_items.add()
+        inventory_item.modified_timestamp_ms = 1470000000000
+        _fill_pokemon_data(rnd, inventory_item.inventory_item_data.pokemon_data, rnd.randint(1, 151))
+
+    for i in range(items):
+        item = delta.inventory_items.add().inventory_item_data.item
+        item.item_id = i + 1
+        item.count = rnd.randint(0, 100)
+
+    for i in range(candies):
+        candy = delta.inventory_items.add().inventory_item_data.candy
+        candy.family_id = i + 1
+        candy.candy = rnd.randint(0, 500)
+
+    subrequests = [{_get_request_type('GET_INVENTORY'): {'last_timestamp_ms': 0}}]
+    return subrequests, response
+
+def build_item_templates(seed = 0, pokemon = 151, moves = 120, items = 40):
+    rnd = random.Random(seed)
+    DownloadItemTemplatesResponse = _get_response_class('DownloadItemTemplatesResponse')
+
+    response = DownloadItemTemplatesResponse()
+    response.success = True
+    response.timestamp_ms = 1470000000000
+
+    for i in range(1, pokemon + 1):
+        template = response.item_templates.add()
+        template.template_id = 'V{:04d}_POKEMON_{}'.format(i, i)
+        settings = template.pokemon_settings
+        settings.pokemon_id = i
+        settings.model_scale = rnd.uniform(0.5, 2.0)
+        settings.type = rnd.randint(1, 18)
+        settings.stats.base_stamina = rnd.randint(20, 500)
+        settings.stats.base_attack = rnd.randint(20, 300)
+        settings.stats.base_defense = rnd.randint(20, 300)
+        settings.quick_moves.extend([rnd.randint(200, 240) for j in range(2)])
+        settings.cinematic_moves.extend([rnd.randint(13, 140) for j in range(3)])
+        settings.animation_time.extend([rnd.uniform(0.5, 2.0) for j in range(8)])
+        settings.pokedex_height_m = rnd.uniform(0.2, 3.0)
+        settings.pokedex_weight_kg = rnd.uniform(1.0, 400.0)
+        settings.family_id = i
+        settings.candy_to_evolve = rnd.choice([0, 12, 25, 50, 100])
+
+    for i in range(1, moves + 1):
+        template = response.item_templates.add()
+        template.template_id = 'V{:04d}_MOVE_{}'.format(i, i)
+        settings = template.move_settings
+        settings.movement_id = i
+        settings.pokemon_type = rnd.randint(1, 18)
+        settings.power = rnd.uniform(5, 120)
+        settings.accuracy_chance = 1.0
+        settings.vfx_name = 'move_{}'.format(i)
+        settings.duration_ms = rnd.randint(500, 5000)
+        settings.energy_delta = rnd.randint(-100, 20)
+
+    for i in range(1, items + 1):
+        template = response.item_templates.add()
+        template.template_id = 'ITEM_{}'.format(i)
+        template.item_settings.item_id = i
+        template.item_settings.item_type = rnd.randint(1, 10)
+        template.item_settings.drop_freq = rnd.uniform(0, 1)
+
+    template = response.item_templates.add()
+    template.template_id = 'PLAYER_LEVEL_SETTINGS'
+    template.player_level.rank_num.extend(range(1, 41))
+    template.player_level.required_experience.extend([i * 1000 for i in range(40)])
+    template.player_level.cp_multiplier.extend([0.094 + i * 0.017 for i in range(40)])
+
+    subrequests = [_get_request_type('DOWNLOAD_ITEM_TEMPLATES')]
+    return subrequests, response
+
+FIXTURES = [
+    ('GET_MAP_OBJECTS', build_map_objects),
+    ('GET_INVENTORY', build_inventory),
+    ('DOWNLOAD_ITEM_TEMPLATES', build_item_templates),
+]
+
+# {name: {'subrequests': [..], 'response': sub response proto, 'envelope': ResponseEnvelope bytes}}
+def load_fixtures(seed = 0):
+    fixtures = {}
+    for (name, builder) in FIXTURES:
+        subrequests, response = builder(seed)
+        fixtures[name] = {
+            'subrequests': subrequests,
+            'response': response,
+            'envelope': _build_envelope([response]),
+        }
+    return fixtures
+
+def _message_to_subrequest_args(msg):
+    args = {}
+    for (field, value) in msg.ListFields():
+        if field.label == field.LABEL_REPEATED:
+            args[field.name] = list(value)
+        elif field.message_type:
+            args[field.name] = dict((sub_field.name, sub_value) for (sub_field, sub_value) in value.ListFields())
+        else:
+            args[field.name] = value
+    return args
+
+# fixtures from a file written by pgoapi.capture.RpcCapture, keyed by
+# 'capture:' + request types, the last recorded RPC of each combination is used
+def load_capture_fixtures(filename):
+    from pgoapi.capture import read_capture
+    from pgoapi.utilities import to_camel_case
+
+    RequestEnvelope = proto_loader.get_message_class('POGOProtos.Networking.Envelopes.RequestEnvelope')
+    ResponseEnvelope = proto_loader.get_message_class('POGOProtos.Networking.Envelopes.ResponseEnvelope')
+    RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+
+    fixtures = {}
+    for record in read_capture(filename):
+        if record['metadata']['http_status'] != 200:
+            continue
+
+        request = RequestEnvelope.FromString(record['request'])
+        subrequests = []
+        for subrequest in request.requests:
+            if subrequest.request_message:
+                name = to_camel_case(RequestType.Name(subrequest.request_type).lower()) + 'Message'
+                msg = proto_loader.get_class('POGOProtos.Networking.Requests.Messages_pb2.' + name).FromString(subrequest.request_message)
+                subrequests.append({subrequest.request_type: _message_to_subrequest_args(msg)})
+            else:
+                subrequests.append(subrequest.request_type)
+
+        envelope = ResponseEnvelope.FromString(record['response'])
+        if not envelope.returns or not request.requests:
+            continue
+        name = to_camel_case(RequestType.Name(request.requests[0].request_type).lower()) + 'Response'
+        response = _get_response_class(name).FromString(envelope.returns[0])
+
+        fixtures['capture:' + ','.join(record['metadata']['request_types'])] = {
+            'subrequests': subrequests,
+            'response': response,
+            'envelope': record['response'],
+        }
+    return fixtures
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# every scenario runs in a fresh interpreter, the timing is taken inside it
+SCENARIOS = [
+    ('python only', ''),
+    ('import pgoapi', 'import pgoapi'),
+    ('import pgoapi + PGoApi()', 'import pgoapi; pgoapi.PGoApi()'),
+    # what "import pgoapi" used to load eagerly before the imports were deferred
+    ('import pgoapi + eager deps', 'import pgoapi, pkg_resources, requests, gpsoauth, geopy.geocoders, s2sphere; '
+                                   'pkg_resources.get_distribution("protobuf"); '
+                                   'import POGOProtos.Networking.Envelopes_pb2, POGOProtos.Networking.Responses_pb2'),
+]
+
+SNIPPET = '''
+import sys, time
+sys.path.insert(0, {repo_dir!r})
+start = time.time()
+{statement}
+sys.stdout.write(str(time.time() - start))
+'''
+
+def measure(statement, runs):
+    timings = []
+    for i in range(runs):
+        code = SNIPPET.format(repo_dir=repo_dir, statement=statement or 'pass')
+        output = subprocess.check_output([sys.executable, '-c', code])
+        timings.append(float(output.decode('utf-8').strip().splitlines()[-1]))
+    timings.sort()
+    return timings[len(timings) // 2], timings[0]
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the startup cost of importing pgoapi')
+    parser.add_argument("-n", "--runs", help="Number of interpreter starts per scenario", type=int, default=10)
+    args = parser.parse_args()
+
+    print('{:<30} {:>12} {:>12}'.format('scenario', 'median (ms)', 'best (ms)'))
+    for (name, statement) in SCENARIOS:
+        try:
+            median, best = measure(statement, args.runs)
+        except subprocess.CalledProcessError:
+            print('{:<30} {:>12}'.format(name, 'failed'))
+            continue
+        print('{:<30} {:>12.1f} {:>12.1f}'.format(name, median * 1000, best * 1000))
+
+if __name__ == '__main__':
+    main()
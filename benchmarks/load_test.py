@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import threading
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from pgoapi import PGoApi
+from pgoapi.auth import Auth
+from pgoapi.endpoints import EndpointManager
+from pgoapi.decoder import ProcessPoolDecoder
+
+import fixtures
+import fake_server
+
+# Drives PGoApi instances (one per client thread) against the fake RPC server
+# and reports requests/sec and latency percentiles, e.g.
+#
+#   python benchmarks/load_test.py --clients 8 --duration 20 --latency 0.05 --jitter 0.05
+#   python benchmarks/load_test.py --url http://127.0.0.1:8080/plfe/rpc --mix get_map_objects=1
+
+DEFAULT_MIX = 'get_map_objects=8,get_inventory=1,get_player=1'
+
+class LocalAuth(Auth):
+
+    def __init__(self):
+        Auth.__init__(self)
+
+        self._auth_provider = 'ptc'
+
+    def login(self, username, password):
+        self._auth_token = 'TGT-{}-fakeserver'.format(username)
+        self._login = True
+        return True
+
+def parse_mix(mix):
+    requests = []
+    for entry in mix.split(','):
+        name, weight = entry.split('=') if '=' in entry else (entry, 1)
+        requests.append((name.strip(), float(weight)))
+    return requests
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))
+    return values[index]
+
+class Client(threading.Thread):
+
+    def __init__(self, client_id, url, mix, request_kwargs, deadline, max_requests, decoder = None):
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self._url = url
+        self._mix = mix
+        self._request_kwargs = request_kwargs
+        self._deadline = deadline
+        self._max_requests = max_requests
+        self._decoder = decoder
+        self._random = random.Random(client_id)
+
+        self._auth = LocalAuth()
+        self._auth.login('loadtest{}'.format(client_id), 'password')
+
+        # [(request name, seconds, error name or None)]
+        self.results = []
+
+    def run(self):
+        api = PGoApi()
+        api.set_auth_provider(self._auth)
+        # the local server is the entry endpoint, it may redirect (--redirect)
+        api.set_endpoint_manager(EndpointManager(self._url))
+        api.set_decoder(self._decoder)
+        api.set_position(*fixtures.POSITION)
+
+        names = [name for (name, weight) in self._mix]
+        weights = [weight for (name, weight) in self._mix]
+        total = sum(weights)
+
+        while time.time() < self._deadline and (not self._max_requests or len(self.results) < self._max_requests):
+            pick, name = self._random.uniform(0, total), names[-1]
+            for (candidate, weight) in zip(names, weights):
+                if pick < weight:
+                    name = candidate
+                    break
+                pick -= weight
+
+            error = None
+            start = time.time()
+            try:
+                response = getattr(api, name)(**self._request_kwargs.get(name, {}))
+                if not response:
+                    error = 'NoResponse'
+            except Exception as e:
+                error = type(e).__name__
+            self.results.append((name, time.time() - start, error))
+
+def print_report(results, elapsed):
+    latencies = sorted(seconds for (name, seconds, error) in results)
+    errors = {}
+    for (name, seconds, error) in results:
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+
+    print('requests:     {}'.format(len(results)))
+    print('errors:       {}'.format(sum(errors.values())))
+    for (error, count) in sorted(errors.items()):
+        print('  {:<30} {}'.format(error, count))
+    print('duration:     {:.2f} s'.format(elapsed))
+    print('requests/sec: {:.1f}'.format(len(results) / elapsed if elapsed else 0))
+    print('')
+
+    print('{:<25} {:>8} {:>10} {:>10} {:>10} {:>10}'.format('request', 'count', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)', 'max (ms)'))
+    by_name = {}
+    for (name, seconds, error) in results:
+        by_name.setdefault(name, []).append(seconds)
+    for (name, values) in sorted(by_name.items()) + [('all', latencies)]:
+        values = sorted(values)
+        print('{:<25} {:>8} {:>10.1f} {:>10.1f} {:>10.1f} {:>10.1f}'.format(
+            name, len(values), percentile(values, 50) * 1000, percentile(values, 90) * 1000, percentile(values, 99) * 1000, values[-1] * 1000 if values else 0))
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test PGoApi against the local fake RPC server')
+    parser.add_argument("--url", help="RPC endpoint of an already running fake server, otherwise one is started in process")
+    parser.add_argument("-c", "--clients", help="Number of concurrent clients (threads)", type=int, default=4)
+    parser.add_argument("-d", "--duration", help="Duration of the test in seconds", type=float, default=10)
+    parser.add_argument("-n", "--requests", help="Stop every client after this many requests", type=int)
+    parser.add_argument("-m", "--mix", help="Weighted request mix (default: {})".format(DEFAULT_MIX), default=DEFAULT_MIX)
+    parser.add_argument("-P", "--decode-processes", help="Decode responses in a pool of this many processes", type=int)
+    parser.add_argument("-v", "--verbose", help="Log pgoapi output", action='store_true')
+    fake_server.add_server_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s [%(module)10s] [%(levelname)5s] %(message)s')
+
+    server = None
+    url = args.url
+    if not url:
+        server = fake_server.create_server(args).start()
+        url = server.get_url()
+
+    map_kwargs = list(fixtures.build_map_objects(cells=args.cells)[0][0].values())[0]
+    request_kwargs = {
+        'get_map_objects': map_kwargs,
+        'get_inventory': {'last_timestamp_ms': 0},
+    }
+
+    decoder = None
+    if args.decode_processes:
+        decoder = ProcessPoolDecoder(args.decode_processes)
+
+    mix = parse_mix(args.mix)
+    deadline = time.time() + args.duration
+    clients = [Client(i, url, mix, request_kwargs, deadline, args.requests, decoder) for i in range(args.clients)]
+
+    start = time.time()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.time() - start
+
+    results = []
+    for client in clients:
+        results.extend(client.results)
+
+    print_report(results, elapsed)
+
+    if decoder:
+        decoder.shutdown()
+
+    if server:
+        print('')
+        print('server stats: {}'.format(server.get_stats()))
+        server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import sys
+import gc
+import json
+import time
+import logging
+import argparse
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from pgoapi import proto_loader
+from pgoapi.rpc_api import RpcApi
+from pgoapi.protobuf_to_dict import protobuf_to_dict, dict_to_protobuf
+
+import fixtures
+
+# Throughput of the request building and response parsing code paths of RpcApi
+# on synthesized payloads (see fixtures.py) or on RPCs recorded with
+# pgoapi.capture.RpcCapture (--capture). Runs offline, e.g.
+#
+#   python benchmarks/rpc_bench.py --save baseline.json
+#   ... change something ...
+#   python benchmarks/rpc_bench.py --compare baseline.json --max-regression 0.1
+
+class FakeAuthProvider:
+
+    def is_login(self):
+        return True
+
+    def get_name(self):
+        return 'ptc'
+
+    def get_token(self):
+        return 'TGT-0000000-benchmark'
+
+    def get_ticket(self):
+        return (1470000000000, b'\x00' * 48, b'\x00' * 256)
+
+class FakeHttpResponse:
+
+    def __init__(self, content):
+        self.status_code = 200
+        self.content = content
+
+def get_benchmarks(fixture_set):
+    RequestEnvelope = proto_loader.get_message_class('POGOProtos.Networking.Envelopes.RequestEnvelope')
+
+    rpc = RpcApi(FakeAuthProvider())
+
+    benchmarks = []
+    for name in sorted(fixture_set):
+        fixture = fixture_set[name]
+        subrequests = fixture['subrequests']
+        response = fixture['response']
+        response_dict = protobuf_to_dict(response)
+        http_response = FakeHttpResponse(fixture['envelope'])
+
+        benchmarks.extend([
+            (name, '_build_main_request', lambda subrequests=subrequests: rpc._build_main_request(subrequests, fixtures.POSITION)),
+            (name, '_build_sub_requests', lambda subrequests=subrequests: rpc._build_sub_requests(RequestEnvelope(), subrequests)),
+            (name, '_parse_main_response', lambda subrequests=subrequests, http_response=http_response: rpc._parse_main_response(http_response, subrequests)),
+            (name, 'protobuf_to_dict', lambda response=response: protobuf_to_dict(response)),
+            (name, 'dict_to_protobuf', lambda response=response, response_dict=response_dict: dict_to_protobuf(type(response), response_dict)),
+        ])
+    return benchmarks
+
+def measure(func, min_time, repeat):
+    func()
+
+    # grow the number of calls until one round takes at least min_time
+    number = 1
+    while True:
+        start = time.time()
+        for i in range(number):
+            func()
+        elapsed = time.time() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    best = elapsed
+    for i in range(repeat - 1):
+        start = time.time()
+        for i in range(number):
+            func()
+        best = min(best, time.time() - start)
+
+    return number / best
+
+# bytes and blocks allocated during a single call, None if tracemalloc is not available
+def measure_allocations(func):
+    if tracemalloc is None:
+        return None, None
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = func()
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    return peak, blocks
+
+def compare(results, baseline, max_regression):
+    baseline = dict(((entry['fixture'], entry['benchmark']), entry['ops_per_sec']) for entry in baseline)
+
+    failed = []
+    print('')
+    print('{:<25} {:<22} {:>12} {:>12} {:>8}'.format('fixture', 'benchmark', 'baseline', 'current', 'change'))
+    for entry in results:
+        key = (entry['fixture'], entry['benchmark'])
+        if key not in baseline:
+            continue
+        change = entry['ops_per_sec'] / baseline[key] - 1
+        print('{:<25} {:<22} {:>12.1f} {:>12.1f} {:>7.1f}%'.format(key[0], key[1], baseline[key], entry['ops_per_sec'], change * 100))
+        if change < -max_regression:
+            failed.append(key)
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks request building and response parsing on synthesized payloads')
+    parser.add_argument("-t", "--min-time", help="Minimum duration of one measurement round in seconds", type=float, default=0.2)
+    parser.add_argument("-r", "--repeat", help="Number of measurement rounds, the best one is reported", type=int, default=3)
+    parser.add_argument("-f", "--filter", help="Only run benchmarks whose fixture or name contains this string")
+    parser.add_argument("-c", "--capture", help="Use the RPCs recorded in this capture file instead of synthesized fixtures")
+    parser.add_argument("--save", help="Write the results as json to this file")
+    parser.add_argument("--compare", help="Compare against results previously written with --save")
+    parser.add_argument("--max-regression", help="Exit with 1 if ops/sec dropped by more than this fraction (with --compare)", type=float, default=0.1)
+    args = parser.parse_args()
+
+    # the benchmarks measure the code paths, not the log handlers
+    logging.disable(logging.CRITICAL)
+
+    if args.capture:
+        fixture_set = fixtures.load_capture_fixtures(args.capture)
+    else:
+        fixture_set = fixtures.load_fixtures()
+    for (name, fixture) in sorted(fixture_set.items()):
+        print('{:<25} {:>8} bytes'.format(name, len(fixture['envelope'])))
+    print('')
+
+    results = []
+    print('{:<25} {:<22} {:>12} {:>12} {:>10}'.format('fixture', 'benchmark', 'ops/sec', 'peak KiB', 'blocks'))
+    for (fixture, benchmark, func) in get_benchmarks(fixture_set):
+        if args.filter and args.filter not in fixture and args.filter not in benchmark:
+            continue
+
+        ops_per_sec = measure(func, args.min_time, args.repeat)
+        peak, blocks = measure_allocations(func)
+        results.append({'fixture': fixture, 'benchmark': benchmark, 'ops_per_sec': ops_per_sec, 'peak_bytes': peak, 'blocks': blocks})
+
+        if peak is None:
+            print('{:<25} {:<22} {:>12.1f} {:>12} {:>10}'.format(fixture, benchmark, ops_per_sec, 'n/a', 'n/a'))
+        else:
+            print('{:<25} {:<22} {:>12.1f} {:>12.1f} {:>10}'.format(fixture, benchmark, ops_per_sec, peak / 1024.0, blocks))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failed = compare(results, baseline, args.max_regression)
+        if failed:
+            print('\n{} benchmark(s) regressed by more than {:.0f}%'.format(len(failed), args.max_regression * 100))
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import sys
+import logging
+import argparse
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from pgoapi import PGoApi
+from pgoapi.supervisor import Supervisor
+
+import fixtures
+import fake_server
+from load_test import LocalAuth
+
+# Runs the Supervisor against the local fake RPC server and reports tasks/sec,
+# errors, retries and restarts. With --poison the first task kills the worker
+# process running it (os._exit, like a segfault or OOM kill), it has to fail
+# alone after --task-retries attempts while all other tasks complete, e.g.
+#
+#   python benchmarks/supervisor_bench.py --accounts 6 --workers 3 --tasks 200 --poison
+
+# a task at this position takes down its worker
+POISON_POSITION = [0.0, 0.0, 0.0]
+
+def create_api(account):
+    api = PGoApi()
+    auth = LocalAuth()
+    auth.login(account['username'], account['password'])
+    api.set_auth_provider(auth)
+    api.set_api_endpoint(account['url'])
+    api.set_position(*fixtures.POSITION)
+
+    set_position = api.set_position
+    def checked_set_position(lat, lng, alt):
+        if [lat, lng, alt] == POISON_POSITION:
+            os._exit(3)
+        set_position(lat, lng, alt)
+    api.set_position = checked_set_position
+    return api
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Supervisor against the local fake RPC server')
+    parser.add_argument("-a", "--accounts", help="Number of accounts", type=int, default=6)
+    parser.add_argument("-w", "--workers", help="Number of worker processes", type=int, default=3)
+    parser.add_argument("-n", "--tasks", help="Number of shared get_player tasks", type=int, default=200)
+    parser.add_argument("--poison", help="Put a task in front which crashes every worker running it", action='store_true')
+    parser.add_argument("--max-restarts", help="Restarts of a crashed worker before giving up on its accounts", type=int, default=3)
+    parser.add_argument("--task-retries", help="How often a task of a crashed worker is run again", type=int, default=1)
+    parser.add_argument("-v", "--verbose", help="Log pgoapi output", action='store_true')
+    fake_server.add_server_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s [%(processName)16s] [%(module)10s] [%(levelname)5s] %(message)s')
+
+    server = fake_server.create_server(args).start()
+
+    accounts = [{'username': 'bench{}'.format(i), 'password': 'x', 'url': server.get_url()} for i in range(args.accounts)]
+    tasks = [{'method': 'get_player'} for i in range(args.tasks)]
+    if args.poison:
+        tasks.insert(0, {'method': 'get_player', 'position': POISON_POSITION})
+
+    results = []
+    supervisor = Supervisor(accounts, workers=args.workers, api_factory=create_api, max_restarts=args.max_restarts,
+                            task_retries=args.task_retries, stats_interval=0)
+    stats = supervisor.run(tasks, results.append)
+
+    print('tasks:        {}'.format(stats['tasks']))
+    print('completed:    {}'.format(stats['completed']))
+    print('errors:       {}'.format(stats['errors']))
+    for (error, count) in sorted(stats['errors_by_type'].items()):
+        print('  {:<30} {}'.format(error, count))
+    print('retried:      {}'.format(stats['retried']))
+    print('restarts:     {}'.format(stats['restarts']))
+    print('duration:     {:.2f} s'.format(stats['elapsed']))
+    print('tasks/sec:    {:.1f}'.format(stats['tasks_per_sec']))
+
+    if args.poison:
+        failed = [result['id'] for result in results if result['error']]
+        print('')
+        print('poison task failed alone: {}'.format(failed == [0]))
+
+    server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -30,7 +30,6 @@ import sys
 import json
 import time
 import struct
-import pprint
 import logging
 import requests
 import argparse
@@ -42,25 +41,14 @@ sys.path.append(os.path.dirname(os.path.realpath(__file__)))
 # import Pokemon Go API lib
 from pgoapi import pgoapi
 from pgoapi import utilities as util
+from pgoapi import json_stream
 
 # other stuff
-from google.protobuf.internal import encoder
-from geopy.geocoders import GoogleV3
 from s2sphere import Cell, CellId, LatLng
 
 
 log = logging.getLogger(__name__)
 
-def get_pos_by_name(location_name):
-    geolocator = GoogleV3()
-    loc = geolocator.geocode(location_name, timeout=10)
-    if not loc:
-        return None
-    log.info('Your given location: %s', loc.address.encode('utf-8'))
-    log.info('lat/long/alt: %s %s %s', loc.latitude, loc.longitude, loc.altitude)
-
-    return (loc.latitude, loc.longitude, loc.altitude)
-
 def get_cell_ids(lat, long, radius = 10):
     origin = CellId.from_lat_lng(LatLng.from_degrees(lat, long)).parent(15)
     walk = [origin.id()]
@@ -77,11 +65,6 @@ def get_cell_ids(lat, long, radius = 10):
     # Return everything
     return sorted(walk)
 
-def encode(cellid):
-    output = []
-    encoder._VarintEncoder()(output.append, cellid)
-    return ''.join(output)
-
 def init_config():
     parser = argparse.ArgumentParser()
     config_file = "config_bot.json"
@@ -140,7 +123,7 @@ def main():
         logging.getLogger("pgoapi").setLevel(logging.DEBUG)
         logging.getLogger("rpc_api").setLevel(logging.DEBUG)
 
-    position = get_pos_by_name(config.location)
+    position = util.get_pos_by_name(config.location)
     if not position:
         log.error('Position could not be found by name')
         return
@@ -195,7 +178,8 @@ def main():
 
     # execute the RPC call
     response_dict = api.call()
-    print('Response dictionary: \n\r{}'.format(pprint.PrettyPrinter(indent=4).pformat(response_dict)))
+    print('Response dictionary:')
+    json_stream.dump(response_dict, sys.stdout, indent=4)
 
     # alternative:
     # api.get_player().get_inventory().get_map_objects().download_settings(hash="05daf51635c82611d1aac95c0b051d3ec088a930").call()
@@ -42,19 +42,14 @@ sys.path.append(os.path.dirname(os.path.realpath(__file__)))
 # import Pokemon Go API lib
 from pgoapi import pgoapi
 from pgoapi import utilities as util
+from pgoapi import optimizer
 
 # other stuff
-from google.protobuf.internal import encoder
 from tabulate import tabulate
 from collections import defaultdict
 
 log = logging.getLogger(__name__)
 
-def encode(cellid):
-    output = []
-    encoder._VarintEncoder()(output.append, cellid)
-    return ''.join(output)
-
 def init_config():
     parser = argparse.ArgumentParser()
     config_file = "config.json"
@@ -129,27 +124,9 @@ def main():
 
     approot = os.path.dirname(os.path.realpath(__file__))
 
-    with open(os.path.join(approot, 'data/moves.json')) as data_file:
-        moves = json.load(data_file)
-
-    with open(os.path.join(approot, 'data/pokemon.json')) as data_file:
-        pokemon = json.load(data_file)
-
-    def format(i):
-        i = i['inventory_item_data']['pokemon_data']
-        i = {k: v for k, v in i.items() if k in ['nickname','move_1', 'move_2', 'pokemon_id', 'individual_defense', 'stamina', 'cp', 'individual_stamina', 'individual_attack']}
-        i['individual_defense'] =  i.get('individual_defense', 0)
-        i['individual_attack'] =  i.get('individual_attack', 0)
-        i['individual_stamina'] =  i.get('individual_stamina', 0)
-        i['power_quotient'] = round(((float(i['individual_defense']) + float(i['individual_attack']) + float(i['individual_stamina'])) / 45) * 100)
-        i['name'] = list(filter(lambda j: int(j['Number']) == i['pokemon_id'], pokemon))[0]['Name']
-        i['move_1'] = list(filter(lambda j: j['id'] == i['move_1'], moves))[0]['name']
-        i['move_2'] = list(filter(lambda j: j['id'] == i['move_2'], moves))[0]['name']
-        return i
-
-    all_pokemon = filter(lambda i: 'pokemon_data' in i['inventory_item_data'] and 'is_egg' not in i['inventory_item_data']['pokemon_data'], response_dict['responses']['GET_INVENTORY']['inventory_delta']['inventory_items'])
-    all_pokemon = list(map(format, all_pokemon))
-    all_pokemon.sort(key=lambda x: x['power_quotient'], reverse=True)
+    tables = optimizer.load_tables_from_json(os.path.join(approot, 'data/pokemon.json'), os.path.join(approot, 'data/moves.json'))
+
+    all_pokemon = optimizer.rank_pokemon(optimizer.get_inventory_pokemon(response_dict), tables)
 
     print(tabulate(all_pokemon, headers = "keys"))
 
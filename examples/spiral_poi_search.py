@@ -34,29 +34,18 @@ import random
 import logging
 import requests
 import argparse
-import pprint
 
 from pgoapi import PGoApi
 from pgoapi.utilities import f2i, h2f
 from pgoapi import utilities as util
+from pgoapi import json_stream
+from pgoapi.records import WildPokemonRecord
+from pgoapi.prepared import MapObjectsRequest
 
-from google.protobuf.internal import encoder
-from geopy.geocoders import GoogleV3
 from s2sphere import Cell, CellId, LatLng
 
 log = logging.getLogger(__name__)
 
-def get_pos_by_name(location_name):
-    geolocator = GoogleV3()
-    loc = geolocator.geocode(location_name)
-    if not loc:
-        return None
-
-    log.info('Your given location: %s', loc.address.encode('utf-8'))
-    log.info('lat/long/alt: %s %s %s', loc.latitude, loc.longitude, loc.altitude)
-
-    return (loc.latitude, loc.longitude, loc.altitude)
-
 def get_cell_ids(lat, long, radius = 10):
     origin = CellId.from_lat_lng(LatLng.from_degrees(lat, long)).parent(15)
     walk = [origin.id()]
@@ -73,11 +62,6 @@ def get_cell_ids(lat, long, radius = 10):
     # Return everything
     return sorted(walk)
 
-def encode(cellid):
-    output = []
-    encoder._VarintEncoder()(output.append, cellid)
-    return ''.join(output)
-
 def init_config():
     parser = argparse.ArgumentParser()
     config_file = "config.json"
@@ -97,6 +81,7 @@ def init_config():
     parser.add_argument("-l", "--location", help="Location", required=required("location"))
     parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
     parser.add_argument("-t", "--test", help="Only parse the specified location", action='store_true')
+    parser.add_argument("-e", "--export", help="Export all map objects as columnar files into this directory")
     parser.set_defaults(DEBUG=False, TEST=False)
     config = parser.parse_args()
 
@@ -131,7 +116,7 @@ def main():
         logging.getLogger("pgoapi").setLevel(logging.DEBUG)
         logging.getLogger("rpc_api").setLevel(logging.DEBUG)
 
-    position = get_pos_by_name(config.location)
+    position = util.get_pos_by_name(config.location)
     if not position:
         return
         
@@ -153,46 +138,56 @@ def main():
     # ----------------------
     response_dict = api.get_player()
 
-    # apparently new dict has binary data in it, so formatting it with this method no longer works, pprint works here but there are other alternatives    
-    # print('Response dictionary: \n\r{}'.format(json.dumps(response_dict, indent=2)))
-    print('Response dictionary: \n\r{}'.format(pprint.PrettyPrinter(indent=4).pformat(response_dict)))
-    find_poi(api, position[0], position[1])
+    print('Response dictionary:')
+    json_stream.dump(response_dict, sys.stdout, indent=4)
 
-def find_poi(api, lat, lng):
+    exporter = None
+    if config.export:
+        from pgoapi.export import ScanExporter
+        exporter = ScanExporter(config.export)
+
+    try:
+        find_poi(api, position[0], position[1], exporter)
+    finally:
+        if exporter:
+            exporter.close()
+
+def find_poi(api, lat, lng, exporter = None):
     poi = {'pokemons': {}, 'forts': []}
     step_size = 0.0015
     step_limit = 49
     coords = generate_spiral(lat, lng, step_size, step_limit)
+    # the get_map_objects sub request is prepared once and only rebound per step
+    map_objects = MapObjectsRequest()
     for coord in coords:
         lat = coord['lat']
         lng = coord['lng']
-        api.set_position(lat, lng, 0)
 
-        
         #get_cellid was buggy -> replaced through get_cell_ids from pokecli
-        #timestamp gets computed a different way:
         cell_ids = get_cell_ids(lat, lng)
-        timestamps = [0,] * len(cell_ids)
-        response_dict = api.get_map_objects(latitude = util.f2i(lat), longitude = util.f2i(lng), since_timestamp_ms = timestamps, cell_id = cell_ids)
+        response_dict = map_objects.call(api, lat, lng, 0, cell_ids)
+        if exporter:
+            exporter.add_response(response_dict)
         if (response_dict['responses']):
             if 'status' in response_dict['responses']['GET_MAP_OBJECTS']:
                 if response_dict['responses']['GET_MAP_OBJECTS']['status'] == 1:
                     for map_cell in response_dict['responses']['GET_MAP_OBJECTS']['map_cells']:
                         if 'wild_pokemons' in map_cell:
                             for pokemon in map_cell['wild_pokemons']:
-                                pokekey = get_key_from_pokemon(pokemon)
-                                pokemon['hides_at'] = time.time() + pokemon['time_till_hidden_ms']/1000
-                                poi['pokemons'][pokekey] = pokemon
+                                # compact record instead of the full response dict,
+                                # hides_at is relative to the time of the response
+                                record = WildPokemonRecord.from_dict(pokemon)
+                                poi['pokemons'][get_key_from_pokemon(record)] = (record, record.get_hides_at(time.time()))
 
         # time.sleep(0.51)
-    # new dict, binary data
-    # print('POI dictionary: \n\r{}'.format(json.dumps(poi, indent=2)))
-    print('POI dictionary: \n\r{}'.format(pprint.PrettyPrinter(indent=4).pformat(poi)))
+    print('POI dictionary:')
+    pokemons = dict((key, dict(record.to_dict(), hides_at=hides_at)) for (key, (record, hides_at)) in poi['pokemons'].items())
+    json_stream.dump({'pokemons': pokemons, 'forts': poi['forts']}, sys.stdout, indent=4)
     print('Open this in a browser to see the path the spiral search took:')
     print_gmaps_dbug(coords)
 
 def get_key_from_pokemon(pokemon):
-    return '{}-{}'.format(pokemon['spawn_point_id'], pokemon['pokemon_data']['pokemon_id'])
+    return '{}-{}'.format(pokemon.spawn_point_id, pokemon.pokemon_id)
 
 def print_gmaps_dbug(coords):
     url_string = 'http://maps.googleapis.com/maps/api/staticmap?size=400x400&path='
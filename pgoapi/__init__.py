@@ -27,7 +27,6 @@ from __future__ import absolute_import
 
 from pgoapi.exceptions import PleaseInstallProtobufVersion3
 
-import pkg_resources
 import logging
 
 __title__ = 'pgoapi'
@@ -39,14 +38,20 @@ __copyright__ = 'Copyright (c) 2016 tjado <https://github.com/tejado>'
 protobuf_exist = False
 protobuf_version = 0
 try:
-    protobuf_version = pkg_resources.get_distribution("protobuf").version
+    # much cheaper than asking pkg_resources for the installed distribution
+    from google.protobuf import __version__ as protobuf_version
     protobuf_exist = True
-except:
+except ImportError:
     pass
 
 if (not protobuf_exist) or (int(protobuf_version[:1]) < 3):
     raise PleaseInstallProtobufVersion3()
 
+# keep the generated POGOProtos modules importable unless the descriptor bundle is used
+from pgoapi import proto_loader
+if not proto_loader.is_bundle_mode():
+    from pgoapi import protos
+
 from pgoapi.pgoapi import PGoApi
 from pgoapi.rpc_api import RpcApi
 from pgoapi.auth import Auth
@@ -57,9 +62,3 @@ logging.getLogger("utilities").addHandler(logging.NullHandler())
 logging.getLogger("auth").addHandler(logging.NullHandler())
 logging.getLogger("auth_ptc").addHandler(logging.NullHandler())
 logging.getLogger("auth_google").addHandler(logging.NullHandler())
-
-try:
-    import requests.packages.urllib3
-    requests.packages.urllib3.disable_warnings()
-except:
-    pass
\ No newline at end of file
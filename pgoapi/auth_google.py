@@ -28,7 +28,6 @@ from __future__ import absolute_import
 import logging
 
 from pgoapi.auth import Auth
-from gpsoauth import perform_master_login, perform_oauth
 
 class AuthGoogle(Auth):
 
@@ -43,6 +42,8 @@ class AuthGoogle(Auth):
         self._auth_provider = 'google'
 
     def login(self, username, password):
+        from gpsoauth import perform_master_login, perform_oauth
+
         self.log.info('Google login for: {}'.format(username))
         login = perform_master_login(username, password, self.GOOGLE_LOGIN_ANDROID_ID)
         login = perform_oauth(username, login.get('Token', ''), self.GOOGLE_LOGIN_ANDROID_ID, self.GOOGLE_LOGIN_SERVICE, self.GOOGLE_LOGIN_APP,
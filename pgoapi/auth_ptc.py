@@ -28,9 +28,9 @@ from __future__ import absolute_import
 import re
 import json
 import logging
-import requests
 
 from pgoapi.auth import Auth
+from pgoapi.utilities import import_requests
 
 class AuthPtc(Auth):
 
@@ -43,7 +43,7 @@ class AuthPtc(Auth):
         
         self._auth_provider = 'ptc'
         
-        self._session = requests.session()
+        self._session = import_requests().session()
         self._session.verify = True
 
     def login(self, username, password):
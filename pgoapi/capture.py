@@ -0,0 +1,218 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import json
+import time
+import struct
+import logging
+import threading
+
+from pgoapi import proto_loader
+from pgoapi.hooks import RpcHook
+from pgoapi.exceptions import ServerBusyOrOfflineException
+
+log = logging.getLogger(__name__)
+
+# Capture file format (append-only, one record per RPC):
+#
+#   file header: MAGIC
+#   record:      struct RECORD_HEADER (metadata, request and response length)
+#                metadata as utf-8 json
+#                serialized RequestEnvelope
+#                raw ResponseEnvelope (HTTP body)
+#
+# The metadata holds the capture time, endpoint, request id, request types,
+# HTTP status and the phase timings of the RPC.
+#
+# By default the credentials are removed from both envelopes before they are
+# written (auth_info with the OAuth token, auth_ticket and the unknown6
+# signature data), so a capture can be shared. RpcCapture(filename, redact = False)
+# stores the envelopes as sent and received - including a usable login.
+
+MAGIC = b'PGOCAP1\n'
+RECORD_HEADER = struct.Struct('>III')
+
+class CaptureWriter:
+
+    def __init__(self, filename):
+        self.log = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._file = open(filename, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+            self._file.flush()
+
+        self.log.info('Capturing RPC traffic to %s', filename)
+
+    def write(self, metadata, request_data, response_data):
+        metadata = json.dumps(metadata, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        response_data = response_data or b''
+
+        record = RECORD_HEADER.pack(len(metadata), len(request_data), len(response_data)) + metadata + request_data + response_data
+        with self._lock:
+            self._file.write(record)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+# yields {'metadata': {..}, 'request': bytes, 'response': bytes} for every
+# record, a truncated last record (e.g. after a crash) is skipped
+def read_capture(filename):
+    with open(filename, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('{} is not a pgoapi capture file'.format(filename))
+
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                if header:
+                    log.warning('Ignoring truncated record at the end of %s', filename)
+                return
+
+            metadata_len, request_len, response_len = RECORD_HEADER.unpack(header)
+            data = f.read(metadata_len + request_len + response_len)
+            if len(data) < metadata_len + request_len + response_len:
+                log.warning('Ignoring truncated record at the end of %s', filename)
+                return
+
+            yield {
+                'metadata': json.loads(data[:metadata_len].decode('utf-8')),
+                'request': data[metadata_len:metadata_len + request_len],
+                'response': data[metadata_len + request_len:],
+            }
+
+# returns the serialized envelope without the auth and signature fields, or
+# the data unchanged if it can not be parsed (e.g. an HTML error page)
+def redact_envelope(message_name, data, fields):
+    if not data:
+        return data
+
+    envelope = proto_loader.get_message_class(message_name)()
+    try:
+        envelope.ParseFromString(data)
+    except Exception:
+        return data
+
+    for field in fields:
+        envelope.ClearField(field)
+    return envelope.SerializeToString()
+
+# RpcHook which writes every RPC to a capture file, e.g.
+#   api.add_hook(RpcCapture('session.pgocap'))
+class RpcCapture(RpcHook):
+
+    def __init__(self, filename, redact = True):
+        self._writer = CaptureWriter(filename)
+        self._local = threading.local()
+        self._redact = redact
+
+        if not redact:
+            log.warning('Capture to %s is not redacted, it contains the auth token and ticket', filename)
+
+    def after_serialize(self, context, request_data):
+        if self._redact:
+            request_data = redact_envelope('POGOProtos.Networking.Envelopes.RequestEnvelope', request_data, ('auth_info', 'auth_ticket', 'unknown6'))
+        self._local.request_data = request_data
+
+    def after_receive(self, context, http_response):
+        metadata = {
+            'time': time.time(),
+            'endpoint': context['endpoint'],
+            'request_id': context['request_id'],
+            'request_types': context['request_types'],
+            'http_status': http_response.status_code,
+            'timings': context['timings'],
+        }
+        response_data = http_response.content
+        if self._redact and http_response.status_code == 200:
+            response_data = redact_envelope('POGOProtos.Networking.Envelopes.ResponseEnvelope', response_data, ('auth_ticket', 'unknown6'))
+
+        self._writer.write(metadata, getattr(self._local, 'request_data', b''), response_data)
+        self._local.request_data = None
+
+    def close(self):
+        self._writer.close()
+
+class ReplayResponse:
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+# Stands in for the requests session of RpcApi and answers every request with
+# the next recorded response of the same request types, in capture order, e.g.
+#   api.set_session(ReplaySession('session.pgocap'))
+class ReplaySession:
+
+    def __init__(self, filename, loop = False):
+        self.log = logging.getLogger(__name__)
+
+        self.headers = {}
+        self.verify = True
+
+        self._loop = loop
+        self._lock = threading.Lock()
+
+        # request types -> [ReplayResponse, ..] and read position
+        self._responses = {}
+        self._positions = {}
+        for record in read_capture(filename):
+            key = tuple(record['metadata']['request_types'])
+            self._responses.setdefault(key, []).append(ReplayResponse(record['metadata']['http_status'], record['response']))
+
+        self.log.info('Loaded %s recorded responses from %s', sum(len(responses) for responses in self._responses.values()), filename)
+
+    def post(self, endpoint, data = None, **kwargs):
+        RequestEnvelope = proto_loader.get_message_class('POGOProtos.Networking.Envelopes.RequestEnvelope')
+        RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+
+        request = RequestEnvelope()
+        request.ParseFromString(data)
+        key = tuple(RequestType.Name(subrequest.request_type) for subrequest in request.requests)
+
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                self.log.warning('No recorded response for %s', ', '.join(key))
+                raise ServerBusyOrOfflineException()
+
+            position = self._positions.get(key, 0)
+            if position >= len(responses):
+                if not self._loop:
+                    self.log.warning('Recorded responses for %s exhausted', ', '.join(key))
+                    raise ServerBusyOrOfflineException()
+                position = 0
+            self._positions[key] = position + 1
+
+        return responses[position]
+
+    def close(self):
+        pass
@@ -0,0 +1,117 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import logging
+import threading
+
+# Merges direct calls (api.get_player(), api.get_inventory(), ..) of one
+# account that arrive within a short window into one RequestEnvelope. The
+# first caller of a batch waits up to window seconds for more calls (or
+# until max_requests are collected), sends the envelope and every caller
+# gets a response dict with only its own sub response. Calls are only merged
+# while the player position stays the same, as it is part of the envelope.
+class RequestCoalescer:
+
+    def __init__(self, window = 0.02, max_requests = 5):
+        self.log = logging.getLogger(__name__)
+
+        self.window = window
+        self.max_requests = max_requests
+
+        self._lock = threading.Lock()
+        self._batch = None
+
+        self._stats = {'calls': 0, 'rpcs': 0}
+
+    def call(self, api, func, kwargs, priority = None, deadline = None):
+        position = api.get_position()
+        with self._lock:
+            batch = self._batch
+            leader = batch is None or batch.position != position
+            if leader:
+                batch = self._batch = _Batch(position)
+            index = len(batch.calls)
+            batch.calls.append((func, kwargs, priority, deadline))
+            if len(batch.calls) >= self.max_requests:
+                self._batch = None
+                batch.full.set()
+            self._stats['calls'] += 1
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._batch is batch:
+                    self._batch = None
+                self._stats['rpcs'] += 1
+            self._send(api, batch)
+        else:
+            batch.done.wait()
+
+        if batch.exception is not None:
+            raise batch.exception
+        return self._get_response(batch, index)
+
+    def _send(self, api, batch):
+        self.log.debug('Sending %s coalesced calls in one RPC', len(batch.calls))
+        try:
+            request = api.create_request()
+            for (func, kwargs, priority, deadline) in batch.calls:
+                getattr(request, func)(**kwargs)
+
+            priorities = [call[2] for call in batch.calls if call[2] is not None]
+            deadlines = [call[3] for call in batch.calls if call[3] is not None]
+            batch.response = request.call(priority = min(priorities) if priorities else None, deadline = min(deadlines) if deadlines else None)
+        except Exception as e:
+            batch.exception = e
+        finally:
+            batch.done.set()
+
+    def _get_response(self, batch, index):
+        response = batch.response
+        if len(batch.calls) == 1 or not isinstance(response, dict) or 'responses_list' not in response:
+            return response
+
+        entries = response['responses_list'][index:index + 1]
+        result = dict((key, value) for (key, value) in response.items() if key not in ('responses', 'responses_list'))
+        result['responses'] = dict((entry['request_type'], entry['response']) for entry in entries)
+        result['responses_list'] = entries
+        return result
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+class _Batch:
+
+    def __init__(self, position):
+        self.position = position
+        self.calls = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.response = None
+        self.exception = None
@@ -0,0 +1,146 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import time
+import logging
+
+from google.protobuf import message
+
+from pgoapi import proto_loader
+from pgoapi.protobuf_to_dict import protobuf_to_dict
+from pgoapi.utilities import to_camel_case
+
+log = logging.getLogger(__name__)
+
+# Parsing of ResponseEnvelopes into the response dict of RpcApi.
+#
+# Optional decoding of ResponseEnvelopes in worker processes. RpcApi hands the
+# raw response body to the decoder, the ParseFromString and protobuf_to_dict
+# work of the main and all sub responses is done in a worker and the ready
+# response dict is returned, so parsing is not limited to one core by the GIL.
+#
+#   api.set_decoder(ProcessPoolDecoder(processes = 4))
+
+# module level to be picklable, returns
+# {'response': response dict or None, 'error': .., 'timings': {..}, 'subresponse_timings': [..]}
+def decode_response(content, request_ids):
+    ResponseEnvelope = proto_loader.get_message_class('POGOProtos.Networking.Envelopes.ResponseEnvelope')
+    RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+
+    result = {'response': None, 'error': None, 'timings': {}, 'subresponse_timings': []}
+
+    start = time.time()
+    response_proto = ResponseEnvelope()
+    try:
+        response_proto.ParseFromString(content)
+    except message.DecodeError as e:
+        result['error'] = str(e)
+        return result
+    finally:
+        result['timings']['parse'] = time.time() - start
+
+    start = time.time()
+    response_dict = protobuf_to_dict(response_proto)
+    result['timings']['convert'] = time.time() - start
+
+    # 'responses' is keyed by request name and keeps the last result for
+    # repeated request types, 'responses_list' keeps every sub-response in
+    # the order of the request chain
+    response_dict['responses'] = {}
+    response_dict['responses_list'] = []
+    response_dict.pop('returns', None)
+
+    if len(response_proto.returns) > len(request_ids):
+        log.info('Error - something strange happend, got %s sub responses for %s requests', len(response_proto.returns), len(request_ids))
+
+    for (request_id, subresponse) in zip(request_ids, response_proto.returns):
+        entry_name = RequestType.Name(request_id)
+        proto_classname = 'POGOProtos.Networking.Responses_pb2.' + to_camel_case(entry_name.lower()) + 'Response'
+
+        try:
+            subresponse_extension = proto_loader.get_class(proto_classname)()
+        except Exception:
+            subresponse_extension = None
+            subresponse_return = 'Protobuf definition for {} not found'.format(proto_classname)
+            log.debug(subresponse_return)
+
+        if subresponse_extension:
+            start = time.time()
+            try:
+                subresponse_extension.ParseFromString(subresponse)
+                parsed = time.time()
+                result['timings']['parse'] += parsed - start
+                subresponse_return = protobuf_to_dict(subresponse_extension)
+                result['timings']['convert'] += time.time() - parsed
+            except Exception:
+                subresponse_return = 'Protobuf definition for {} seems not to match'.format(proto_classname)
+                log.debug(subresponse_return)
+            result['subresponse_timings'].append((entry_name, time.time() - start))
+
+        response_dict['responses'][entry_name] = subresponse_return
+        response_dict['responses_list'].append({'request_type': entry_name, 'response': subresponse_return})
+
+    result['response'] = response_dict
+    return result
+
+def _init_worker():
+    # load the envelope classes once per worker instead of on the first request
+    proto_loader.get_message_class('POGOProtos.Networking.Envelopes.ResponseEnvelope')
+    proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+
+class ProcessPoolDecoder:
+
+    def __init__(self, processes = None):
+        # imported here, "import pgoapi" does not need multiprocessing
+        import multiprocessing
+
+        self.log = logging.getLogger(__name__)
+
+        self._processes = processes or multiprocessing.cpu_count()
+        self._pool = multiprocessing.Pool(self._processes, _init_worker)
+
+        self.log.info('Started response decoder with %s processes', self._processes)
+
+    def submit(self, content, request_ids):
+        return self._pool.apply_async(decode_response, (content, list(request_ids)))
+
+    def decode(self, content, request_ids):
+        return self.submit(content, request_ids).get()
+
+    def shutdown(self):
+        self._pool.close()
+        self._pool.join()
+
+_default_decoder = None
+
+def get_default_decoder():
+    return _default_decoder
+
+def set_default_decoder(decoder):
+    global _default_decoder
+    _default_decoder = decoder
@@ -0,0 +1,135 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import time
+import logging
+import threading
+
+from six.moves.urllib.parse import urlparse
+
+from pgoapi.utilities import import_requests
+
+DEFAULT_ENDPOINT = 'https://pgorelease.nianticlabs.com/plfe/rpc'
+
+def create_session():
+    session = import_requests().session()
+    session.headers.update({'User-Agent': 'Niantic App'})
+    session.verify = True
+    return session
+
+# Endpoints of one account. Login goes to the entry endpoint, which tells
+# the client its api_url (status code 53 redirects there). The manager keeps
+# the current endpoint, per endpoint health and latency, and one HTTP session
+# per host so the connections are reused between RPCs. An endpoint with
+# failure_threshold failures in a row is avoided for cooldown seconds in
+# favour of the known endpoint with the lowest latency, usually the entry
+# endpoint, which redirects to a working one.
+class EndpointManager:
+
+    def __init__(self, entry_endpoint = DEFAULT_ENDPOINT, failure_threshold = 3, cooldown = 30):
+        self.log = logging.getLogger(__name__)
+
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._entry = entry_endpoint
+        self._current = entry_endpoint
+        # endpoint -> {'requests', 'failures', 'consecutive_failures', 'last_failure', 'latency'}
+        self._endpoints = {}
+        # scheme://host -> session
+        self._sessions = {}
+        self._add(entry_endpoint)
+
+    def _add(self, endpoint):
+        if endpoint not in self._endpoints:
+            self._endpoints[endpoint] = {'requests': 0, 'failures': 0, 'consecutive_failures': 0, 'last_failure': None, 'latency': None}
+        return self._endpoints[endpoint]
+
+    def _is_healthy(self, stats, now):
+        return stats['consecutive_failures'] < self.failure_threshold or now - stats['last_failure'] > self.cooldown
+
+    def get_entry_endpoint(self):
+        return self._entry
+
+    def set_endpoint(self, endpoint):
+        with self._lock:
+            if endpoint != self._current:
+                self.log.debug('Setting API endpoint to: %s', endpoint)
+            self._add(endpoint)
+            self._current = endpoint
+
+    def get_endpoint(self):
+        now = time.time()
+        with self._lock:
+            if self._is_healthy(self._endpoints[self._current], now):
+                return self._current
+
+            healthy = [(stats['latency'] or 0, endpoint) for (endpoint, stats) in self._endpoints.items()
+                       if endpoint != self._current and self._is_healthy(stats, now)]
+            if not healthy:
+                return self._current
+
+            endpoint = min(healthy)[1]
+            self.log.info('Endpoint %s failed %s times - switching to %s', self._current, self._endpoints[self._current]['consecutive_failures'], endpoint)
+            self._current = endpoint
+            return endpoint
+
+    # api_url of a response -> endpoint, with the scheme of the endpoint that sent it
+    def resolve(self, api_url, endpoint = None):
+        return '{}://{}/rpc'.format(urlparse(endpoint or self._current).scheme or 'https', api_url)
+
+    def get_session(self, endpoint):
+        parsed = urlparse(endpoint)
+        key = '{}://{}'.format(parsed.scheme, parsed.netloc)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = create_session()
+        return session
+
+    def record_success(self, endpoint, seconds):
+        with self._lock:
+            stats = self._add(endpoint)
+            stats['requests'] += 1
+            stats['consecutive_failures'] = 0
+            # exponentially weighted moving average
+            stats['latency'] = seconds if stats['latency'] is None else 0.8 * stats['latency'] + 0.2 * seconds
+
+    def record_failure(self, endpoint):
+        with self._lock:
+            stats = self._add(endpoint)
+            stats['requests'] += 1
+            stats['failures'] += 1
+            stats['consecutive_failures'] += 1
+            stats['last_failure'] = time.time()
+
+    # {endpoint: {'requests', 'failures', 'consecutive_failures', 'last_failure', 'latency', 'current'}}
+    def get_stats(self):
+        with self._lock:
+            return dict((endpoint, dict(stats, current = endpoint == self._current)) for (endpoint, stats) in self._endpoints.items())
@@ -48,4 +48,7 @@ class ServerSideAccessForbiddenException(Exception):
     pass
 
 class UnexpectedResponseException(Exception):
+    pass
+
+class DeadlineExceededException(Exception):
     pass
\ No newline at end of file
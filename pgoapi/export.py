@@ -0,0 +1,330 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import os
+import csv
+import gzip
+import base64
+import logging
+
+import six
+
+from pgoapi import proto_loader
+
+log = logging.getLogger(__name__)
+
+# Columnar export of map objects and inventory from response dicts.
+#
+# Every table is derived from a proto message: scalar fields become typed
+# columns, singular sub messages are flattened into '<field>_<sub field>'
+# columns and repeated fields are left out. Rows are buffered per column and
+# written in batches as Parquet or Arrow IPC (both need pyarrow) or as gzip
+# compressed CSV, which is also the fallback if pyarrow is not installed.
+#
+#   with ScanExporter('scans') as exporter:
+#       exporter.add_response(api.get_map_objects(...))
+
+# table name -> (full name of the proto message, key of the message list in
+# the map cell dict). Every row starts with the MAP_COLUMNS of its cell
+MAP_TABLES = {
+    'forts': ('POGOProtos.Map.Fort.FortData', 'forts'),
+    'spawn_points': ('POGOProtos.Map.SpawnPoint', 'spawn_points'),
+    'wild_pokemons': ('POGOProtos.Map.Pokemon.WildPokemon', 'wild_pokemons'),
+    'catchable_pokemons': ('POGOProtos.Map.Pokemon.MapPokemon', 'catchable_pokemons'),
+    'nearby_pokemons': ('POGOProtos.Map.Pokemon.NearbyPokemon', 'nearby_pokemons'),
+}
+MAP_COLUMNS = [('s2_cell_id', 'uint64'), ('cell_timestamp_ms', 'int64')]
+
+# table name -> (full name of the proto message, key of the message in the
+# inventory_item_data dict). Every row starts with the INVENTORY_COLUMNS
+INVENTORY_TABLES = {
+    'inventory_pokemon': ('POGOProtos.Data.PokemonData', 'pokemon_data'),
+    'inventory_items': ('POGOProtos.Inventory.Item.ItemData', 'item'),
+    'inventory_candy': ('POGOProtos.Inventory.Candy', 'candy'),
+    'pokedex': ('POGOProtos.Data.PokedexEntry', 'pokedex_entry'),
+}
+INVENTORY_COLUMNS = [('modified_timestamp_ms', 'int64')]
+
+# FieldDescriptor.TYPE_* -> column type
+FIELD_TYPES = {
+    1: 'float64',   # double
+    2: 'float32',   # float
+    3: 'int64',     # int64
+    4: 'uint64',    # uint64
+    5: 'int32',     # int32
+    6: 'uint64',    # fixed64
+    7: 'uint32',    # fixed32
+    8: 'bool',      # bool
+    9: 'string',    # string
+    12: 'binary',   # bytes
+    13: 'uint32',   # uint32
+    14: 'int32',    # enum
+    15: 'int32',    # sfixed32
+    16: 'int64',    # sfixed64
+    17: 'int32',    # sint32
+    18: 'int64',    # sint64
+}
+
+DEFAULT_VALUES = {
+    'float64': 0.0,
+    'float32': 0.0,
+    'bool': False,
+    'string': u'',
+    'binary': b'',
+}
+
+FORMATS = ('parquet', 'arrow', 'csv')
+FILE_EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow', 'csv': '.csv.gz'}
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        return None
+
+def get_default_format():
+    return 'parquet' if _import_pyarrow() is not None else 'csv'
+
+# [(column name, column type, path into the message dict), ..]
+def get_message_columns(full_name, max_depth = 2):
+    descriptor = proto_loader.get_message_class(full_name).DESCRIPTOR
+
+    columns = []
+    def add(descriptor, prefix, path, depth):
+        for field in descriptor.fields:
+            if field.label == field.LABEL_REPEATED:
+                continue
+            if field.message_type is not None:
+                if depth < max_depth:
+                    add(field.message_type, prefix + field.name + '_', path + (field.name,), depth + 1)
+                continue
+            columns.append((prefix + field.name, FIELD_TYPES[field.type], path + (field.name,)))
+
+    add(descriptor, '', (), 0)
+    return columns
+
+def _get_value(record, path, column_type):
+    value = record
+    for key in path:
+        value = value.get(key) if isinstance(value, dict) else None
+        if value is None:
+            return DEFAULT_VALUES.get(column_type, 0)
+
+    # protobuf_to_dict returns bytes fields base64 encoded
+    if column_type == 'binary' and not isinstance(value, bytes):
+        value = base64.b64decode(value)
+    return value
+
+class TableWriter:
+
+    def __init__(self, filename, columns, batch_size = 10000):
+        self.log = logging.getLogger(__name__)
+
+        self.filename = filename
+        self.columns = columns
+        self.batch_size = batch_size
+        self.rows = 0
+
+        self._buffer = [[] for column in columns]
+        self._buffered = 0
+
+    def append(self, values):
+        for (column, value) in zip(self._buffer, values):
+            column.append(value)
+        self._buffered += 1
+        self.rows += 1
+        if self._buffered >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffered:
+            self._write_batch(self._buffer)
+            self._buffer = [[] for column in self.columns]
+            self._buffered = 0
+
+    def close(self):
+        self.flush()
+        self._close()
+        self.log.debug('Wrote %s rows to %s', self.rows, self.filename)
+
+    def _write_batch(self, columns):
+        raise NotImplementedError()
+
+    def _close(self):
+        raise NotImplementedError()
+
+class ArrowTableWriter(TableWriter):
+
+    def __init__(self, filename, columns, batch_size = 10000, file_format = 'parquet', compression = None):
+        TableWriter.__init__(self, filename, columns, batch_size)
+
+        pa = _import_pyarrow()
+        if pa is None:
+            raise ImportError('pyarrow is required for the {} format'.format(file_format))
+        self._pa = pa
+
+        types = {
+            'float64': pa.float64(), 'float32': pa.float32(),
+            'int64': pa.int64(), 'uint64': pa.uint64(), 'int32': pa.int32(), 'uint32': pa.uint32(),
+            'bool': pa.bool_(), 'string': pa.string(), 'binary': pa.binary(),
+        }
+        self._schema = pa.schema([pa.field(name, types[column_type]) for (name, column_type) in columns])
+
+        if file_format == 'parquet':
+            import pyarrow.parquet
+            self._writer = pyarrow.parquet.ParquetWriter(filename, self._schema, compression=compression or 'snappy')
+        else:
+            import pyarrow.ipc
+            options = pyarrow.ipc.IpcWriteOptions(compression=compression or 'zstd')
+            self._writer = pyarrow.ipc.new_file(filename, self._schema, options=options)
+
+    def _write_batch(self, columns):
+        arrays = [self._pa.array(values, type=field.type) for (values, field) in zip(columns, self._schema)]
+        batch = self._pa.RecordBatch.from_arrays(arrays, schema=self._schema)
+        if hasattr(self._writer, 'write_batch'):
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write_table(self._pa.Table.from_batches([batch]))
+
+    def _close(self):
+        self._writer.close()
+
+class CsvTableWriter(TableWriter):
+
+    def __init__(self, filename, columns, batch_size = 10000):
+        TableWriter.__init__(self, filename, columns, batch_size)
+
+        if six.PY3:
+            self._file = gzip.open(filename, 'wt', newline='', encoding='utf-8')
+        else:
+            self._file = gzip.open(filename, 'wb')
+        self._writer = csv.writer(self._file)
+        # the header carries the column types, e.g. "cp:int32"
+        self._writer.writerow(['{}:{}'.format(name, column_type) for (name, column_type) in columns])
+
+    def _write_batch(self, columns):
+        binary = [i for (i, (name, column_type)) in enumerate(self.columns) if column_type == 'binary']
+        rows = list(zip(*columns))
+        if binary:
+            rows = [[base64.b64encode(value).decode('ascii') if i in binary else value for (i, value) in enumerate(row)] for row in rows]
+        elif six.PY2:
+            rows = [[value.encode('utf-8') if isinstance(value, six.text_type) else value for value in row] for row in rows]
+        self._writer.writerows(rows)
+
+    def _close(self):
+        self._file.close()
+
+def open_table_writer(filename, columns, file_format = None, batch_size = 10000):
+    file_format = file_format or get_default_format()
+    if file_format not in FORMATS:
+        raise ValueError('Unknown export format {}, available: {}'.format(file_format, ', '.join(FORMATS)))
+
+    if file_format != 'csv' and _import_pyarrow() is None:
+        log.warning('pyarrow is not installed - falling back to csv for %s', filename)
+        file_format = 'csv'
+        filename = os.path.splitext(filename)[0] + FILE_EXTENSIONS['csv']
+
+    if file_format == 'csv':
+        return CsvTableWriter(filename, columns, batch_size)
+    return ArrowTableWriter(filename, columns, batch_size, file_format)
+
+class ScanExporter:
+
+    def __init__(self, directory, file_format = None, batch_size = 10000):
+        self.log = logging.getLogger(__name__)
+
+        self._directory = directory
+        self._file_format = file_format or get_default_format()
+        self._batch_size = batch_size
+
+        # table name -> (writer, [(column name, type, path), ..])
+        self._tables = {}
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _get_table(self, table, full_name, extra_columns):
+        if table not in self._tables:
+            message_columns = get_message_columns(full_name)
+            columns = extra_columns + [(name, column_type) for (name, column_type, path) in message_columns]
+
+            filename = os.path.join(self._directory, table + FILE_EXTENSIONS[self._file_format])
+            writer = open_table_writer(filename, columns, self._file_format, self._batch_size)
+            self._tables[table] = (writer, message_columns)
+        return self._tables[table]
+
+    def _append(self, table, full_name, extra_columns, extra_values, record):
+        writer, message_columns = self._get_table(table, full_name, extra_columns)
+        writer.append(list(extra_values) + [_get_value(record, path, column_type) for (name, column_type, path) in message_columns])
+
+    def add_map_objects(self, map_objects):
+        for cell in map_objects.get('map_cells', []):
+            extra_values = (cell.get('s2_cell_id', 0), cell.get('current_timestamp_ms', 0))
+            for (table, (full_name, key)) in sorted(MAP_TABLES.items()):
+                for record in cell.get(key, []):
+                    self._append(table, full_name, MAP_COLUMNS, extra_values, record)
+
+    def add_inventory(self, inventory):
+        for item in inventory.get('inventory_delta', {}).get('inventory_items', []):
+            item_data = item.get('inventory_item_data', {})
+            extra_values = (item.get('modified_timestamp_ms', 0),)
+            for (table, (full_name, key)) in sorted(INVENTORY_TABLES.items()):
+                if key in item_data:
+                    self._append(table, full_name, INVENTORY_COLUMNS, extra_values, item_data[key])
+
+    # exports every GET_MAP_OBJECTS and GET_INVENTORY sub response of a response dict
+    def add_response(self, response_dict):
+        if not response_dict:
+            return
+
+        entries = response_dict.get('responses_list')
+        if entries is None:
+            entries = [{'request_type': name, 'response': response} for (name, response) in response_dict.get('responses', {}).items()]
+
+        for entry in entries:
+            if not isinstance(entry['response'], dict):
+                continue
+            if entry['request_type'] == 'GET_MAP_OBJECTS':
+                self.add_map_objects(entry['response'])
+            elif entry['request_type'] == 'GET_INVENTORY':
+                self.add_inventory(entry['response'])
+
+    def get_row_counts(self):
+        return dict((table, writer.rows) for (table, (writer, columns)) in self._tables.items())
+
+    def close(self):
+        for (writer, columns) in self._tables.values():
+            writer.close()
+        self._tables = {}
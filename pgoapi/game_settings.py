@@ -0,0 +1,246 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import re
+import logging
+
+from pgoapi.protobuf_to_dict import dict_to_protobuf
+from pgoapi import proto_loader
+
+class GameSettings:
+
+    DEFAULT_HASH = '05daf51635c82611d1aac95c0b051d3ec088a930'
+
+    # parsed settings/templates shared by all instances, keyed by (cache dir, hash)
+    _loaded_settings = {}
+    _loaded_templates = {}
+
+    def __init__(self, cache_dir = None):
+        self.log = logging.getLogger(__name__)
+
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser('~'), '.pgoapi', 'settings')
+        self._cache_dir = cache_dir
+
+        self._hash = self._read_latest_hash()
+        self._settings = None
+        self._item_templates = None
+
+        self._pokemon_settings = None
+        self._move_settings = None
+        self._item_settings = None
+
+    def get_cache_dir(self):
+        return self._cache_dir
+
+    def get_hash(self):
+        # a hash without the cached settings would keep the server from ever
+        # sending them, e.g. when only the settings file was deleted
+        if self._hash and self.has_settings():
+            return self._hash
+        return self.DEFAULT_HASH
+
+    def has_settings(self):
+        return self._get_settings_response() is not None
+
+    def has_item_templates(self):
+        return self._get_item_templates_response() is not None
+
+    def get_settings(self):
+        response = self._get_settings_response()
+        if response is None:
+            return None
+        return response.settings
+
+    def get_item_templates(self):
+        response = self._get_item_templates_response()
+        if response is None:
+            return []
+        return response.item_templates
+
+    def get_pokemon_settings(self, pokemon_id):
+        self._build_tables()
+        return self._pokemon_settings.get(int(pokemon_id))
+
+    def get_move_settings(self, move_id):
+        self._build_tables()
+        return self._move_settings.get(int(move_id))
+
+    def get_item_settings(self, item_id):
+        self._build_tables()
+        return self._item_settings.get(int(item_id))
+
+    def get_pokemon_settings_table(self):
+        self._build_tables()
+        return self._pokemon_settings
+
+    def get_move_settings_table(self):
+        self._build_tables()
+        return self._move_settings
+
+    def get_item_settings_table(self):
+        self._build_tables()
+        return self._item_settings
+
+    def update_from_response(self, response_dict):
+        DownloadSettingsResponse = proto_loader.get_message_class('POGOProtos.Networking.Responses.DownloadSettingsResponse')
+        DownloadItemTemplatesResponse = proto_loader.get_message_class('POGOProtos.Networking.Responses.DownloadItemTemplatesResponse')
+
+        if not isinstance(response_dict, dict) or not isinstance(response_dict.get('responses'), dict):
+            return
+
+        responses = response_dict['responses']
+
+        settings = responses.get('DOWNLOAD_SETTINGS')
+        if isinstance(settings, dict) and settings.get('hash'):
+            new_hash = settings['hash']
+            if not self._is_valid_hash(new_hash):
+                self.log.warning('Ignoring settings with unexpected hash: %s', new_hash)
+            elif 'settings' in settings:
+                self.log.debug('Received game settings with hash %s', new_hash)
+                response = dict_to_protobuf(DownloadSettingsResponse, settings, strict=False)
+                self._set_hash(new_hash)
+                self._store('download_settings', response, self._loaded_settings)
+                self._settings = response
+            elif new_hash != self._hash:
+                self.log.debug('Server reported settings hash %s without settings', new_hash)
+
+        templates = responses.get('DOWNLOAD_ITEM_TEMPLATES')
+        if isinstance(templates, dict) and templates.get('success'):
+            self.log.debug('Received %s item templates', len(templates.get('item_templates', [])))
+            response = dict_to_protobuf(DownloadItemTemplatesResponse, templates, strict=False)
+            if self._hash:
+                self._store('item_templates', response, self._loaded_templates)
+            self._item_templates = response
+            self._pokemon_settings = self._move_settings = self._item_settings = None
+
+    def _get_settings_response(self):
+        DownloadSettingsResponse = proto_loader.get_message_class('POGOProtos.Networking.Responses.DownloadSettingsResponse')
+
+        if self._settings is None and self._hash:
+            self._settings = self._load('download_settings', DownloadSettingsResponse, self._loaded_settings)
+        return self._settings
+
+    def _get_item_templates_response(self):
+        DownloadItemTemplatesResponse = proto_loader.get_message_class('POGOProtos.Networking.Responses.DownloadItemTemplatesResponse')
+
+        if self._item_templates is None and self._hash:
+            self._item_templates = self._load('item_templates', DownloadItemTemplatesResponse, self._loaded_templates)
+        return self._item_templates
+
+    def _build_tables(self):
+        if self._pokemon_settings is not None:
+            return
+
+        pokemon_settings, move_settings, item_settings = {}, {}, {}
+        for template in self.get_item_templates():
+            if template.HasField('pokemon_settings'):
+                pokemon_settings[template.pokemon_settings.pokemon_id] = template.pokemon_settings
+            elif template.HasField('move_settings'):
+                move_settings[template.move_settings.movement_id] = template.move_settings
+            elif template.HasField('item_settings'):
+                item_settings[template.item_settings.item_id] = template.item_settings
+
+        self._pokemon_settings, self._move_settings, self._item_settings = pokemon_settings, move_settings, item_settings
+
+    def _is_valid_hash(self, value):
+        return re.match('^[0-9a-zA-Z]+$', value) is not None
+
+    def _set_hash(self, new_hash):
+        if new_hash == self._hash:
+            return
+
+        self._hash = new_hash
+        self._settings = None
+        self._item_templates = None
+        self._pokemon_settings = self._move_settings = self._item_settings = None
+
+        try:
+            self._write_file('latest_hash', new_hash.encode('ascii'))
+        except (IOError, OSError) as e:
+            self.log.warning('Could not write settings hash to cache: %s', str(e))
+
+    def _read_latest_hash(self):
+        try:
+            with open(os.path.join(self._cache_dir, 'latest_hash'), 'rb') as f:
+                value = f.read().decode('ascii').strip()
+        except (IOError, OSError, UnicodeDecodeError):
+            return None
+
+        if value and self._is_valid_hash(value):
+            return value
+        return None
+
+    def _load(self, kind, proto_class, loaded):
+        key = (self._cache_dir, kind, self._hash)
+        if key in loaded:
+            return loaded[key]
+
+        try:
+            with open(os.path.join(self._cache_dir, '{}_{}.bin'.format(kind, self._hash)), 'rb') as f:
+                data = f.read()
+        except (IOError, OSError):
+            return None
+
+        response = proto_class()
+        try:
+            response.ParseFromString(data)
+        except Exception as e:
+            self.log.warning('Ignoring corrupt %s cache file: %s', kind, str(e))
+            return None
+
+        self.log.debug('Loaded %s for hash %s from cache', kind, self._hash)
+        loaded[key] = response
+        return response
+
+    def _store(self, kind, response, loaded):
+        loaded[(self._cache_dir, kind, self._hash)] = response
+        try:
+            self._write_file('{}_{}.bin'.format(kind, self._hash), response.SerializeToString())
+        except (IOError, OSError) as e:
+            self.log.warning('Could not write %s to cache: %s', kind, str(e))
+
+    def _write_file(self, name, data):
+        if not os.path.isdir(self._cache_dir):
+            os.makedirs(self._cache_dir)
+
+        path = os.path.join(self._cache_dir, name)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+
+        # replace the old file in one step, a crash leaves either version
+        if hasattr(os, 'replace'):
+            os.replace(tmp_path, path)
+        else:
+            try:
+                os.rename(tmp_path, path)
+            except OSError:
+                # python 2 on windows can not rename over an existing file
+                os.remove(path)
+                os.rename(tmp_path, path)
@@ -0,0 +1,174 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import io
+import json
+import time
+import logging
+import threading
+
+class Geocoder:
+
+    def __init__(self):
+        self.log = logging.getLogger(__name__)
+
+    # returns (latitude, longitude, altitude) or None
+    def geocode(self, location_name):
+        raise NotImplementedError()
+
+class GoogleGeocoder(Geocoder):
+
+    def __init__(self, timeout = 10):
+        Geocoder.__init__(self)
+
+        self._timeout = timeout
+        self._geolocator = None
+
+    def geocode(self, location_name):
+        if self._geolocator is None:
+            from geopy.geocoders import GoogleV3
+            self._geolocator = GoogleV3()
+
+        loc = self._geolocator.geocode(location_name, timeout=self._timeout)
+        if not loc:
+            return None
+
+        self.log.info("Location for '%s' found: %s", location_name, loc.address)
+        return (loc.latitude, loc.longitude, loc.altitude)
+
+class StaticGeocoder(Geocoder):
+
+    def __init__(self, locations):
+        Geocoder.__init__(self)
+
+        # location name -> (latitude, longitude, altitude)
+        self._locations = dict((name.strip().lower(), tuple(position)) for (name, position) in locations.items())
+
+    def geocode(self, location_name):
+        return self._locations.get(location_name.strip().lower())
+
+class GeocodeCache:
+
+    DEFAULT_TTL = 30 * 24 * 60 * 60
+
+    def __init__(self, cache_file = None, ttl = DEFAULT_TTL):
+        self.log = logging.getLogger(__name__)
+
+        if cache_file is None:
+            cache_file = os.path.join(os.path.expanduser('~'), '.pgoapi', 'geocode_cache.json')
+        self._cache_file = cache_file
+        self._ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def get(self, location_name):
+        with self._lock:
+            entry = self._get_entries().get(self._key(location_name))
+
+        if entry is None:
+            return None
+
+        latitude, longitude, altitude, timestamp = entry
+        if self._ttl is not None and time.time() - timestamp > self._ttl:
+            self.log.debug("Cached location for '%s' expired", location_name)
+            return None
+
+        return (latitude, longitude, altitude)
+
+    def set(self, location_name, position):
+        latitude, longitude, altitude = position
+        with self._lock:
+            self._get_entries()[self._key(location_name)] = [latitude, longitude, altitude, time.time()]
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+    def _key(self, location_name):
+        return location_name.strip().lower()
+
+    def _get_entries(self):
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with io.open(self._cache_file, encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (IOError, OSError):
+                pass
+            except ValueError as e:
+                self.log.warning('Ignoring corrupt geocode cache %s: %s', self._cache_file, str(e))
+        return self._entries
+
+    def _save(self):
+        try:
+            cache_dir = os.path.dirname(self._cache_file)
+            if cache_dir and not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+
+            tmp_file = '{}.{}.tmp'.format(self._cache_file, os.getpid())
+            with open(tmp_file, 'w') as f:
+                json.dump(self._entries, f)
+
+            # replace the old file in one step, readers see either version
+            if hasattr(os, 'replace'):
+                os.replace(tmp_file, self._cache_file)
+            else:
+                try:
+                    os.rename(tmp_file, self._cache_file)
+                except OSError:
+                    # python 2 on windows can not rename over an existing file
+                    os.remove(self._cache_file)
+                    os.rename(tmp_file, self._cache_file)
+        except (IOError, OSError) as e:
+            self.log.warning('Could not write geocode cache %s: %s', self._cache_file, str(e))
+
+_default_geocoder = None
+_default_cache = None
+
+def get_default_geocoder():
+    global _default_geocoder
+    if _default_geocoder is None:
+        _default_geocoder = GoogleGeocoder()
+    return _default_geocoder
+
+def set_default_geocoder(geocoder):
+    global _default_geocoder
+    _default_geocoder = geocoder
+
+def get_default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = GeocodeCache()
+    return _default_cache
+
+def set_default_cache(cache):
+    global _default_cache
+    _default_cache = cache
@@ -0,0 +1,54 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+# Base class for RPC hooks, see PGoApi.add_hook(). Subclasses override the
+# phases they are interested in, e.g. to open and close tracing spans.
+#
+# Every method gets the context of the current RPC, which is the dict returned
+# by RpcApi.get_rpc_stats(): 'request_id', 'endpoint', 'subrequests',
+# 'request_types' and the 'timings' (in seconds) of the phases finished so far.
+# Exceptions raised by a hook are logged and do not affect the RPC.
+class RpcHook(object):
+
+    def before_build(self, context):
+        pass
+
+    def after_serialize(self, context, request_data):
+        pass
+
+    def before_send(self, context):
+        pass
+
+    def after_receive(self, context, http_response):
+        pass
+
+    def after_parse(self, context, response_dict):
+        pass
+
+    def on_error(self, context, exception):
+        pass
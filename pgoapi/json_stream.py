@@ -0,0 +1,210 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import io
+import json
+import base64
+
+import six
+
+from google.protobuf import message
+from google.protobuf.descriptor import FieldDescriptor
+
+# Streaming JSON serializer for response dicts and protobuf messages.
+#
+# Documents are written in chunks while they are walked, so the serialized
+# form of a large inventory or scan is never held in memory as a whole.
+# Protobuf messages are serialized field by field without converting them to
+# a dict first. bytes (and bytes fields of messages) are written as base64
+# strings; on python 2 str is treated as text.
+#
+#   with open('inventory.json', 'w') as f:
+#       dump(response_dict, f, indent=4)
+#
+#   writer = JSONStreamWriter(sock)         # NDJSON, one document per line
+#   for response_dict in responses:
+#       writer.write_line(response_dict)
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+def _encode_bytes(value):
+    return '"' + base64.b64encode(value).decode('ascii') + '"'
+
+def _encode_scalar(value):
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if isinstance(value, six.text_type):
+        return _encode_string(value)
+    if six.PY3 and isinstance(value, bytes):
+        return _encode_bytes(value)
+    if isinstance(value, six.string_types):
+        return _encode_string(value)
+    if isinstance(value, six.integer_types):
+        return str(int(value)) if six.PY3 else str(value).rstrip('L')
+    if isinstance(value, float):
+        return json.dumps(value)
+    raise TypeError('{!r} is not JSON serializable'.format(value))
+
+def _get_message_items(msg):
+    for (field, value) in msg.ListFields():
+        if field.type == FieldDescriptor.TYPE_BYTES:
+            if field.label == FieldDescriptor.LABEL_REPEATED:
+                value = [_BytesValue(v) for v in value]
+            else:
+                value = _BytesValue(value)
+        yield field.name, value
+
+class _BytesValue:
+    # marks bytes of message fields, which are base64 encoded on python 2 as well
+    def __init__(self, value):
+        self.value = value
+
+def iter_json(obj, indent = None, sort_keys = False, level = 0):
+    if isinstance(obj, _BytesValue):
+        yield _encode_bytes(obj.value)
+        return
+
+    if isinstance(obj, (dict, message.Message)):
+        if isinstance(obj, dict):
+            items = obj.items()
+            if sort_keys:
+                items = sorted(items, key=lambda item: str(item[0]))
+        else:
+            items = _get_message_items(obj)
+            if sort_keys:
+                items = sorted(items)
+
+        first = True
+        for (key, value) in items:
+            if first:
+                yield '{'
+                first = False
+            else:
+                yield ','
+            if indent is not None:
+                yield '\n' + ' ' * (indent * (level + 1))
+            if not isinstance(key, six.string_types):
+                key = str(key).lower() if isinstance(key, bool) else str(key)
+            yield _encode_string(key)
+            yield ': ' if indent is not None else ':'
+            for chunk in iter_json(value, indent, sort_keys, level + 1):
+                yield chunk
+
+        if first:
+            yield '{}'
+        else:
+            if indent is not None:
+                yield '\n' + ' ' * (indent * level)
+            yield '}'
+        return
+
+    if isinstance(obj, (list, tuple)) or (hasattr(obj, '__iter__') and hasattr(obj, '__len__') and not isinstance(obj, (six.string_types, bytes))):
+        first = True
+        for value in obj:
+            if first:
+                yield '['
+                first = False
+            else:
+                yield ','
+            if indent is not None:
+                yield '\n' + ' ' * (indent * (level + 1))
+            for chunk in iter_json(value, indent, sort_keys, level + 1):
+                yield chunk
+
+        if first:
+            yield '[]'
+        else:
+            if indent is not None:
+                yield '\n' + ' ' * (indent * level)
+            yield ']'
+        return
+
+    yield _encode_scalar(obj)
+
+class JSONStreamWriter:
+
+    # fp is a text or binary file object or a socket
+    def __init__(self, fp, indent = None, sort_keys = False, buffer_size = 65536):
+        self._indent = indent
+        self._sort_keys = sort_keys
+        self._buffer_size = buffer_size
+
+        self._buffer = []
+        self._buffered = 0
+
+        if hasattr(fp, 'sendall') and not hasattr(fp, 'write'):
+            self._write = lambda data: fp.sendall(data.encode('utf-8'))
+        elif isinstance(fp, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(fp, 'mode', ''):
+            self._write = lambda data: fp.write(data.encode('utf-8'))
+        else:
+            self._write = fp.write
+        self._fp = fp
+
+    def _add(self, chunk):
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered >= self._buffer_size:
+            self.flush()
+
+    def write(self, obj):
+        for chunk in iter_json(obj, self._indent, self._sort_keys):
+            self._add(chunk)
+
+    # NDJSON: one compact document per line
+    def write_line(self, obj):
+        for chunk in iter_json(obj, None, self._sort_keys):
+            self._add(chunk)
+        self._add('\n')
+
+    def flush(self):
+        if self._buffer:
+            self._write(''.join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+        if hasattr(self._fp, 'flush'):
+            self._fp.flush()
+
+def dump(obj, fp, indent = None, sort_keys = False):
+    writer = JSONStreamWriter(fp, indent, sort_keys)
+    writer.write(obj)
+    if indent is not None:
+        writer._add('\n')
+    writer.flush()
+
+def dump_lines(objs, fp, sort_keys = False):
+    writer = JSONStreamWriter(fp, sort_keys = sort_keys)
+    for obj in objs:
+        writer.write_line(obj)
+    writer.flush()
+
+def dumps(obj, indent = None, sort_keys = False):
+    return ''.join(iter_json(obj, indent, sort_keys))
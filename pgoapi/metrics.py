@@ -0,0 +1,213 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import logging
+import threading
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HELP = {
+    'pgoapi_rpc_seconds': 'Total duration of RpcApi.request',
+    'pgoapi_rpc_phase_seconds': 'Duration of the build, serialize, http, decode, parse and convert phases of a RPC',
+    'pgoapi_subresponse_seconds': 'Duration of parsing and converting a single sub response',
+    'pgoapi_rpc_request_bytes': 'Size of the serialized RequestEnvelope',
+    'pgoapi_rpc_response_bytes': 'Size of the raw ResponseEnvelope',
+    'pgoapi_rpc_status_total': 'Count of RPCs by HTTP and envelope status code (empty without envelope)',
+    'pgoapi_rpc_exceptions_total': 'Count of RPCs that raised an exception',
+}
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def get_cumulative_counts(self):
+        total, result = 0, []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+class Metrics:
+
+    def __init__(self):
+        self.log = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, value, buckets = TIME_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, value = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+    def record_rpc(self, stats):
+        # label by the distinct request types only, a chain of 40 releases and
+        # one of 3 releases share the series and the order does not matter,
+        # per request type durations are in pgoapi_subresponse_seconds
+        request = ','.join(sorted(set(stats['request_types'])))
+
+        if stats['exception']:
+            self.inc('pgoapi_rpc_exceptions_total', request=request, exception=stats['exception'])
+
+        for (phase, seconds) in stats['timings'].items():
+            if phase == 'total':
+                self.observe('pgoapi_rpc_seconds', seconds, request=request)
+            else:
+                self.observe('pgoapi_rpc_phase_seconds', seconds, phase=phase, request=request)
+
+        for (request_type, seconds) in stats['subresponse_timings']:
+            self.observe('pgoapi_subresponse_seconds', seconds, request_type=request_type)
+
+        if stats['request_bytes'] is not None:
+            self.observe('pgoapi_rpc_request_bytes', stats['request_bytes'], SIZE_BUCKETS, request=request)
+        if stats['response_bytes'] is not None:
+            self.observe('pgoapi_rpc_response_bytes', stats['response_bytes'], SIZE_BUCKETS, request=request)
+
+        # status_code is empty when there is no parsed envelope, e.g. on HTTP errors
+        if stats['http_status'] is not None:
+            status_code = str(stats['status_code']) if stats['status_code'] is not None else ''
+            self.inc('pgoapi_rpc_status_total', request=request, http_status=str(stats['http_status']), status_code=status_code)
+
+    # {name: [{'labels': {...}, 'count': .., 'sum': .., 'buckets': [(le, cumulative count), ..]}, ..]}
+    def get_snapshot(self):
+        snapshot = {}
+        with self._lock:
+            for ((name, labels), histogram) in self._histograms.items():
+                snapshot.setdefault(name, []).append({
+                    'labels': dict(labels),
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'buckets': list(zip(histogram.buckets, histogram.get_cumulative_counts())),
+                })
+            for ((name, labels), value) in self._counters.items():
+                snapshot.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+        return snapshot
+
+    def to_prometheus(self):
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        lines = []
+        last_name = None
+        for ((name, labels), histogram) in histograms:
+            if name != last_name:
+                self._add_header(lines, name, 'histogram')
+                last_name = name
+            for (bound, count) in zip(histogram.buckets, histogram.get_cumulative_counts()):
+                lines.append('{}_bucket{} {}'.format(name, _format_labels(labels + (('le', _format_value(bound)),)), count))
+            lines.append('{}_bucket{} {}'.format(name, _format_labels(labels + (('le', '+Inf'),)), histogram.count))
+            lines.append('{}_sum{} {}'.format(name, _format_labels(labels), _format_value(histogram.sum)))
+            lines.append('{}_count{} {}'.format(name, _format_labels(labels), histogram.count))
+
+        for ((name, labels), value) in counters:
+            if name != last_name:
+                self._add_header(lines, name, 'counter')
+                last_name = name
+            lines.append('{}{} {}'.format(name, _format_labels(labels), _format_value(value)))
+
+        return '\n'.join(lines) + '\n'
+
+    def _add_header(self, lines, name, metric_type):
+        if name in HELP:
+            lines.append('# HELP {} {}'.format(name, HELP[name]))
+        lines.append('# TYPE {} {}'.format(name, metric_type))
+
+    def start_http_server(self, port, host = ''):
+        from six.moves.BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+        metrics = self
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                output = metrics.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(output)))
+                self.end_headers()
+                self.wfile.write(output)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = HTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        self.log.info('Serving metrics on port %s', server.server_port)
+        return server
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for (k, v) in labels) + '}'
+
+_default_metrics = None
+
+def get_default_metrics():
+    return _default_metrics
+
+def set_default_metrics(metrics):
+    global _default_metrics
+    _default_metrics = metrics
+
+def enable():
+    if _default_metrics is None:
+        set_default_metrics(Metrics())
+    return _default_metrics
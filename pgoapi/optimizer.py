@@ -0,0 +1,131 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import json
+import logging
+
+from pgoapi import pokedex
+from pgoapi import proto_loader
+
+log = logging.getLogger(__name__)
+
+IV_SUM_MAX = 45.0
+
+POKEMON_COLUMNS = ['nickname', 'move_1', 'move_2', 'pokemon_id', 'individual_defense', 'stamina', 'cp', 'individual_stamina', 'individual_attack']
+
+class GameDataTables:
+
+    def __init__(self, pokemon_names = None, move_names = None):
+        self.log = logging.getLogger(__name__)
+
+        # id -> name, every lookup is a single dict access
+        self._pokemon_names = pokemon_names or {}
+        self._move_names = move_names or {}
+
+    def get_pokemon_name(self, pokemon_id):
+        name = self._pokemon_names.get(pokemon_id)
+        if name is None:
+            name = pokedex.get_pokemon_name(pokemon_id)
+            self._pokemon_names[pokemon_id] = name
+        return name
+
+    def get_move_name(self, move_id):
+        name = self._move_names.get(move_id)
+        if name is None:
+            name = _enum_name(proto_loader.get_enum('POGOProtos.Enums.PokemonMove'), move_id)
+            self._move_names[move_id] = name
+        return name
+
+    def get_pokemon_names(self):
+        return self._pokemon_names
+
+    def get_move_names(self):
+        return self._move_names
+
+def load_tables_from_json(pokemon_path, moves_path):
+    with open(pokemon_path) as data_file:
+        pokemon = json.load(data_file)
+
+    with open(moves_path) as data_file:
+        moves = json.load(data_file)
+
+    pokemon_names = dict((int(entry['Number']), entry['Name']) for entry in pokemon)
+    move_names = dict((int(entry['id']), entry['name']) for entry in moves)
+
+    log.debug('Loaded %s pokemon and %s moves from json', len(pokemon_names), len(move_names))
+    return GameDataTables(pokemon_names, move_names)
+
+def load_tables_from_settings(game_settings):
+    pokemon_names = dict((pokemon_id, pokedex.get_pokemon_name(pokemon_id)) for pokemon_id in game_settings.get_pokemon_settings_table())
+    PokemonMove = proto_loader.get_enum('POGOProtos.Enums.PokemonMove')
+    move_names = dict((move_id, _enum_name(PokemonMove, move_id)) for move_id in game_settings.get_move_settings_table())
+
+    log.debug('Loaded %s pokemon and %s moves from game settings', len(pokemon_names), len(move_names))
+    return GameDataTables(pokemon_names, move_names)
+
+def get_inventory_pokemon(response_dict):
+    try:
+        inventory_items = response_dict['responses']['GET_INVENTORY']['inventory_delta']['inventory_items']
+    except (KeyError, TypeError):
+        return []
+
+    all_pokemon = []
+    for item in inventory_items:
+        pokemon_data = item.get('inventory_item_data', {}).get('pokemon_data')
+        if pokemon_data is not None and 'is_egg' not in pokemon_data:
+            all_pokemon.append(pokemon_data)
+
+    return all_pokemon
+
+def get_power_quotients(pokemon_list):
+    return [round(((pokemon.get('individual_defense', 0) + pokemon.get('individual_attack', 0) + pokemon.get('individual_stamina', 0)) / IV_SUM_MAX) * 100)
+            for pokemon in pokemon_list]
+
+def rank_pokemon(pokemon_list, tables):
+    get_pokemon_name = tables.get_pokemon_name
+    get_move_name = tables.get_move_name
+
+    rows = []
+    for pokemon, power_quotient in zip(pokemon_list, get_power_quotients(pokemon_list)):
+        row = dict((k, v) for k, v in pokemon.items() if k in POKEMON_COLUMNS)
+        row['individual_defense'] = row.get('individual_defense', 0)
+        row['individual_attack'] = row.get('individual_attack', 0)
+        row['individual_stamina'] = row.get('individual_stamina', 0)
+        row['power_quotient'] = power_quotient
+        row['name'] = get_pokemon_name(row.get('pokemon_id', 0))
+        row['move_1'] = get_move_name(row.get('move_1', 0))
+        row['move_2'] = get_move_name(row.get('move_2', 0))
+        rows.append(row)
+
+    rows.sort(key=lambda x: x['power_quotient'], reverse=True)
+    return rows
+
+def _enum_name(enum_type, value):
+    try:
+        return enum_type.Name(value).replace('_', ' ').title()
+    except ValueError:
+        return str(value)
@@ -27,28 +27,42 @@ from __future__ import absolute_import
 
 import re
 import six
+import time
 import logging
-import requests
 
 from . import __title__, __version__, __copyright__
 from pgoapi.rpc_api import RpcApi
 from pgoapi.auth_ptc import AuthPtc
 from pgoapi.auth_google import AuthGoogle
-from pgoapi.exceptions import AuthException, NotLoggedInException, ServerBusyOrOfflineException, NoPlayerPositionSetException, EmptySubrequestChainException
-
-from . import protos
-from POGOProtos.Networking.Requests_pb2 import RequestType
+from pgoapi.game_settings import GameSettings
+from pgoapi.endpoints import EndpointManager
+from pgoapi.exceptions import AuthException, NotLoggedInException, ServerBusyOrOfflineException, NoPlayerPositionSetException, EmptySubrequestChainException, DeadlineExceededException
+from pgoapi import proto_loader
 
 logger = logging.getLogger(__name__)
 
+# redirects, endpoint failovers and ticket renewals of one call
+MAX_ENDPOINT_ATTEMPTS = 3
+
 class PGoApi:
 
-    def __init__(self):
+    def __init__(self, settings_cache_dir = None):
 
         self.set_logger()
 
         self._auth_provider = None
-        self._api_endpoint = 'https://pgorelease.nianticlabs.com/plfe/rpc'
+        self._endpoints = EndpointManager()
+
+        self._game_settings = GameSettings(settings_cache_dir)
+
+        self._metrics = None
+        self._hooks = []
+        self._session = None
+        self._decoder = None
+        self._scheduler = None
+        self._coalescer = None
+        self._cache = None
+        self._dump_sampler = None
 
         self._position_lat = None
         self._position_lng = None
@@ -60,7 +74,23 @@ class PGoApi:
         self.log = logger or logging.getLogger(__name__)
         
     def get_api_endpoint(self):
-        return self._api_endpoint
+        return self._endpoints.get_endpoint()
+
+    def set_api_endpoint(self, api_endpoint):
+        self._endpoints.set_endpoint(api_endpoint)
+
+    def get_endpoint_manager(self):
+        return self._endpoints
+
+    # e.g. EndpointManager(entry_endpoint) for another login endpoint
+    def set_endpoint_manager(self, endpoints):
+        self._endpoints = endpoints
+
+    def get_auth_provider(self):
+        return self._auth_provider
+
+    def set_auth_provider(self, auth_provider):
+        self._auth_provider = auth_provider
 
     def get_position(self):
         return (self._position_lat, self._position_lng, self._position_alt)
@@ -71,23 +101,92 @@ class PGoApi:
         self._position_lat = lat
         self._position_lng = lng
         self._position_alt = alt
+
+    def get_metrics(self):
+        return self._metrics
+
+    def set_metrics(self, metrics):
+        self._metrics = metrics
+
+    def add_hook(self, hook):
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def get_hooks(self):
+        return self._hooks
+
+    def get_session(self):
+        return self._session
+
+    def set_session(self, session):
+        self._session = session
+
+    def get_decoder(self):
+        return self._decoder
+
+    def set_decoder(self, decoder):
+        self._decoder = decoder
+
+    def get_scheduler(self):
+        return self._scheduler
+
+    def set_scheduler(self, scheduler):
+        self._scheduler = scheduler
+
+    def get_coalescer(self):
+        return self._coalescer
+
+    # merges direct calls of several threads into shared RPCs, see RequestCoalescer
+    def set_coalescer(self, coalescer):
+        self._coalescer = coalescer
+
+    def get_cache(self):
+        return self._cache
+
+    # answers repeated read-only calls from memory, see ResponseCache
+    def set_cache(self, cache):
+        self._cache = cache
+
+    def get_dump_sampler(self):
+        return self._dump_sampler
+
+    # limits the DEBUG dumps of requests and responses, see pgoapi.rpc_log
+    def set_dump_sampler(self, dump_sampler):
+        self._dump_sampler = dump_sampler
+
+    def get_game_settings(self):
+        return self._game_settings
+
+    def update_item_templates(self):
+        if self._game_settings.has_item_templates():
+            self.log.debug('Using cached item templates')
+            return True
+
+        response = self.download_item_templates()
+        self._game_settings.update_from_response(response)
+
+        return self._game_settings.has_item_templates()
         
     def create_request(self):    
-        request = PGoApiRequest(self._api_endpoint, self._auth_provider, self._position_lat, self._position_lng, self._position_alt)
+        request = PGoApiRequest(self._endpoints.get_endpoint(), self._auth_provider, self._position_lat, self._position_lng, self._position_alt, metrics = self._metrics, hooks = self._hooks, session = self._session, decoder = self._decoder, scheduler = self._scheduler, cache = self._cache, dump_sampler = self._dump_sampler, endpoints = self._endpoints)
         return request
 
     def __getattr__(self, func):
+        RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
     
-        def function(**kwargs):
+        def function(_priority = None, _deadline = None, **kwargs):
+            if self._coalescer is not None:
+                return self._coalescer.call(self, func, kwargs, _priority, _deadline)
+
             request = self.create_request()
             getattr(request, func)( _call_direct = True, **kwargs )
-            return request.call()
+            return request.call(priority = _priority, deadline = _deadline)
 
         if func.upper() in  RequestType.keys():
             return function
         else:
-            print func.upper()
-            print RequestType.keys()
             raise AttributeError
         
     def login(self, provider, username, password, lat = None, lng = None, alt = None, app_simulation = True):
@@ -123,9 +222,11 @@ class PGoApi:
             request.get_hatched_eggs()
             request.get_inventory()
             request.check_awarded_badges()
-            request.download_settings(hash="05daf51635c82611d1aac95c0b051d3ec088a930")
+            # the server only sends the full settings if our cached hash is outdated
+            request.download_settings(hash=self._game_settings.get_hash())
 
             response = request.call()
+            self._game_settings.update_from_response(response)
         else:
             self.log.info('Starting minimal RPC login sequence')
             response = self.get_player()
@@ -134,10 +235,10 @@ class PGoApi:
             self.log.info('Login failed!')
             return False
 
+        # a redirect (status code 53) was already followed by the request
         if 'api_url' in response:
-            self._api_endpoint = ('https://{}/rpc'.format(response['api_url']))
-            self.log.debug('Setting API endpoint to: %s', self._api_endpoint)
-        else:
+            self._endpoints.set_endpoint(self._endpoints.resolve(response['api_url']))
+        elif response.get('status_code') != 1:
             self.log.error('Login failed - unexpected server response!')
             return False
 
@@ -152,12 +253,20 @@ class PGoApi:
         
 
 class PGoApiRequest:
-    def __init__(self, api_endpoint, auth_provider, position_lat, position_lng, position_alt):
+    def __init__(self, api_endpoint, auth_provider, position_lat, position_lng, position_alt, metrics = None, hooks = None, session = None, decoder = None, scheduler = None, cache = None, dump_sampler = None, endpoints = None):
         self.log = logging.getLogger(__name__)
 
         """ Inherit necessary parameters """
         self._api_endpoint = api_endpoint
         self._auth_provider = auth_provider
+        self._metrics = metrics
+        self._hooks = hooks
+        self._session = session
+        self._decoder = decoder
+        self._scheduler = scheduler
+        self._cache = cache
+        self._dump_sampler = dump_sampler
+        self._endpoints = endpoints
 
         self._position_lat = position_lat
         self._position_lng = position_lng
@@ -165,7 +274,9 @@ class PGoApiRequest:
 
         self._req_method_list = []
 
-    def call(self):
+    # priority and deadline (a time.time() timestamp) are only used with a scheduler,
+    # the priority defaults to the one of the sub requests
+    def call(self, priority = None, deadline = None):
         if not self._req_method_list:
             raise EmptySubrequestChainException()
             
@@ -176,22 +287,114 @@ class PGoApiRequest:
             self.log.info('Not logged in')
             return NotLoggedInException()
 
-        request = RpcApi(self._auth_provider)
+        try:
+            if self._cache is not None:
+                response = self._cache.call(self._req_method_list, self.get_position(), lambda: self._execute(priority, deadline))
+            else:
+                response = self._execute(priority, deadline)
+        except DeadlineExceededException:
+            self._req_method_list = []
+            raise
+
+        # cleanup after call execution
+        self.log.debug('Cleanup of request!')
+        self._req_method_list = []
+
+        return response
 
-        self.log.info('Execution of RPC')
+    def _execute(self, priority, deadline):
+        if self._scheduler is not None and priority is None:
+            priority = self._scheduler.get_priority(self._req_method_list)
+
+        if self._endpoints is None:
+            self._acquire(priority, deadline)
+            return self._send(self._api_endpoint, self._session)
+
+        # every attempt below is a RPC of its own and takes a scheduler token
+        endpoint = self._endpoints.get_endpoint()
+        new_ticket = False
+        via_entry = False
+        for attempt in range(MAX_ENDPOINT_ATTEMPTS):
+            self._acquire(priority, deadline)
+
+            start = time.time()
+            try:
+                response = self._send(endpoint, self._session or self._endpoints.get_session(endpoint), raise_busy = True)
+            except ServerBusyOrOfflineException:
+                self._endpoints.record_failure(endpoint)
+                alternative = self._endpoints.get_endpoint()
+                if alternative == endpoint:
+                    self.log.info('Server seems to be busy or offline - try again!')
+                    return None
+                endpoint = alternative
+                continue
+            except NotLoggedInException:
+                # status code 102: the auth ticket is not valid on this endpoint. The
+                # token usually still is, the entry endpoint hands out a new ticket
+                # and endpoint without a full login
+                if new_ticket or not self._auth_provider.get_token():
+                    raise
+                self.log.info('Auth ticket rejected by %s - requesting a new one', endpoint)
+                new_ticket = True
+                self._auth_provider.set_ticket((None, None, None))
+                endpoint = self._endpoints.get_entry_endpoint()
+                continue
+
+            self._endpoints.record_success(endpoint, time.time() - start)
+
+            # status code 53: resend to the api_url of the account. A 53 is never
+            # returned to the caller, it has no responses
+            if isinstance(response, dict) and response.get('status_code') == 53 and response.get('api_url'):
+                redirect = self._endpoints.resolve(response['api_url'], endpoint)
+                if redirect != endpoint:
+                    self.log.debug('Redirected from %s to %s', endpoint, redirect)
+                    self._endpoints.set_endpoint(redirect)
+                    endpoint = redirect
+                    continue
+
+                # redirected to the endpoint we just used, ask the entry endpoint once
+                entry = self._endpoints.get_entry_endpoint()
+                if not via_entry and endpoint != entry:
+                    self.log.info('Redirect loop on %s - retrying via %s', endpoint, entry)
+                    via_entry = True
+                    endpoint = entry
+                    continue
+
+                self.log.warning('Server keeps redirecting to %s - giving up', endpoint)
+                return None
+            return response
+
+        self.log.warning('No response after %s attempts', MAX_ENDPOINT_ATTEMPTS)
+        return None
+
+    def _acquire(self, priority, deadline):
+        if self._scheduler is not None:
+            self._scheduler.acquire(priority, deadline)
+
+    def _send(self, endpoint, session, raise_busy = False):
+        request = RpcApi(self._auth_provider, self._metrics, self._hooks, session, self._decoder, self._dump_sampler)
+
+        self.log.debug('Execution of RPC')
         response = None
         try:
-            response = request.request(self._api_endpoint, self._req_method_list, self.get_position())
+            response = request.request(endpoint, self._req_method_list, self.get_position())
         except ServerBusyOrOfflineException as e:
+            if raise_busy:
+                raise
             self.log.info('Server seems to be busy or offline - try again!')
 
-        # cleanup after call execution
-        self.log.info('Cleanup of request!')
-        self._req_method_list = []
-
         return response
 
+    # adds a sub request prepared by pgoapi.prepared.PreparedRequest.bind()
+    def add_prepared(self, entry):
+        if not self._req_method_list:
+            self.log.debug('Creating a new request...')
+        self._req_method_list.append(entry)
+        return self
+
     def list_curr_methods(self):
+        RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+
         for i in self._req_method_list:
             print("{} ({})".format(RequestType.Name(i), i))
 
@@ -206,22 +409,23 @@ class PGoApiRequest:
         self._position_alt = alt
 
     def __getattr__(self, func):
+        RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+
         def function(**kwargs):
 
             if '_call_direct' in kwargs:
                 del kwargs['_call_direct']
-                self.log.info('Creating a new direct request...')
+                self.log.debug('Creating a new direct request...')
             elif not self._req_method_list:
-                self.log.info('Creating a new request...')
+                self.log.debug('Creating a new request...')
 
             name = func.upper()
             if kwargs:
                 self._req_method_list.append({RequestType.Value(name): kwargs})
-                self.log.info("Adding '%s' to RPC request including arguments", name)
-                self.log.debug("Arguments of '%s': \n\r%s", name, kwargs)
+                self.log.debug("Adding '%s' to RPC request including arguments: \n\r%s", name, kwargs)
             else:
                 self._req_method_list.append(RequestType.Value(name))
-                self.log.info("Adding '%s' to RPC request", name)
+                self.log.debug("Adding '%s' to RPC request", name)
 
             return self
 
@@ -0,0 +1,96 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import io
+import os
+import json
+import logging
+
+from pgoapi import proto_loader
+
+log = logging.getLogger(__name__)
+
+# optional localized names in the working directory, see Pokedex.load_names
+DEFAULT_NAMES_FILE = 'pokedex_names.json'
+
+class Pokedex:
+
+    def __init__(self, names_file = None):
+        self.log = logging.getLogger(__name__)
+
+        PokemonId = proto_loader.get_enum('POGOProtos.Enums.PokemonId')
+
+        # built once from the PokemonId enum, e.g. 29 -> 'Nidoran Female'
+        self._names = dict((value.number, value.name.replace('_', ' ').title())
+                           for value in PokemonId.DESCRIPTOR.values if value.number)
+
+        if names_file:
+            self.load_names(names_file)
+
+    def load_names(self, names_file):
+        # localized names as json object, e.g. {"1": "フシギダネ", "2": "フシギソウ"}
+        with io.open(names_file, encoding='utf-8') as f:
+            names = json.load(f)
+
+        count = 0
+        for (key, value) in names.items():
+            try:
+                self._names[int(key)] = value
+                count += 1
+            except ValueError:
+                self.log.warning('Ignoring invalid pokemon id in %s: %s', names_file, key)
+
+        self.log.debug('Loaded %s pokemon names from %s', count, names_file)
+
+    def get_name(self, pokemon_id):
+        try:
+            return self._names[int(pokemon_id)]
+        except (KeyError, ValueError, TypeError):
+            return str(pokemon_id)
+
+    def get_names(self):
+        return self._names
+
+_pokedex = None
+
+def get_pokedex():
+    global _pokedex
+    if _pokedex is None:
+        _pokedex = Pokedex()
+    return _pokedex
+
+# loads localized names into the shared pokedex, a missing file is skipped
+# and False returned
+def load_names(names_file = DEFAULT_NAMES_FILE):
+    if not os.path.isfile(names_file):
+        log.debug('No pokemon names file %s', names_file)
+        return False
+    get_pokedex().load_names(names_file)
+    return True
+
+def get_pokemon_name(pokemon_id):
+    return get_pokedex().get_name(pokemon_id)
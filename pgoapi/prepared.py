@@ -0,0 +1,139 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import struct
+
+from google.protobuf.descriptor import FieldDescriptor
+
+from pgoapi import wire
+from pgoapi import proto_loader
+from pgoapi.utilities import to_camel_case, get_cell_ids
+
+# A sub request that is built once and then only rebound to new values. The
+# fields given on creation are serialized once, the bound fields are
+# appended to these bytes on every bind() without creating a protobuf
+# message (protobuf merges fields in any order). A field must be either
+# static or bound, a repeated field given both ways would be merged.
+#
+#   template = MapObjectsRequest()
+#   for (lat, lng) in points:
+#       response = template.call(api, lat, lng)
+
+_VARINT_TYPES = frozenset([FieldDescriptor.TYPE_INT32, FieldDescriptor.TYPE_INT64, FieldDescriptor.TYPE_UINT32,
+                           FieldDescriptor.TYPE_UINT64, FieldDescriptor.TYPE_BOOL, FieldDescriptor.TYPE_ENUM])
+_ZIGZAG_TYPES = {FieldDescriptor.TYPE_SINT32: 31, FieldDescriptor.TYPE_SINT64: 63}
+_FIXED_TYPES = {
+    FieldDescriptor.TYPE_DOUBLE: (1, 'd'),
+    FieldDescriptor.TYPE_FIXED64: (1, 'Q'),
+    FieldDescriptor.TYPE_SFIXED64: (1, 'q'),
+    FieldDescriptor.TYPE_FLOAT: (5, 'f'),
+    FieldDescriptor.TYPE_FIXED32: (5, 'I'),
+    FieldDescriptor.TYPE_SFIXED32: (5, 'i'),
+}
+
+class PreparedRequest:
+
+    def __init__(self, method, **static):
+        RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+
+        self.request_type = RequestType.Value(method.upper())
+        message_class = proto_loader.get_class('POGOProtos.Networking.Requests.Messages_pb2.' + to_camel_case(method.lower()) + 'Message')
+        self._fields = message_class.DESCRIPTOR.fields_by_name
+
+        message = message_class()
+        for (key, value) in static.items():
+            if isinstance(value, list):
+                getattr(message, key).extend(value)
+            else:
+                setattr(message, key, value)
+        self._static = message.SerializeToString()
+
+    # returns the sub request entry for PGoApiRequest.add_prepared()
+    def bind(self, **values):
+        buf = bytearray(self._static)
+        for (name, value) in values.items():
+            field = self._fields.get(name)
+            if field is None:
+                raise ValueError('Unknown field {} in {}'.format(name, self.__class__.__name__))
+            _encode_field(buf, field, value)
+        return {self.request_type: bytes(buf)}
+
+    def call(self, api, **values):
+        return api.create_request().add_prepared(self.bind(**values)).call()
+
+# get_map_objects bound to a position, the cell ids default to the cells
+# around the position
+class MapObjectsRequest(PreparedRequest):
+
+    def __init__(self, radius = 1000):
+        PreparedRequest.__init__(self, 'get_map_objects')
+        self.radius = radius
+
+    def bind_position(self, lat, lng, cell_ids = None):
+        if cell_ids is None:
+            cell_ids = get_cell_ids(lat, lng, self.radius)
+        return self.bind(latitude = lat, longitude = lng, cell_id = cell_ids, since_timestamp_ms = [0] * len(cell_ids))
+
+    def call(self, api, lat, lng, alt = 0, cell_ids = None):
+        api.set_position(lat, lng, alt)
+        return api.create_request().add_prepared(self.bind_position(lat, lng, cell_ids)).call()
+
+def _encode_field(buf, field, value):
+    repeated = field.label == FieldDescriptor.LABEL_REPEATED
+    values = list(value) if repeated else [value]
+
+    if field.type in _VARINT_TYPES or field.type in _ZIGZAG_TYPES:
+        if field.type in _ZIGZAG_TYPES:
+            bits = _ZIGZAG_TYPES[field.type]
+            values = [(v << 1) ^ (v >> bits) for v in values]
+        if repeated:
+            _append_packed(buf, field.number, wire.encode_varints(values))
+        else:
+            buf += wire.encode_varint(field.number << 3)
+            buf += wire.encode_varint(int(values[0]))
+    elif field.type in _FIXED_TYPES:
+        wire_type, code = _FIXED_TYPES[field.type]
+        payload = struct.pack('<{}{}'.format(len(values), code), *values)
+        if repeated:
+            _append_packed(buf, field.number, payload)
+        else:
+            buf += wire.encode_varint(field.number << 3 | wire_type)
+            buf += payload
+    elif field.type in (FieldDescriptor.TYPE_STRING, FieldDescriptor.TYPE_BYTES):
+        for v in values:
+            if not isinstance(v, bytes):
+                v = v.encode('utf-8')
+            _append_packed(buf, field.number, v)
+    else:
+        raise ValueError('Field {} can not be bound, only scalar fields are supported'.format(field.name))
+
+# length delimited field
+def _append_packed(buf, number, payload):
+    buf += wire.encode_varint(number << 3 | 2)
+    buf += wire.encode_varint(len(payload))
+    buf += payload
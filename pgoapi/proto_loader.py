@@ -0,0 +1,325 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import logging
+import threading
+
+from importlib import import_module
+
+log = logging.getLogger(__name__)
+
+# POGOProtos classes are either taken from the generated *_pb2 modules (default)
+# or built from one serialized FileDescriptorSet (bundle mode). In bundle mode only
+# the .proto files needed for a requested type are added to the descriptor pool
+# and only the requested message classes are created.
+#
+# Bundle mode is used if PGOAPI_PROTO_BUNDLE=1 is set, if use_bundle() is called
+# or if the generated modules are not shipped. The bundle is (re)created with:
+#   python -m pgoapi.proto_loader
+
+PROTOS_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'protos')
+BUNDLE_FILE = os.path.join(PROTOS_DIR, 'POGOProtos.desc')
+
+_lock = threading.RLock()
+_bundle_mode = None
+_cache = {}
+
+# bundle mode state
+_pool = None
+_file_protos = None
+_package_files = None
+_added_files = set()
+
+def use_bundle(enabled = True):
+    global _bundle_mode
+    with _lock:
+        if _bundle_mode != enabled:
+            _cache.clear()
+        _bundle_mode = enabled
+
+def is_bundle_mode():
+    global _bundle_mode
+    if _bundle_mode is None:
+        if os.environ.get('PGOAPI_PROTO_BUNDLE', '') not in ('', '0'):
+            _bundle_mode = True
+        else:
+            _bundle_mode = not os.path.isdir(os.path.join(PROTOS_DIR, 'POGOProtos')) and os.path.isfile(BUNDLE_FILE)
+        log.debug('Protobuf bundle mode: %s', _bundle_mode)
+    return _bundle_mode
+
+def get_message_class(full_name):
+    try:
+        return _cache[full_name]
+    except KeyError:
+        pass
+
+    with _lock:
+        if is_bundle_mode():
+            cls = _get_bundle_message_class(full_name)
+        else:
+            cls = _get_generated_symbol(full_name)
+        _cache[full_name] = cls
+    return cls
+
+def get_enum(full_name):
+    try:
+        return _cache[full_name]
+    except KeyError:
+        pass
+
+    with _lock:
+        if is_bundle_mode():
+            from google.protobuf.internal.enum_type_wrapper import EnumTypeWrapper
+            enum = EnumTypeWrapper(_find_bundle_descriptor(full_name, 'FindEnumTypeByName'))
+        else:
+            enum = _get_generated_symbol(full_name)
+        _cache[full_name] = enum
+    return enum
+
+# e.g. 'POGOProtos.Networking.Responses_pb2.GetInventoryResponse', as used by RpcApi
+def get_class(cls):
+    try:
+        return _cache[cls]
+    except KeyError:
+        pass
+
+    module_, class_ = cls.rsplit('.', 1)
+    if not module_.endswith('_pb2'):
+        raise ImportError('{} is not a protobuf module'.format(module_))
+
+    with _lock:
+        if is_bundle_mode():
+            try:
+                full_name = _resolve_bundle_name(module_[:-len('_pb2')], class_)
+            except KeyError:
+                raise ImportError('{} not found in protobuf bundle'.format(cls))
+            cls_ = _get_bundle_message_class(full_name)
+        else:
+            _import_protos()
+            cls_ = getattr(import_module(module_), class_)
+        _cache[cls] = cls_
+    return cls_
+
+def _import_protos():
+    # adds the generated POGOProtos package to sys.path
+    from pgoapi import protos
+
+def _get_generated_symbol(full_name):
+    _import_protos()
+
+    parts = full_name.split('.')
+    for i in range(len(parts) - 1, 0, -1):
+        try:
+            symbol = import_module('.'.join(parts[:i]) + '_pb2')
+        except ImportError:
+            continue
+        for part in parts[i:]:
+            symbol = getattr(symbol, part)
+        return symbol
+
+    raise ImportError('No generated protobuf module found for {}'.format(full_name))
+
+def _load_bundle():
+    global _pool, _file_protos, _package_files
+    if _file_protos is not None:
+        return
+
+    from google.protobuf import descriptor_pool
+
+    with open(BUNDLE_FILE, 'rb') as f:
+        data = f.read()
+
+    # only name, package and dependencies are read here, every file is kept
+    # serialized until one of its types is requested
+    file_protos, package_files = {}, {}
+    for (field_number, value) in _iter_fields(data):
+        if field_number != 1:
+            continue
+        file_proto = _scan_file_proto(value)
+        file_protos[file_proto['name']] = file_proto
+        package_files[file_proto['package']] = file_proto['name']
+
+    log.debug('Loaded protobuf bundle with %s files', len(file_protos))
+    _pool = descriptor_pool.DescriptorPool()
+    _file_protos, _package_files = file_protos, package_files
+
+def _read_varint(data, pos):
+    result, shift = 0, 0
+    while True:
+        b = ord(data[pos:pos + 1])
+        result |= (b & 0x7f) << shift
+        pos += 1
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+
+# yields (field number, value) of the top level fields of a serialized message,
+# value is an int for varints and bytes for length delimited fields
+def _iter_fields(data):
+    pos, end = 0, len(data)
+    while pos < end:
+        key, pos = _read_varint(data, pos)
+        field_number, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        elif wire_type == 1:
+            value, pos = data[pos:pos + 8], pos + 8
+        elif wire_type == 5:
+            value, pos = data[pos:pos + 4], pos + 4
+        else:
+            raise ValueError('Unsupported wire type {} in protobuf bundle'.format(wire_type))
+        yield field_number, value
+
+# FileDescriptorProto: 1 = name, 2 = package, 3 = dependency, 10 = public_dependency
+def _scan_file_proto(data):
+    file_proto = {'name': None, 'package': '', 'dependency': [], 'public_dependency': [], 'serialized': data}
+    for (field_number, value) in _iter_fields(data):
+        if field_number == 1:
+            file_proto['name'] = value.decode('utf-8')
+        elif field_number == 2:
+            file_proto['package'] = value.decode('utf-8')
+        elif field_number == 3:
+            file_proto['dependency'].append(value.decode('utf-8'))
+        elif field_number == 10:
+            if isinstance(value, bytes):
+                pos = 0
+                while pos < len(value):
+                    index, pos = _read_varint(value, pos)
+                    file_proto['public_dependency'].append(index)
+            else:
+                file_proto['public_dependency'].append(value)
+    return file_proto
+
+def _get_bundle_file(full_name):
+    package = full_name
+    while '.' in package:
+        package = package.rsplit('.', 1)[0]
+        if package in _package_files:
+            return _package_files[package]
+    return None
+
+def _add_bundle_file(file_name):
+    if file_name in _added_files:
+        return
+
+    file_proto = _file_protos[file_name]
+    for dependency in file_proto['dependency']:
+        _add_bundle_file(dependency)
+
+    _pool.AddSerializedFile(file_proto['serialized'])
+    _added_files.add(file_name)
+
+def _resolve_bundle_name(package, name):
+    _load_bundle()
+
+    file_name = _package_files.get(package)
+    if file_name is None:
+        raise KeyError(name)
+
+    _add_bundle_file(file_name)
+    full_name = '{}.{}'.format(package, name)
+    try:
+        _pool.FindMessageTypeByName(full_name)
+        return full_name
+    except KeyError:
+        pass
+
+    # generated modules re-export symbols of their public dependencies
+    file_proto = _file_protos[file_name]
+    for index in file_proto['public_dependency']:
+        dependency = _file_protos[file_proto['dependency'][index]]
+        try:
+            return _resolve_bundle_name(dependency['package'], name)
+        except KeyError:
+            pass
+
+    raise KeyError(full_name)
+
+def _find_bundle_descriptor(full_name, finder):
+    _load_bundle()
+
+    file_name = _get_bundle_file(full_name)
+    if file_name is None:
+        raise ImportError('{} not found in protobuf bundle'.format(full_name))
+
+    _add_bundle_file(file_name)
+    try:
+        return getattr(_pool, finder)(full_name)
+    except KeyError:
+        raise ImportError('{} not found in protobuf bundle'.format(full_name))
+
+def _get_bundle_message_class(full_name):
+    descriptor = _find_bundle_descriptor(full_name, 'FindMessageTypeByName')
+    try:
+        from google.protobuf.message_factory import GetMessageClass
+    except ImportError:
+        from google.protobuf.message_factory import MessageFactory
+        return MessageFactory(_pool).GetPrototype(descriptor)
+    return GetMessageClass(descriptor)
+
+def build_bundle(output_file = BUNDLE_FILE):
+    from google.protobuf import descriptor_pb2
+
+    _import_protos()
+
+    file_protos = {}
+    for (dirpath, dirnames, filenames) in os.walk(os.path.join(PROTOS_DIR, 'POGOProtos')):
+        for filename in sorted(filenames):
+            if not filename.endswith('_pb2.py'):
+                continue
+            module_path = os.path.relpath(os.path.join(dirpath, filename[:-3]), PROTOS_DIR)
+            module = import_module(module_path.replace(os.sep, '.'))
+            file_proto = descriptor_pb2.FileDescriptorProto.FromString(module.DESCRIPTOR.serialized_pb)
+            file_protos[file_proto.name] = file_proto
+
+    # dependencies first, so that the set can be loaded in order
+    file_set = descriptor_pb2.FileDescriptorSet()
+    added = set()
+    def add(name):
+        if name in added:
+            return
+        added.add(name)
+        for dependency in file_protos[name].dependency:
+            add(dependency)
+        file_set.file.add().CopyFrom(file_protos[name])
+
+    for name in sorted(file_protos):
+        add(name)
+
+    with open(output_file, 'wb') as f:
+        f.write(file_set.SerializeToString())
+
+    log.info('Wrote %s proto files to %s', len(file_set.file), output_file)
+    return output_file
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    print('Protobuf descriptor bundle written to {}'.format(build_bundle()))
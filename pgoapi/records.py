@@ -0,0 +1,268 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import sys
+import time
+import array
+
+import six
+
+from google.protobuf import message
+
+# Compact records for map sightings. A record keeps only the fields listed in
+# FIELDS in __slots__ and is built directly from the proto message (or from
+# a protobuf_to_dict dict). RecordArray stores many records as one column per
+# field, numeric columns in array.array, string columns as interned strings.
+# Bool fields use the typecode '?', they are stored as 'b' and read back as
+# bool, enum fields hold the enum number like the proto message.
+#
+#   store = SightingStore()
+#   store.add_response(api.get_map_objects(...))
+#   rare = store.wild_pokemons.filter(lambda pokemon: pokemon.pokemon_id in (83, 115, 122))
+
+if six.PY3:
+    _intern = sys.intern
+else:
+    # protobuf strings are unicode on python 2, intern() only takes str
+    _intern = lambda value: intern(value) if isinstance(value, str) else value
+
+DEFAULT_VALUES = {'d': 0.0, 'f': 0.0, 'u': u'', '?': False}
+
+# array typecode and conversion on read of the field typecodes which can not
+# be stored as they are
+STORAGE_TYPECODES = {'?': 'b'}
+READERS = {'?': bool}
+
+def _new_column(typecode):
+    if typecode == 'u':
+        return []
+    try:
+        return array.array(STORAGE_TYPECODES.get(typecode, typecode))
+    except ValueError:
+        # e.g. 'Q' on python 2
+        return []
+
+def _get_path(obj, path, default):
+    for key in path:
+        if isinstance(obj, dict):
+            obj = obj.get(key)
+            if obj is None:
+                return default
+        else:
+            # unset sub messages (e.g. lure_info) return their default values
+            obj = getattr(obj, key)
+    return obj
+
+class Record(object):
+
+    # ((field name, array typecode ('u' for strings, '?' for bools), path in the proto message), ..)
+    FIELDS = ()
+
+    __slots__ = ()
+
+    def __init__(self, *values, **kwargs):
+        for ((name, typecode, path), value) in zip(self.FIELDS, values):
+            setattr(self, name, value)
+        for (name, typecode, path) in self.FIELDS[len(values):]:
+            setattr(self, name, kwargs.get(name, DEFAULT_VALUES.get(typecode, 0)))
+
+    @classmethod
+    def from_proto(cls, msg):
+        values = []
+        for (name, typecode, path) in cls.FIELDS:
+            value = _get_path(msg, path, DEFAULT_VALUES.get(typecode, 0))
+            values.append(_intern(value) if typecode == 'u' else value)
+        return cls(*values)
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls.from_proto(values)
+
+    def to_dict(self):
+        return dict((name, getattr(self, name)) for (name, typecode, path) in self.FIELDS)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, name) == getattr(other, name) for (name, typecode, path) in self.FIELDS)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join('{}={!r}'.format(name, getattr(self, name)) for (name, typecode, path) in self.FIELDS))
+
+class WildPokemonRecord(Record):
+
+    FIELDS = (
+        ('encounter_id', 'Q', ('encounter_id',)),
+        ('spawn_point_id', 'u', ('spawn_point_id',)),
+        ('pokemon_id', 'H', ('pokemon_data', 'pokemon_id')),
+        ('latitude', 'd', ('latitude',)),
+        ('longitude', 'd', ('longitude',)),
+        ('last_modified_timestamp_ms', 'q', ('last_modified_timestamp_ms',)),
+        ('time_till_hidden_ms', 'i', ('time_till_hidden_ms',)),
+    )
+
+    __slots__ = tuple(name for (name, typecode, path) in FIELDS)
+
+    # unix time in seconds when the pokemon disappears, seen_at is the time
+    # the response was received (default: now)
+    def get_hides_at(self, seen_at = None):
+        if seen_at is None:
+            seen_at = time.time()
+        return seen_at + self.time_till_hidden_ms / 1000.0
+
+class MapPokemonRecord(Record):
+
+    FIELDS = (
+        ('encounter_id', 'Q', ('encounter_id',)),
+        ('spawn_point_id', 'u', ('spawn_point_id',)),
+        ('pokemon_id', 'H', ('pokemon_id',)),
+        ('latitude', 'd', ('latitude',)),
+        ('longitude', 'd', ('longitude',)),
+        ('expiration_timestamp_ms', 'q', ('expiration_timestamp_ms',)),
+    )
+
+    __slots__ = tuple(name for (name, typecode, path) in FIELDS)
+
+class FortRecord(Record):
+
+    FIELDS = (
+        ('id', 'u', ('id',)),
+        ('latitude', 'd', ('latitude',)),
+        ('longitude', 'd', ('longitude',)),
+        ('type', 'b', ('type',)),
+        ('enabled', '?', ('enabled',)),
+        ('owned_by_team', 'b', ('owned_by_team',)),
+        ('guard_pokemon_id', 'H', ('guard_pokemon_id',)),
+        ('gym_points', 'q', ('gym_points',)),
+        ('last_modified_timestamp_ms', 'q', ('last_modified_timestamp_ms',)),
+        ('lure_pokemon_id', 'H', ('lure_info', 'active_pokemon_id')),
+        ('lure_expires_timestamp_ms', 'q', ('lure_info', 'lure_expires_timestamp_ms')),
+    )
+
+    __slots__ = tuple(name for (name, typecode, path) in FIELDS)
+
+class SpawnPointRecord(Record):
+
+    FIELDS = (
+        ('latitude', 'd', ('latitude',)),
+        ('longitude', 'd', ('longitude',)),
+    )
+
+    __slots__ = tuple(name for (name, typecode, path) in FIELDS)
+
+class RecordArray:
+
+    def __init__(self, record_class):
+        self.record_class = record_class
+
+        self._names = [name for (name, typecode, path) in record_class.FIELDS]
+        self._columns = [_new_column(typecode) for (name, typecode, path) in record_class.FIELDS]
+        self._strings = [typecode == 'u' for (name, typecode, path) in record_class.FIELDS]
+        self._readers = [READERS.get(typecode) for (name, typecode, path) in record_class.FIELDS]
+
+    def __len__(self):
+        return len(self._columns[0]) if self._columns else 0
+
+    def __getitem__(self, index):
+        return self.record_class(*self._read([column[index] for column in self._columns]))
+
+    def __iter__(self):
+        for values in zip(*self._columns):
+            yield self.record_class(*self._read(values))
+
+    def _read(self, values):
+        return [reader(value) if reader else value for (reader, value) in zip(self._readers, values)]
+
+    def append(self, record):
+        if not isinstance(record, Record):
+            record = self.record_class.from_proto(record)
+        for (column, name, string) in zip(self._columns, self._names, self._strings):
+            value = getattr(record, name)
+            column.append(_intern(value) if string else value)
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    # the stored column, converted into a list for bool columns
+    def get_column(self, name):
+        index = self._names.index(name)
+        reader = self._readers[index]
+        if reader:
+            return [reader(value) for value in self._columns[index]]
+        return self._columns[index]
+
+    def select(self, indices):
+        result = RecordArray(self.record_class)
+        for (target, column) in zip(result._columns, self._columns):
+            for index in indices:
+                target.append(column[index])
+        return result
+
+    def filter(self, func):
+        return self.select([index for (index, record) in enumerate(self) if func(record)])
+
+    # e.g. where('pokemon_id', lambda pokemon_id: pokemon_id == 16), without creating records
+    def where(self, name, func):
+        return self.select([index for (index, value) in enumerate(self.get_column(name)) if func(value)])
+
+    def get_size(self):
+        size = 0
+        for (column, string) in zip(self._columns, self._strings):
+            size += sys.getsizeof(column)
+            if not isinstance(column, array.array) and not string:
+                size += sum(sys.getsizeof(value) for value in column)
+        return size
+
+class SightingStore:
+
+    def __init__(self):
+        self.wild_pokemons = RecordArray(WildPokemonRecord)
+        self.catchable_pokemons = RecordArray(MapPokemonRecord)
+        self.forts = RecordArray(FortRecord)
+        self.spawn_points = RecordArray(SpawnPointRecord)
+
+    # GetMapObjectsResponse proto or the GET_MAP_OBJECTS dict of a response
+    def add_map_objects(self, map_objects):
+        if isinstance(map_objects, message.Message):
+            map_cells = map_objects.map_cells
+        else:
+            map_cells = map_objects.get('map_cells', [])
+
+        for map_cell in map_cells:
+            get = map_cell.get if isinstance(map_cell, dict) else lambda key, default: getattr(map_cell, key)
+            self.wild_pokemons.extend(get('wild_pokemons', []))
+            self.catchable_pokemons.extend(get('catchable_pokemons', []))
+            self.forts.extend(get('forts', []))
+            self.spawn_points.extend(get('spawn_points', []))
+
+    def add_response(self, response_dict):
+        for entry in (response_dict or {}).get('responses_list', []):
+            if entry['request_type'] == 'GET_MAP_OBJECTS' and isinstance(entry['response'], dict):
+                self.add_map_objects(entry['response'])
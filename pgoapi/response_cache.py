@@ -0,0 +1,178 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import time
+import logging
+import threading
+import collections
+
+from pgoapi import proto_loader
+
+# seconds a response of a read-only request type stays valid, a chain is
+# cached for the shortest TTL of its sub requests and only if all of them
+# are listed here
+DEFAULT_TTLS = {
+    'GET_PLAYER': 30,
+    'GET_INVENTORY': 10,
+    'GET_MAP_OBJECTS': 5,
+}
+
+# request types whose response depends on the player position
+POSITION_TYPES = frozenset(['GET_MAP_OBJECTS'])
+
+# Read-through cache for the read-only calls of one account. Identical
+# calls (same request types, arguments and, for position dependent types,
+# the same S2 cell of the player position) within the TTL are answered from
+# the cache, and a call identical to one that is still in flight waits for
+# its response instead of sending its own RPC (single flight). Any other
+# call may change the player state and clears the cache.
+#
+# Cached response dicts are shared between callers and must not be modified.
+class ResponseCache:
+
+    def __init__(self, ttls = None, cell_level = 15, max_entries = 256):
+        self.log = logging.getLogger(__name__)
+
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.cell_level = cell_level
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        # key -> (expires, response), oldest first
+        self._entries = collections.OrderedDict()
+        # key -> _Flight
+        self._in_flight = {}
+        self._generation = 0
+
+        self._stats = {'hits': 0, 'misses': 0, 'joined': 0, 'uncacheable': 0, 'invalidations': 0}
+
+    def get_key(self, req_method_list, position):
+        RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+
+        key, ttl, needs_cell = [], None, False
+        for method in req_method_list:
+            if isinstance(method, dict):
+                (method, kwargs), = method.items()
+            else:
+                kwargs = {}
+            name = RequestType.Name(method)
+            if name not in self.ttls:
+                return (None, None)
+            ttl = self.ttls[name] if ttl is None else min(ttl, self.ttls[name])
+            needs_cell = needs_cell or name in POSITION_TYPES
+            key.append((name, _normalize(kwargs)))
+
+        if needs_cell:
+            key.append(self._get_cell(position))
+        return (tuple(key), ttl)
+
+    def _get_cell(self, position):
+        from s2sphere import CellId, LatLng
+        return CellId.from_lat_lng(LatLng.from_degrees(position[0], position[1])).parent(self.cell_level).id()
+
+    # returns the response of func() for the request chain, from the cache if possible
+    def call(self, req_method_list, position, func):
+        key, ttl = self.get_key(req_method_list, position)
+        if key is None:
+            self.invalidate()
+            with self._lock:
+                self._stats['uncacheable'] += 1
+            return func()
+
+        leader = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._stats['hits'] += 1
+                    return entry[1]
+                del self._entries[key]
+
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                self._stats['joined'] += 1
+            else:
+                flight = self._in_flight[key] = _Flight()
+                self._stats['misses'] += 1
+                generation = self._generation
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.exception is not None:
+                raise flight.exception
+            return flight.response
+
+        try:
+            flight.response = func()
+        except Exception as e:
+            flight.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                # a write while the read was in flight makes the response stale
+                if flight.exception is None and generation == self._generation and self._is_cacheable(flight.response):
+                    self._entries[key] = (time.time() + ttl, flight.response)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            flight.done.set()
+
+        return flight.response
+
+    def _is_cacheable(self, response):
+        return isinstance(response, dict) and response.get('status_code') == 1 and 'responses' in response
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            if self._entries:
+                self._stats['invalidations'] += 1
+                self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        return stats
+
+class _Flight:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.exception = None
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for (k, v) in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    return value
@@ -26,39 +26,47 @@ Author: tjado <https://github.com/tejado>
 from __future__ import absolute_import
 
 import re
+import time
 import base64
 import random
 import logging
-import requests
 import subprocess
 
 from google.protobuf import message
 
-from importlib import import_module
-
-from pgoapi.protobuf_to_dict import protobuf_to_dict
 from pgoapi.exceptions import NotLoggedInException, ServerBusyOrOfflineException, ServerSideRequestThrottlingException, ServerSideAccessForbiddenException, UnexpectedResponseException
-from pgoapi.utilities import f2i, h2f, to_camel_case, get_time_ms, get_format_time_diff
-
-from . import protos
-from POGOProtos.Networking.Envelopes_pb2 import RequestEnvelope
-from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
-from POGOProtos.Networking.Requests_pb2 import RequestType
+from pgoapi.utilities import f2i, h2f, to_camel_case, get_time_ms, get_format_time_diff, import_requests
+from pgoapi import proto_loader
+from pgoapi import metrics as pgoapi_metrics
+from pgoapi import decoder as pgoapi_decoder
+from pgoapi import rpc_log
+from pgoapi.endpoints import create_session
 
 class RpcApi:
 
     RPC_ID = 0
 
-    def __init__(self, auth_provider):
+    def __init__(self, auth_provider, metrics = None, hooks = None, session = None, decoder = None, dump_sampler = None):
 
         self.log = logging.getLogger(__name__)
 
-        self._session = requests.session()
-        self._session.headers.update({'User-Agent': 'Niantic App'})
-        self._session.verify = True
+        # a custom session (e.g. capture.ReplaySession) only needs post()
+        if session is None:
+            session = create_session()
+        self._session = session
 
         self._auth_provider = auth_provider
 
+        self._metrics = metrics
+        self._hooks = list(hooks or [])
+        self._decoder = decoder
+        self._rpc_stats = None
+
+        # see pgoapi.rpc_log, decided per call
+        self._dump_sampler = dump_sampler
+        self._debug = False
+        self._dump = False
+
         if RpcApi.RPC_ID == 0:
             RpcApi.RPC_ID = int(random.random() * 10 ** 18)
             self.log.debug('Generated new random RPC Request id: %s', RpcApi.RPC_ID)
@@ -80,18 +88,42 @@ class RpcApi:
         return output
 
     def get_class(self, cls):
-        module_, class_ = cls.rsplit('.', 1)
-        class_ = getattr(import_module(module_), class_)
-        return class_
+        return proto_loader.get_class(cls)
+
+    def get_rpc_stats(self):
+        return self._rpc_stats
+
+    def _get_request_types(self, subrequests):
+        RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+
+        request_types = []
+        for entry in subrequests:
+            entry_id = entry if isinstance(entry, int) else list(entry.keys())[0]
+            request_types.append(RequestType.Name(entry_id))
+        return request_types
 
     def _make_rpc(self, endpoint, request_proto_plain):
         self.log.debug('Execution of RPC')
 
+        start = time.time()
         request_proto_serialized = request_proto_plain.SerializeToString()
+        self._add_timing('serialize', start)
+        self._set_stat('request_bytes', len(request_proto_serialized))
+        self._call_hooks('after_serialize', request_proto_serialized)
+
+        self._call_hooks('before_send')
+        start = time.time()
         try:
             http_response = self._session.post(endpoint, data=request_proto_serialized)
-        except requests.exceptions.ConnectionError as e:
+        except import_requests().exceptions.ConnectionError as e:
             raise ServerBusyOrOfflineException
+        finally:
+            self._add_timing('http', start)
+
+        self._set_stat('http_status', http_response.status_code)
+        if http_response.content is not None:
+            self._set_stat('response_bytes', len(http_response.content))
+        self._call_hooks('after_receive', http_response)
 
         return http_response
 
@@ -100,10 +132,53 @@ class RpcApi:
         if not self._auth_provider or self._auth_provider.is_login() is False:
             raise NotLoggedInException()
 
-        request_proto = self._build_main_request(subrequests, player_position)
+        # per call timings, sizes and status codes, see get_rpc_stats()
+        self._rpc_stats = {
+            'request_id': None,
+            'endpoint': endpoint,
+            'subrequests': subrequests,
+            'request_types': self._get_request_types(subrequests),
+            'timings': {},
+            'subresponse_timings': [],
+            'request_bytes': None,
+            'response_bytes': None,
+            'http_status': None,
+            'status_code': None,
+            'exception': None,
+        }
+
+        self._debug = self.log.isEnabledFor(logging.DEBUG)
+        self._dump = self._debug and (self._dump_sampler is None or self._dump_sampler.should_dump())
+
+        start = time.time()
+        try:
+            response_dict = self._request(endpoint, subrequests, player_position)
+        except Exception as e:
+            self._rpc_stats['exception'] = type(e).__name__
+            self._call_hooks('on_error', e)
+            raise
+        finally:
+            self._add_timing('total', start)
+            self._record_metrics()
+            if self._debug:
+                summary = rpc_log.get_summary(self._rpc_stats)
+                self.log.debug('RPC %s', rpc_log.format_fields(summary), extra={'rpc': summary})
+
+        return response_dict
+
+    def _request(self, endpoint, subrequests, player_position):
+        request_id = self.get_rpc_id()
+        self._set_stat('request_id', request_id)
+        self._call_hooks('before_build')
+
+        start = time.time()
+        request_proto = self._build_main_request(subrequests, player_position, request_id)
+        self._add_timing('build', start)
+
         response = self._make_rpc(endpoint, request_proto)
 
         response_dict = self._parse_main_response(response, subrequests)
+        self._call_hooks('after_parse', response_dict)
 
         self.check_authentication(response_dict)
 
@@ -112,6 +187,7 @@ class RpcApi:
         """
         if isinstance(response_dict, dict) and 'status_code' in response_dict:
             sc = response_dict['status_code']
+            self._set_stat('status_code', sc)
             if sc == 102:
                 raise NotLoggedInException()
             elif sc == 52:
@@ -119,6 +195,34 @@ class RpcApi:
 
         return response_dict
 
+    def _set_stat(self, key, value):
+        if self._rpc_stats is not None:
+            self._rpc_stats[key] = value
+
+    def _add_timing(self, phase, start):
+        self._add_duration(phase, time.time() - start)
+
+    def _add_duration(self, phase, seconds):
+        if self._rpc_stats is not None:
+            self._rpc_stats['timings'][phase] = self._rpc_stats['timings'].get(phase, 0.0) + seconds
+
+    def _call_hooks(self, phase, *args):
+        for hook in self._hooks:
+            try:
+                getattr(hook, phase)(self._rpc_stats, *args)
+            except Exception as e:
+                self.log.warning('RPC hook %s failed in %s: %s', type(hook).__name__, phase, str(e))
+
+    def _record_metrics(self):
+        metrics = self._metrics or pgoapi_metrics.get_default_metrics()
+        if metrics is None:
+            return
+
+        try:
+            metrics.record_rpc(self._rpc_stats)
+        except Exception as e:
+            self.log.warning('Could not record RPC metrics: %s', str(e))
+
     def check_authentication(self, response_dict):
         if isinstance(response_dict, dict) and ('auth_ticket' in response_dict) and \
            ('expire_timestamp_ms' in response_dict['auth_ticket']) and \
@@ -138,12 +242,14 @@ class RpcApi:
             else:
                 self.log.debug('Received auth ticket valid for %02d:%02d:%02d hours (%s < %s)', h, m, s, now_ms, auth_ticket['expire_timestamp_ms'])
 
-    def _build_main_request(self, subrequests, player_position = None):
+    def _build_main_request(self, subrequests, player_position = None, request_id = None):
+        RequestEnvelope = proto_loader.get_message_class('POGOProtos.Networking.Envelopes.RequestEnvelope')
+
         self.log.debug('Generating main RPC request...')
 
         request = RequestEnvelope()
         request.status_code = 2
-        request.request_id = self.get_rpc_id()
+        request.request_id = request_id or self.get_rpc_id()
 
         if player_position is not None:
             request.latitude, request.longitude, request.altitude = player_position
@@ -163,12 +269,17 @@ class RpcApi:
 
         request = self._build_sub_requests(request, subrequests)
 
-        self.log.debug('Generated protobuf request: \n\r%s', request )
+        if self._dump:
+            self.log.debug('Generated protobuf request: \n\r%s', request )
 
         return request
 
     def _build_sub_requests(self, mainrequest, subrequest_list):
-        self.log.debug('Generating sub RPC requests...')
+        RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+
+        debug = self._debug
+        if debug:
+            self.log.debug('Generating sub RPC requests...')
 
         for entry in subrequest_list:
             if isinstance(entry, dict):
@@ -176,20 +287,28 @@ class RpcApi:
                 entry_id = list(entry.items())[0][0]
                 entry_content = entry[entry_id]
 
+                # already serialized sub request, see pgoapi.prepared
+                if isinstance(entry_content, bytes):
+                    subrequest = mainrequest.requests.add()
+                    subrequest.request_type = entry_id
+                    subrequest.request_message = entry_content
+                    continue
+
                 entry_name = RequestType.Name(entry_id)
 
                 proto_name = to_camel_case(entry_name.lower()) + 'Message'
                 proto_classname = 'POGOProtos.Networking.Requests.Messages_pb2.' + proto_name
                 subrequest_extension = self.get_class(proto_classname)()
 
-                self.log.debug("Subrequest class: %s", proto_classname)
+                if debug:
+                    self.log.debug("Subrequest class: %s", proto_classname)
 
                 for (key, value) in entry_content.items():
                     if isinstance(value, list):
-                        self.log.debug("Found list: %s - trying as repeated", key)
+                        if debug:
+                            self.log.debug("Found list: %s - trying as repeated", key)
                         for i in value:
                             try:
-                                self.log.debug("%s -> %s", key, i)
                                 r = getattr(subrequest_extension, key)
                                 r.append(i)
                             except Exception as e:
@@ -206,7 +325,6 @@ class RpcApi:
                             setattr(subrequest_extension, key, value)
                         except Exception as e:
                             try:
-                                self.log.debug("%s -> %s", key, value)
                                 r = getattr(subrequest_extension, key)
                                 r.append(value)
                             except Exception as e:
@@ -240,68 +358,46 @@ class RpcApi:
             self.log.warning('Empty server response!')
             return False
 
-        response_proto = ResponseEnvelope()
-        try:
-            response_proto.ParseFromString(response_raw.content)
-        except message.DecodeError as e:
-            self.log.warning('Could not parse response: %s', str(e))
-            return False
+        if self._dump:
+            self._dump_response(response_raw.content)
 
-        self.log.debug('Protobuf structure of rpc response:\n\r%s', response_proto)
-        try:
-            self.log.debug('Decode raw over protoc (protoc has to be in your PATH):\n\r%s', self.decode_raw(response_raw.content).decode('utf-8'))
-        except:
-            self.log.debug('Error during protoc parsing - ignored.')
-
-        response_proto_dict = protobuf_to_dict(response_proto)
-        response_proto_dict = self._parse_sub_responses(response_proto, subrequests, response_proto_dict)
-
-        return response_proto_dict
+        request_ids = [entry if isinstance(entry, int) else list(entry.keys())[0] for entry in subrequests]
 
-    def _parse_sub_responses(self, response_proto, subrequests_list, response_proto_dict):
-        self.log.debug('Parsing sub RPC responses...')
-        response_proto_dict['responses'] = {}
+        # the response is parsed by pgoapi.decoder.decode_response, either
+        # inline or in the worker processes of a configured decoder
+        decoder = self._decoder or pgoapi_decoder.get_default_decoder()
+        if decoder is not None:
+            start = time.time()
+            result = decoder.decode(response_raw.content, request_ids)
+            self._add_timing('decode', start)
+        else:
+            result = pgoapi_decoder.decode_response(response_raw.content, request_ids)
 
-        if 'returns' in response_proto_dict:
-            del response_proto_dict['returns']
+        # parse and convert as measured inside decode_response
+        for (phase, seconds) in result['timings'].items():
+            self._add_duration(phase, seconds)
+        if self._rpc_stats is not None:
+            self._rpc_stats['subresponse_timings'].extend(result['subresponse_timings'])
 
-        list_len = len(subrequests_list) -1
-        i = 0
-        for subresponse in response_proto.returns:
-            if i > list_len:
-                self.log.info("Error - something strange happend...")
+        if result['error'] is not None:
+            self.log.warning('Could not parse response: %s', result['error'])
+            return False
 
-            request_entry = subrequests_list[i]
-            if isinstance(request_entry, int):
-                entry_id = request_entry
-            else:
-                entry_id =  list(request_entry.items())[0][0]
+        return result['response']
 
-            entry_name = RequestType.Name(entry_id)
-            proto_name = to_camel_case(entry_name.lower()) + 'Response'
-            proto_classname = 'POGOProtos.Networking.Responses_pb2.' + proto_name
+    def _dump_response(self, content):
+        ResponseEnvelope = proto_loader.get_message_class('POGOProtos.Networking.Envelopes.ResponseEnvelope')
 
-            self.log.debug("Parsing class: %s", proto_classname)
+        response_proto = ResponseEnvelope()
+        try:
+            response_proto.ParseFromString(content)
+        except message.DecodeError:
+            return
 
-            subresponse_return = None
+        self.log.debug('Protobuf structure of rpc response:\n\r%s', response_proto)
+        # protoc runs in a subprocess, a DumpSampler can switch it off
+        if self._dump_sampler is None or self._dump_sampler.decode_raw:
             try:
-                subresponse_extension = self.get_class(proto_classname)()         
-            except Exception as e:
-                subresponse_extension = None
-                error = 'Protobuf definition for {} not found'.format(proto_classname)
-                subresponse_return = error
-                self.log.debug(error)
-
-            if subresponse_extension:
-                try: 
-                    subresponse_extension.ParseFromString(subresponse)
-                    subresponse_return = protobuf_to_dict(subresponse_extension)
-                except:
-                    error = "Protobuf definition for {} seems not to match".format(proto_classname)
-                    subresponse_return = error
-                    self.log.debug(error)
-
-            response_proto_dict['responses'][entry_name] = subresponse_return
-            i += 1
-
-        return response_proto_dict
+                self.log.debug('Decode raw over protoc (protoc has to be in your PATH):\n\r%s', self.decode_raw(content).decode('utf-8'))
+            except:
+                self.log.debug('Error during protoc parsing - ignored.')
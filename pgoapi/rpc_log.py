@@ -0,0 +1,77 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import random
+import collections
+
+# Diagnostics of the request chain. With the pgoapi loggers at DEBUG every
+# RPC logs one summary line (with the fields also passed as extra={'rpc':
+# {...}} for structured handlers) and dumps its request and response
+# protobufs. The dumps, including the protoc --decode_raw output, are the
+# expensive part, a DumpSampler set on a PGoApi limits them to a fraction
+# of its calls. Nothing of this is built while DEBUG is disabled.
+
+class DumpSampler:
+
+    # rate is the fraction of RPCs that get dumped, 0 disables dumps,
+    # decode_raw = False skips protoc on the sampled responses
+    def __init__(self, rate = 1.0, decode_raw = True, seed = None):
+        self.rate = rate
+        self.decode_raw = decode_raw
+        self._random = random.Random(seed)
+
+    def should_dump(self):
+        if self.rate >= 1:
+            return True
+        return self.rate > 0 and self._random.random() < self.rate
+
+def get_summary(stats):
+    timings = stats['timings']
+    return collections.OrderedDict([
+        ('request_id', stats['request_id']),
+        ('endpoint', stats['endpoint']),
+        ('request_types', stats['request_types']),
+        ('http_status', stats['http_status']),
+        ('status_code', stats['status_code']),
+        ('exception', stats['exception']),
+        ('request_bytes', stats['request_bytes']),
+        ('response_bytes', stats['response_bytes']),
+        ('total_ms', round(timings.get('total', 0) * 1000, 1)),
+        ('http_ms', round(timings.get('http', 0) * 1000, 1)),
+    ])
+
+# key=value pairs, lists comma separated
+def format_fields(fields):
+    parts = []
+    for (key, value) in fields.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = ','.join(str(v) for v in value)
+        parts.append('{}={}'.format(key, value))
+    return ' '.join(parts)
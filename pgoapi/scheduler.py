@@ -0,0 +1,153 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import time
+import heapq
+import logging
+import itertools
+import threading
+
+from pgoapi import proto_loader
+from pgoapi.exceptions import DeadlineExceededException
+
+# Priority classes, lower runs first
+CRITICAL = 0
+INTERACTIVE = 1
+NORMAL = 2
+BACKGROUND = 3
+
+PRIORITY_NAMES = {CRITICAL: 'critical', INTERACTIVE: 'interactive', NORMAL: 'normal', BACKGROUND: 'background'}
+
+# default priority by request type, everything else is NORMAL. A chain of
+# sub requests gets the highest priority of its members.
+DEFAULT_PRIORITIES = {
+    'ENCOUNTER': CRITICAL,
+    'CATCH_POKEMON': CRITICAL,
+    'DISK_ENCOUNTER': CRITICAL,
+    'INCENSE_ENCOUNTER': CRITICAL,
+    'USE_ITEM_CAPTURE': CRITICAL,
+    'FORT_SEARCH': INTERACTIVE,
+    'FORT_DETAILS': INTERACTIVE,
+    'GET_MAP_OBJECTS': INTERACTIVE,
+    'DOWNLOAD_SETTINGS': BACKGROUND,
+    'DOWNLOAD_ITEM_TEMPLATES': BACKGROUND,
+    'DOWNLOAD_REMOTE_CONFIG_VERSION': BACKGROUND,
+    'GET_ASSET_DIGEST': BACKGROUND,
+    'GET_DOWNLOAD_URLS': BACKGROUND,
+    'GET_PLAYER_PROFILE': BACKGROUND,
+    'CHECK_AWARDED_BADGES': BACKGROUND,
+}
+
+def get_request_names(req_method_list):
+    RequestType = proto_loader.get_enum('POGOProtos.Networking.Requests.RequestType')
+    names = []
+    for method in req_method_list:
+        if isinstance(method, dict):
+            method = list(method.keys())[0]
+        names.append(RequestType.Name(method))
+    return names
+
+# Orders the RPCs of one account by priority and deadline and releases them
+# within the account's rate budget (token bucket with rate RPCs per second
+# and up to burst RPCs at once). Within a priority class the RPC with the
+# earliest deadline goes first, then in order of arrival. An RPC that is
+# still waiting at its deadline raises DeadlineExceededException instead of
+# being sent, as its result would be useless by then.
+class RequestScheduler:
+
+    def __init__(self, rate = 1.0, burst = 1, priorities = None):
+        self.log = logging.getLogger(__name__)
+
+        self.rate = float(rate)
+        self.burst = burst
+        self.priorities = dict(DEFAULT_PRIORITIES)
+        if priorities:
+            self.priorities.update(priorities)
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._counter = itertools.count()
+        self._tokens = float(burst)
+        self._last_refill = time.time()
+
+        self._stats = dict((name, {'sent': 0, 'expired': 0, 'wait_seconds': 0.0}) for name in PRIORITY_NAMES.values())
+
+    def get_priority(self, req_method_list):
+        return min([self.priorities.get(name, NORMAL) for name in get_request_names(req_method_list)] or [NORMAL])
+
+    def _refill(self, now):
+        self._tokens = min(float(self.burst), self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    # blocks until the RPC may be sent, deadline is a time.time() timestamp
+    def acquire(self, priority = NORMAL, deadline = None):
+        start = time.time()
+        entry = (priority, deadline if deadline is not None else float('inf'), next(self._counter))
+        stats = self._stats[PRIORITY_NAMES.get(priority, 'normal')]
+
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            while True:
+                now = time.time()
+                self._refill(now)
+
+                if deadline is not None and now >= deadline:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                    stats['expired'] += 1
+                    raise DeadlineExceededException('Deadline passed after waiting {:.3f}s for the rate limit'.format(now - start))
+
+                if self._waiting[0] is entry and self._tokens >= 1:
+                    heapq.heappop(self._waiting)
+                    self._tokens -= 1
+                    # the next in line may be able to go as well
+                    self._cond.notify_all()
+                    stats['sent'] += 1
+                    stats['wait_seconds'] += now - start
+                    return
+
+                timeout = None
+                if self._waiting[0] is entry:
+                    timeout = (1 - self._tokens) / self.rate
+                if deadline is not None:
+                    timeout = min(timeout if timeout is not None else deadline - now, deadline - now)
+                self._cond.wait(timeout)
+
+    def call(self, func, priority = NORMAL, deadline = None):
+        self.acquire(priority, deadline)
+        return func()
+
+    def get_waiting(self):
+        with self._cond:
+            return len(self._waiting)
+
+    # {priority name: {'sent', 'expired', 'wait_seconds'}}
+    def get_stats(self):
+        with self._cond:
+            return dict((name, dict(stats)) for (name, stats) in self._stats.items())
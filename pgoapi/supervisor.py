@@ -0,0 +1,447 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import logging
+import threading
+import collections
+import multiprocessing
+
+from six.moves import queue
+
+log = logging.getLogger(__name__)
+
+# Runs many accounts on one host: the accounts are sharded over N worker
+# processes, every worker logs in its accounts and runs one thread per
+# account. The supervisor keeps the shared work queue and hands tasks to the
+# workers as their logged in accounts become free, tasks pinned to an account
+# ('account': username) always go to the worker owning that account. Every
+# worker has its own task and result queue, so a crashing worker can not
+# leave a lock held that other workers depend on. Results are passed to a
+# sink in the supervisor process, crashed workers are restarted and the tasks
+# they were running are queued again.
+#
+# Task starts are written to a pipe before the task runs instead of the
+# result queue, whose feeder thread loses buffered messages when the worker
+# dies (os._exit, segfault, OOM kill). That way a task crashing its worker
+# is counted as attempted and task_retries stops it from being run again.
+#
+# A task is a dict:
+#   {'id': 1, 'account': 'name' (optional), 'position': [lat, lng, alt] (optional),
+#    'requests': [['get_player', {}], ['get_inventory', {}]]}
+# 'method' and 'kwargs' can be used instead of 'requests' for a single request.
+
+STOP = 'STOP'
+
+# shared tasks handed to a worker per logged in account
+TASKS_PER_ACCOUNT = 2
+
+def login_account(account):
+    from pgoapi import PGoApi
+    from pgoapi import utilities as util
+
+    api = PGoApi()
+    position = account.get('position')
+    if position is None and account.get('location'):
+        position = util.get_pos_by_name(account['location'])
+    if position:
+        api.set_position(*position)
+
+    if not api.login(account.get('auth_service', 'ptc'), account['username'], account['password']):
+        return None
+    return api
+
+def execute_task(api, task):
+    if task.get('position'):
+        api.set_position(*task['position'])
+
+    requests = task.get('requests') or [[task['method'], task.get('kwargs') or {}]]
+    request = api.create_request()
+    for (method, kwargs) in requests:
+        getattr(request, method)(**kwargs)
+    return request.call()
+
+class _AccountThread(threading.Thread):
+
+    def __init__(self, worker, account, api_factory):
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self.worker = worker
+        self.account = account
+        self.username = account['username']
+        self.api_factory = api_factory
+        self.pinned = queue.Queue()
+
+    def run(self):
+        try:
+            api = self.api_factory(self.account)
+        except Exception as e:
+            log.warning('Login of %s failed: %s', self.username, str(e))
+            api = None
+
+        if api is None:
+            self.worker.send(('login_failed', self.username))
+            # pinned tasks can only be answered with an error
+            while not self.worker.stopped.is_set():
+                try:
+                    self.worker.finish(self.pinned.get(timeout=0.5), self.username, None, 'LoginFailed', 0.0)
+                except queue.Empty:
+                    pass
+            return
+
+        self.worker.send(('login', self.username))
+        while True:
+            try:
+                task = self.pinned.get_nowait()
+            except queue.Empty:
+                if self.worker.stopped.is_set():
+                    return
+                try:
+                    task = self.worker.shared.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+
+            self.worker.mark_started(task['id'])
+            start = time.time()
+            response, error = None, None
+            try:
+                response = execute_task(api, task)
+                if not response:
+                    error = 'NoResponse'
+            except Exception as e:
+                error = type(e).__name__
+            self.worker.finish(task, self.username, response, error, time.time() - start)
+
+class _Worker:
+
+    def __init__(self, worker_id, accounts, task_queue, result_queue, started_conn, api_factory):
+        self.worker_id = worker_id
+        self.task_queue = task_queue
+        self.result_queue = result_queue
+        self.started_conn = started_conn
+        self.started_lock = threading.Lock()
+        self.shared = queue.Queue()
+        self.stopped = threading.Event()
+
+        self.threads = dict((account['username'], _AccountThread(self, account, api_factory)) for account in accounts)
+
+    def send(self, message):
+        self.result_queue.put(message)
+
+    def mark_started(self, task_id):
+        # written to the pipe right away, not by a feeder thread
+        with self.started_lock:
+            self.started_conn.send(task_id)
+
+    def finish(self, task, username, response, error, seconds):
+        self.send(('result', {
+            'id': task['id'],
+            'account': username,
+            'worker': self.worker_id,
+            'seconds': seconds,
+            'error': error,
+            'response': response,
+        }))
+
+    def run(self):
+        for thread in self.threads.values():
+            thread.start()
+
+        while True:
+            task = self.task_queue.get()
+            if task == STOP:
+                break
+            if task.get('account') is not None:
+                self.threads[task['account']].pinned.put(task)
+            else:
+                self.shared.put(task)
+
+        self.stopped.set()
+        for thread in self.threads.values():
+            thread.join()
+
+def _worker_main(worker_id, accounts, task_queue, result_queue, started_conn, api_factory):
+    _Worker(worker_id, accounts, task_queue, result_queue, started_conn, api_factory).run()
+
+class Supervisor:
+
+    def __init__(self, accounts, workers = None, api_factory = login_account, max_restarts = 3, task_retries = 1, stats_interval = 30):
+        self.log = logging.getLogger(__name__)
+
+        self._accounts = list(accounts)
+        self._workers = max(1, min(workers or multiprocessing.cpu_count(), len(self._accounts)))
+        self._api_factory = api_factory
+        self._max_restarts = max_restarts
+        self._task_retries = task_retries
+        self._stats_interval = stats_interval
+
+        # account username -> worker id
+        self._shard_of = {}
+        self._shards = [[] for i in range(self._workers)]
+        for (i, account) in enumerate(self._accounts):
+            self._shards[i % self._workers].append(account)
+            self._shard_of[account['username']] = i % self._workers
+
+        self._stats = {
+            'tasks': 0, 'completed': 0, 'errors': 0, 'retried': 0, 'restarts': 0,
+            'logged_in': 0, 'login_failed': 0, 'started_at': None, 'errors_by_type': {},
+            'workers': dict((i, {'completed': 0, 'errors': 0, 'restarts': 0, 'accounts': len(shard)}) for (i, shard) in enumerate(self._shards)),
+        }
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        elapsed = time.time() - stats['started_at'] if stats['started_at'] else 0
+        stats['elapsed'] = elapsed
+        stats['tasks_per_sec'] = stats['completed'] / elapsed if elapsed else 0.0
+        stats['pending'] = len(self._pending) if self._stats['started_at'] else 0
+        return stats
+
+    # runs all tasks and passes every result dict to sink, returns the stats.
+    # Tasks of a crashed worker are run again, so a task can be executed twice.
+    def run(self, tasks, sink = None):
+        tasks = list(tasks)
+        for (i, task) in enumerate(tasks):
+            task.setdefault('id', i)
+            if task.get('account') is not None and task['account'] not in self._shard_of:
+                raise ValueError('Task {} is pinned to unknown account {}'.format(task['id'], task['account']))
+
+        self._stats['tasks'] = len(tasks)
+        self._stats['started_at'] = time.time()
+
+        self._sink = sink
+        self._tasks = dict((task['id'], task) for task in tasks)
+        self._attempts = dict((task['id'], 0) for task in tasks)
+        self._completed = set()
+        # the shared work queue
+        self._pending = collections.deque(task for task in tasks if task.get('account') is None)
+
+        # per worker: process, task and result queue, reading end of the
+        # started pipe, {task id: task} handed to it, started task ids and the
+        # number of accounts logged in or failed
+        self._processes = {}
+        self._task_queues = {}
+        self._result_queues = {}
+        self._started_conns = {}
+        self._assigned = {}
+        self._started = {}
+        self._logins = {}
+
+        for worker_id in range(self._workers):
+            self._start_worker(worker_id)
+        for task in tasks:
+            if task.get('account') is not None:
+                self._assign(self._shard_of[task['account']], task)
+
+        self.log.info('Supervisor started %s workers for %s accounts and %s tasks', self._workers, len(self._accounts), len(tasks))
+
+        last_stats = time.time()
+        try:
+            while len(self._completed) < len(tasks):
+                received = False
+                for worker_id in list(self._processes):
+                    received = self._receive(worker_id) or received
+
+                for (worker_id, process) in list(self._processes.items()):
+                    if not process.is_alive():
+                        self._restart_worker(worker_id)
+
+                if not self._processes:
+                    self.log.error('All workers failed - stopping')
+                    self._fail_pending('WorkerCrashed')
+                    break
+
+                if self._pending and self._all_logins_failed():
+                    self.log.error('No account could log in - stopping')
+                    self._fail_pending('LoginFailed')
+
+                self._dispatch()
+
+                if self._stats_interval and time.time() - last_stats >= self._stats_interval:
+                    last_stats = time.time()
+                    stats = self.get_stats()
+                    self.log.info('Completed %s/%s tasks (%.1f/s), %s errors, %s restarts', stats['completed'], stats['tasks'], stats['tasks_per_sec'], stats['errors'], stats['restarts'])
+
+                if not received:
+                    time.sleep(0.01)
+        finally:
+            for task_queue in self._task_queues.values():
+                task_queue.put(STOP)
+            for process in self._processes.values():
+                process.join(5)
+                if process.is_alive():
+                    process.terminate()
+
+        return self.get_stats()
+
+    def _start_worker(self, worker_id):
+        self._task_queues[worker_id] = multiprocessing.Queue()
+        self._result_queues[worker_id] = multiprocessing.Queue()
+        if worker_id in self._started_conns:
+            self._started_conns[worker_id].close()
+        started_reader, started_writer = multiprocessing.Pipe(duplex = False)
+        self._started_conns[worker_id] = started_reader
+        self._assigned[worker_id] = {}
+        self._started[worker_id] = set()
+        self._logins[worker_id] = [0, 0]
+
+        process = multiprocessing.Process(target=_worker_main, name='pgoapi-worker-{}'.format(worker_id),
+                                          args=(worker_id, self._shards[worker_id], self._task_queues[worker_id],
+                                                self._result_queues[worker_id], started_writer, self._api_factory))
+        process.daemon = True
+        process.start()
+        # only the worker writes, a closed pipe reports EOF once it died
+        started_writer.close()
+        self._processes[worker_id] = process
+
+    def _assign(self, worker_id, task):
+        self._assigned[worker_id][task['id']] = task
+        self._task_queues[worker_id].put(task)
+
+    def _dispatch(self):
+        for worker_id in self._processes:
+            capacity = self._logins[worker_id][0] * TASKS_PER_ACCOUNT
+            shared = sum(1 for task in self._assigned[worker_id].values() if task.get('account') is None)
+            while self._pending and shared < capacity:
+                task = self._pending.popleft()
+                if task['id'] in self._completed:
+                    continue
+                self._assign(worker_id, task)
+                shared += 1
+
+    def _receive(self, worker_id):
+        # starts first, they are sent before the result of the same task
+        received = self._receive_started(worker_id)
+        while True:
+            try:
+                message = self._result_queues[worker_id].get_nowait()
+            except queue.Empty:
+                return received
+            except Exception as e:
+                # a message cut off by a crashing worker
+                self.log.warning('Could not read message of worker %s: %s', worker_id, str(e))
+                return received
+            received = True
+            self._handle(worker_id, message)
+
+    def _receive_started(self, worker_id):
+        received = False
+        conn = self._started_conns[worker_id]
+        try:
+            while conn.poll():
+                self._started[worker_id].add(conn.recv())
+                received = True
+        except Exception:
+            # EOF after the worker exited, a start cut off by the crash never ran
+            pass
+        return received
+
+    def _handle(self, worker_id, message):
+        kind, payload = message
+        if kind == 'result':
+            self._assigned[worker_id].pop(payload['id'], None)
+            self._started[worker_id].discard(payload['id'])
+            self._complete(worker_id, payload)
+        elif kind == 'login':
+            self._stats['logged_in'] += 1
+            self._logins[worker_id][0] += 1
+        elif kind == 'login_failed':
+            self._stats['login_failed'] += 1
+            self._logins[worker_id][1] += 1
+
+    def _all_logins_failed(self):
+        for (worker_id, (logged_in, failed)) in self._logins.items():
+            if worker_id not in self._processes:
+                continue
+            if logged_in or logged_in + failed < len(self._shards[worker_id]):
+                return False
+        return True
+
+    def _restart_worker(self, worker_id):
+        process = self._processes.pop(worker_id)
+        self.log.warning('Worker %s exited with code %s', worker_id, process.exitcode)
+
+        # results sent right before the crash
+        self._receive(worker_id)
+
+        assigned = self._assigned[worker_id]
+        started = self._started[worker_id]
+
+        worker_stats = self._stats['workers'][worker_id]
+        restart = worker_stats['restarts'] < self._max_restarts
+        if not restart:
+            self.log.error('Worker %s crashed %s times - not restarting it', worker_id, worker_stats['restarts'] + 1)
+        else:
+            worker_stats['restarts'] += 1
+            self._stats['restarts'] += 1
+            self._start_worker(worker_id)
+
+        for task in assigned.values():
+            if task['id'] in self._completed:
+                continue
+            if task['id'] in started:
+                # the task may have caused the crash
+                self._attempts[task['id']] += 1
+                if self._attempts[task['id']] > self._task_retries:
+                    self._fail_task(worker_id, task, 'WorkerCrashed')
+                    continue
+                self._stats['retried'] += 1
+
+            if task.get('account') is None:
+                self._pending.appendleft(task)
+            elif restart:
+                self._assign(worker_id, task)
+            else:
+                # nobody else can run the tasks pinned to its accounts
+                self._fail_task(worker_id, task, 'WorkerCrashed')
+
+    def _fail_pending(self, error):
+        while self._pending:
+            self._fail_task(None, self._pending.popleft(), error)
+
+    def _fail_task(self, worker_id, task, error):
+        self._complete(worker_id, {'id': task['id'], 'account': task.get('account'), 'worker': worker_id,
+                                   'seconds': 0.0, 'error': error, 'response': None})
+
+    def _complete(self, worker_id, result):
+        if result['id'] in self._completed:
+            return
+        self._completed.add(result['id'])
+        self._count_result(worker_id, result)
+        if self._sink is not None:
+            self._sink(result)
+
+    def _count_result(self, worker_id, result):
+        self._stats['completed'] += 1
+        worker_stats = self._stats['workers'].get(worker_id)
+        if worker_stats is not None:
+            worker_stats['completed'] += 1
+        if result['error']:
+            self._stats['errors'] += 1
+            if worker_stats is not None:
+                worker_stats['errors'] += 1
+            self._stats['errors_by_type'][result['error']] = self._stats['errors_by_type'].get(result['error'], 0) + 1
@@ -0,0 +1,413 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import time
+import uuid
+import json
+import logging
+import sqlite3
+import threading
+import collections
+
+from pgoapi import json_stream
+
+# Task queue for scan and inventory jobs shared by any number of worker
+# processes and hosts. A worker leases a task for lease_seconds and has to
+# complete or fail it before the lease runs out, otherwise the task is handed
+# to the next worker. Every lease counts as an attempt; once max_attempts is
+# reached the task is failed. Results are written once per task id: a late
+# complete() of a task that was already completed by another worker is
+# ignored, so a task that ran twice still has exactly one result.
+#
+# Tasks are JSON-serializable dicts, see pgoapi.supervisor for the format.
+# States: queued, leased, done, failed
+
+QUEUED = 'queued'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+class Lease:
+
+    def __init__(self, task_id, task, token, attempts, expires):
+        self.task_id = task_id
+        self.task = task
+        self.token = token
+        self.attempts = attempts
+        self.expires = expires
+
+# Interface of a task queue backend, a broker like Redis or AMQP has to
+# implement these methods with the same semantics.
+class TaskQueue:
+
+    def __init__(self, lease_seconds = 60, max_attempts = 3, retry_delay = 5):
+        self.log = logging.getLogger(__name__)
+
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    # adds a task and returns its id, adding an existing id is a no-op
+    def put(self, task, task_id = None):
+        raise NotImplementedError()
+
+    def put_many(self, tasks):
+        return [self.put(task) for task in tasks]
+
+    # returns a Lease or None if no task is available
+    def lease(self, worker_id, lease_seconds = None):
+        raise NotImplementedError()
+
+    # extends the lease of a long running task, returns False if it was lost
+    def extend(self, lease, lease_seconds = None):
+        raise NotImplementedError()
+
+    # stores the result, returns False if the task already has one
+    def complete(self, lease, result):
+        raise NotImplementedError()
+
+    # queues the task again after retry_delay or fails it after max_attempts
+    def fail(self, lease, error, retry = True):
+        raise NotImplementedError()
+
+    def get_result(self, task_id):
+        raise NotImplementedError()
+
+    # yields (task id, state, result or error) of finished tasks
+    def iter_results(self):
+        raise NotImplementedError()
+
+    # {state: count}
+    def get_counts(self):
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+    def _get_task_id(self, task, task_id):
+        if task_id is None:
+            task_id = task.get('id')
+        if task_id is None:
+            task_id = uuid.uuid4().hex
+        return str(task_id)
+
+class MemoryTaskQueue(TaskQueue):
+
+    def __init__(self, lease_seconds = 60, max_attempts = 3, retry_delay = 5):
+        TaskQueue.__init__(self, lease_seconds, max_attempts, retry_delay)
+
+        self._lock = threading.Lock()
+        # task id -> {'task', 'state', 'attempts', 'token', 'expires', 'available_at', 'error'}
+        self._tasks = collections.OrderedDict()
+        self._results = {}
+
+    def put(self, task, task_id = None):
+        task_id = self._get_task_id(task, task_id)
+        with self._lock:
+            if task_id not in self._tasks:
+                self._tasks[task_id] = {'task': task, 'state': QUEUED, 'attempts': 0, 'token': None,
+                                        'expires': None, 'available_at': 0, 'error': None}
+        return task_id
+
+    def lease(self, worker_id, lease_seconds = None):
+        now = time.time()
+        with self._lock:
+            for (task_id, entry) in self._tasks.items():
+                if entry['state'] == LEASED and entry['expires'] <= now:
+                    if entry['attempts'] >= self.max_attempts:
+                        entry['state'], entry['error'] = FAILED, 'LeaseExpired'
+                        continue
+                elif entry['state'] != QUEUED or entry['available_at'] > now:
+                    continue
+
+                entry['state'] = LEASED
+                entry['attempts'] += 1
+                entry['token'] = uuid.uuid4().hex
+                entry['expires'] = now + (lease_seconds or self.lease_seconds)
+                return Lease(task_id, entry['task'], entry['token'], entry['attempts'], entry['expires'])
+        return None
+
+    def _get_leased(self, lease):
+        entry = self._tasks.get(lease.task_id)
+        if entry is None or entry['state'] != LEASED or entry['token'] != lease.token:
+            return None
+        return entry
+
+    def extend(self, lease, lease_seconds = None):
+        with self._lock:
+            entry = self._get_leased(lease)
+            if entry is None:
+                return False
+            entry['expires'] = lease.expires = time.time() + (lease_seconds or self.lease_seconds)
+            return True
+
+    def complete(self, lease, result):
+        with self._lock:
+            if lease.task_id in self._results:
+                return False
+            self._results[lease.task_id] = result
+            entry = self._tasks[lease.task_id]
+            entry['state'], entry['token'], entry['error'] = DONE, None, None
+            return True
+
+    def fail(self, lease, error, retry = True):
+        with self._lock:
+            entry = self._get_leased(lease)
+            if entry is None:
+                return False
+            entry['token'], entry['error'] = None, error
+            if retry and entry['attempts'] < self.max_attempts:
+                entry['state'] = QUEUED
+                entry['available_at'] = time.time() + self.retry_delay * entry['attempts']
+            else:
+                entry['state'] = FAILED
+            return True
+
+    def get_result(self, task_id):
+        with self._lock:
+            return self._results.get(str(task_id))
+
+    def iter_results(self):
+        with self._lock:
+            finished = [(task_id, entry['state'], self._results.get(task_id) if entry['state'] == DONE else entry['error'])
+                        for (task_id, entry) in self._tasks.items() if entry['state'] in (DONE, FAILED)]
+        return iter(finished)
+
+    def get_counts(self):
+        counts = dict((state, 0) for state in (QUEUED, LEASED, DONE, FAILED))
+        with self._lock:
+            for entry in self._tasks.values():
+                counts[entry['state']] += 1
+        return counts
+
+# SQLite backed queue, usable by all processes on a host (or on a shared
+# filesystem with working locks). Every thread gets its own connection.
+class SqliteTaskQueue(TaskQueue):
+
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, task TEXT NOT NULL, state TEXT NOT NULL, '
+        'attempts INTEGER NOT NULL DEFAULT 0, token TEXT, worker TEXT, expires REAL, available_at REAL NOT NULL DEFAULT 0, error TEXT)',
+        'CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, available_at)',
+        'CREATE TABLE IF NOT EXISTS results (id TEXT PRIMARY KEY, result TEXT, worker TEXT, finished_at REAL)',
+    ]
+
+    def __init__(self, filename, lease_seconds = 60, max_attempts = 3, retry_delay = 5, timeout = 30):
+        TaskQueue.__init__(self, lease_seconds, max_attempts, retry_delay)
+
+        self.filename = filename
+        self.timeout = timeout
+        self._local = threading.local()
+
+        connection = self._get_connection()
+        for statement in self.SCHEMA:
+            connection.execute(statement)
+
+    def _get_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # autocommit, transactions are started explicitly
+            connection = sqlite3.connect(self.filename, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def _transaction(self):
+        connection = self._get_connection()
+        # takes the write lock up front, so two workers can not lease the same task
+        connection.execute('BEGIN IMMEDIATE')
+        return connection
+
+    def put(self, task, task_id = None):
+        return self.put_many([task], [task_id])[0]
+
+    def put_many(self, tasks, task_ids = None):
+        task_ids = [self._get_task_id(task, task_id) for (task, task_id) in zip(tasks, task_ids or [None] * len(tasks))]
+        connection = self._transaction()
+        try:
+            connection.executemany('INSERT OR IGNORE INTO tasks (id, task, state) VALUES (?, ?, ?)',
+                                   [(task_id, json_stream.dumps(task), QUEUED) for (task, task_id) in zip(tasks, task_ids)])
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return task_ids
+
+    def lease(self, worker_id, lease_seconds = None):
+        now = time.time()
+        connection = self._transaction()
+        try:
+            connection.execute("UPDATE tasks SET state = ?, error = 'LeaseExpired', token = NULL WHERE state = ? AND expires <= ? AND attempts >= ?",
+                               (FAILED, LEASED, now, self.max_attempts))
+            row = connection.execute('SELECT id, task, attempts FROM tasks WHERE (state = ? AND available_at <= ?) OR (state = ? AND expires <= ?) '
+                                     'ORDER BY available_at, rowid LIMIT 1', (QUEUED, now, LEASED, now)).fetchone()
+            if row is None:
+                connection.execute('COMMIT')
+                return None
+
+            task_id, task, attempts = row
+            token = uuid.uuid4().hex
+            expires = now + (lease_seconds or self.lease_seconds)
+            connection.execute('UPDATE tasks SET state = ?, attempts = ?, token = ?, worker = ?, expires = ? WHERE id = ?',
+                               (LEASED, attempts + 1, token, str(worker_id), expires, task_id))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return Lease(task_id, json.loads(task), token, attempts + 1, expires)
+
+    def extend(self, lease, lease_seconds = None):
+        expires = time.time() + (lease_seconds or self.lease_seconds)
+        cursor = self._get_connection().execute('UPDATE tasks SET expires = ? WHERE id = ? AND state = ? AND token = ?',
+                                                (expires, lease.task_id, LEASED, lease.token))
+        if cursor.rowcount:
+            lease.expires = expires
+        return cursor.rowcount > 0
+
+    def complete(self, lease, result):
+        connection = self._transaction()
+        try:
+            cursor = connection.execute('INSERT OR IGNORE INTO results (id, result, worker, finished_at) '
+                                        'SELECT id, ?, worker, ? FROM tasks WHERE id = ?',
+                                        (json_stream.dumps(result), time.time(), lease.task_id))
+            stored = cursor.rowcount > 0
+            if stored:
+                connection.execute('UPDATE tasks SET state = ?, token = NULL, error = NULL WHERE id = ?', (DONE, lease.task_id))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return stored
+
+    def fail(self, lease, error, retry = True):
+        connection = self._transaction()
+        try:
+            row = connection.execute('SELECT attempts FROM tasks WHERE id = ? AND state = ? AND token = ?',
+                                     (lease.task_id, LEASED, lease.token)).fetchone()
+            if row is not None:
+                if retry and row[0] < self.max_attempts:
+                    connection.execute('UPDATE tasks SET state = ?, token = NULL, error = ?, available_at = ? WHERE id = ?',
+                                       (QUEUED, error, time.time() + self.retry_delay * row[0], lease.task_id))
+                else:
+                    connection.execute('UPDATE tasks SET state = ?, token = NULL, error = ? WHERE id = ?', (FAILED, error, lease.task_id))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return row is not None
+
+    def get_result(self, task_id):
+        row = self._get_connection().execute('SELECT result FROM results WHERE id = ?', (str(task_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_results(self):
+        cursor = self._get_connection().execute('SELECT tasks.id, tasks.state, results.result, tasks.error FROM tasks '
+                                                'LEFT JOIN results ON results.id = tasks.id WHERE tasks.state IN (?, ?) ORDER BY tasks.rowid', (DONE, FAILED))
+        for (task_id, state, result, error) in cursor:
+            yield (task_id, state, json.loads(result) if state == DONE else error)
+
+    def get_counts(self):
+        counts = dict((state, 0) for state in (QUEUED, LEASED, DONE, FAILED))
+        for (state, count) in self._get_connection().execute('SELECT state, COUNT(*) FROM tasks GROUP BY state'):
+            counts[state] = count
+        return counts
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+# scheme -> factory(location, **options), e.g. register_backend('redis', RedisTaskQueue)
+_backends = {
+    'memory': lambda location, **options: MemoryTaskQueue(**options),
+    'sqlite': SqliteTaskQueue,
+}
+
+def register_backend(scheme, factory):
+    _backends[scheme] = factory
+
+# 'memory:', 'sqlite:/path/to/queue.db' or a plain file name for sqlite
+def open_task_queue(url, **options):
+    scheme, sep, location = url.partition(':')
+    if not sep or scheme not in _backends:
+        scheme, location = 'sqlite', url
+    return _backends[scheme](location, **options)
+
+# Consumes tasks with one logged in account until stopped, every node runs
+# one of these per account against the same queue.
+class QueueWorker(threading.Thread):
+
+    def __init__(self, task_queue, api, worker_id, idle_sleep = 1.0):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.log = logging.getLogger(__name__)
+
+        self.task_queue = task_queue
+        self.api = api
+        self.worker_id = worker_id
+        self.idle_sleep = idle_sleep
+        self.stopped = threading.Event()
+
+        self.completed = 0
+        self.failed = 0
+
+    def stop(self):
+        self.stopped.set()
+
+    # runs one task, returns False if the queue was empty
+    def run_once(self):
+        from pgoapi.supervisor import execute_task
+
+        lease = self.task_queue.lease(self.worker_id)
+        if lease is None:
+            return False
+
+        start = time.time()
+        try:
+            response = execute_task(self.api, lease.task)
+        except Exception as e:
+            self.log.warning('Task %s failed on attempt %s: %s', lease.task_id, lease.attempts, str(e))
+            self.task_queue.fail(lease, type(e).__name__)
+            self.failed += 1
+            return True
+
+        if not response:
+            self.task_queue.fail(lease, 'NoResponse')
+            self.failed += 1
+            return True
+
+        result = {'id': lease.task_id, 'worker': self.worker_id, 'seconds': time.time() - start, 'response': response}
+        if not self.task_queue.complete(lease, result):
+            self.log.debug('Task %s already had a result', lease.task_id)
+        self.completed += 1
+        return True
+
+    def run(self):
+        while not self.stopped.is_set():
+            if not self.run_once():
+                self.stopped.wait(self.idle_sleep)
@@ -24,56 +24,73 @@ Author: tjado <https://github.com/tejado>
 """
 
 import re
+import math
+import base64
 import time
-import struct
 import logging
 
 from json import JSONEncoder
 
 # other stuff
-from google.protobuf.internal import encoder
-from geopy.geocoders import GoogleV3
-from s2sphere import LatLng, Angle, Cap, RegionCoverer, math
+from pgoapi import geocoding
+# f2i, f2h and h2f live in pgoapi.wire along with the array versions
+from pgoapi.wire import f2i, f2h, h2f
 
 log = logging.getLogger(__name__)
 
-def f2i(float):
-  return struct.unpack('<Q', struct.pack('<d', float))[0]
-
-def f2h(float):
-  return hex(struct.unpack('<Q', struct.pack('<d', float))[0])
-
-def h2f(hex):
-  return struct.unpack('<d', struct.pack('<Q', int(hex,16)))[0]
+# requests (and urllib3) is only imported once the first session is created
+_requests = None
+def import_requests():
+    global _requests
+    if _requests is None:
+        import requests
+        try:
+            requests.packages.urllib3.disable_warnings()
+        except:
+            pass
+        _requests = requests
+    return _requests
 
 def to_camel_case(value):
   return ''.join(word.capitalize() if word else '_' for word in value.split('_'))
 
 # JSON Encoder to handle bytes
+# bytes are written base64 encoded, see pgoapi.json_stream for large documents
 class JSONByteEncoder(JSONEncoder):
     def default(self, o):
-        return o.decode('utf-8')
+        if isinstance(o, bytes):
+            return base64.b64encode(o).decode('ascii')
+        return JSONEncoder.default(self, o)
 
-def get_pos_by_name(location_name):
+def get_pos_by_name(location_name, geocoder = None, cache = None, use_cache = True):
     prog = re.compile("^(\-?\d+\.\d+)?,\s*(\-?\d+\.\d+?)$")
     res = prog.match(location_name)
-    latitude, longitude, altitude = None, None, None
     if res:
-        latitude, longitude, altitude = float(res.group(1)), float(res.group(2)), 0
-    else:
-        geolocator = GoogleV3()
-        loc = geolocator.geocode(location_name, timeout=10)
-        if loc:
-            log.info("Location for '%s' found: %s", location_name, loc.address)
-            log.info('Coordinates (lat/long/alt) for location: %s %s %s', loc.latitude, loc.longitude, loc.altitude)
-            latitude, longitude, altitude = loc.latitude, loc.longitude, loc.altitude
-        else:
-            return None
+        return (float(res.group(1)), float(res.group(2)), 0)
+
+    if use_cache:
+        cache = cache or geocoding.get_default_cache()
+        position = cache.get(location_name)
+        if position:
+            log.info("Location for '%s' found in geocode cache", location_name)
+            log.info('Coordinates (lat/long/alt) for location: %s %s %s', *position)
+            return position
 
-    return (latitude, longitude, altitude)
+    geocoder = geocoder or geocoding.get_default_geocoder()
+    position = geocoder.geocode(location_name)
+    if not position:
+        return None
+
+    log.info('Coordinates (lat/long/alt) for location: %s %s %s', *position)
+    if use_cache:
+        cache.set(location_name, position)
+
+    return position
 
 EARTH_RADIUS = 6371 * 1000
 def get_cell_ids(lat, long, radius=1000):
+    from s2sphere import LatLng, Angle, Cap, RegionCoverer
+
     # Max values allowed by server according to this comment:
     # https://github.com/AeonLucid/POGOProtos/issues/83#issuecomment-235612285
     if radius > 1500:
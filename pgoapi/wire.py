@@ -0,0 +1,112 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import struct
+
+# Conversions between the wire representations the API uses and python
+# values, for single values and whole arrays. Coordinates are sent as the
+# IEEE 754 bits of a double in a uint64 field (f2i), cell ids and timestamps
+# as varints. The array functions convert with a single struct call, or
+# without any python loop when given a NumPy array.
+
+_double = struct.Struct('<d')
+_uint64 = struct.Struct('<Q')
+
+UINT64_MASK = (1 << 64) - 1
+
+def _is_numpy(values):
+    return type(values).__module__ == 'numpy'
+
+def f2i(value):
+    return _uint64.unpack(_double.pack(value))[0]
+
+def i2f(value):
+    return _double.unpack(_uint64.pack(value))[0]
+
+def f2h(value):
+    return hex(f2i(value))
+
+def h2f(value):
+    return i2f(int(value, 16))
+
+def doubles_to_uint64(values):
+    if _is_numpy(values):
+        return values.astype('<f8').view('<u8')
+    count = len(values)
+    return list(struct.unpack('<{}Q'.format(count), struct.pack('<{}d'.format(count), *values)))
+
+def uint64_to_doubles(values):
+    if _is_numpy(values):
+        return values.astype('<u8').view('<f8')
+    count = len(values)
+    return list(struct.unpack('<{}d'.format(count), struct.pack('<{}Q'.format(count), *values)))
+
+def _append_varint(buf, value):
+    if value < 0:
+        # negative int32/int64 are sent as 10 byte two's complement
+        value &= UINT64_MASK
+    while value > 0x7f:
+        buf.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+def encode_varint(value):
+    buf = bytearray()
+    _append_varint(buf, value)
+    return bytes(buf)
+
+# encodes the values back to back, like a packed repeated field
+def encode_varints(values):
+    buf = bytearray()
+    for value in values:
+        _append_varint(buf, int(value))
+    return bytes(buf)
+
+# returns (value, position after the varint)
+def decode_varint(data, pos = 0):
+    data = bytearray(data) if not isinstance(data, bytearray) else data
+    result, shift = 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return (result, pos)
+        shift += 7
+        if shift >= 70:
+            raise ValueError('Varint too long')
+
+def decode_varints(data, signed = False):
+    data = bytearray(data)
+    values, pos, end = [], 0, len(data)
+    while pos < end:
+        value, pos = decode_varint(data, pos)
+        if signed and value > 0x7fffffffffffffff:
+            value -= 1 << 64
+        values.append(value)
+    return values
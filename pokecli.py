@@ -29,11 +29,9 @@ import os
 import sys
 import json
 import time
-import pprint
 import logging
 import getpass
 import traceback
-import requests
 import time
 import argparse
 
@@ -43,10 +41,15 @@ sys.path.append(os.path.dirname(os.path.realpath(__file__)))
 # import Pokemon Go API lib
 from pgoapi import pgoapi
 from pgoapi import utilities as util
+from pgoapi import json_stream
+from pgoapi import pokedex
 
 
 log = logging.getLogger(__name__)
 
+# max. number of release_pokemon calls in one RPC
+RELEASE_CHAIN_SIZE = 20
+
 def init_config():
     parser = argparse.ArgumentParser()
     config_file = "config.json"
@@ -66,6 +69,8 @@ def init_config():
     parser.add_argument("-l", "--location", help="Location", required=required("location"))
     parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
     parser.add_argument("-t", "--test", help="Only parse the specified location", action='store_true')
+    parser.add_argument("-c", "--capture", help="Append all RPC requests and responses to this capture file")
+    parser.add_argument("-e", "--export", help="Export map objects and inventory as columnar files into this directory")
     parser.set_defaults(DEBUG=False, TEST=False)
     config = parser.parse_args()
 
@@ -109,6 +114,10 @@ def main():
     # instantiate pgoapi
     api = pgoapi.PGoApi()
 
+    if config.capture:
+        from pgoapi.capture import RpcCapture
+        api.add_hook(RpcCapture(config.capture))
+
     # parse position
     position = util.get_pos_by_name(config.location)
     if not position:
@@ -126,7 +135,8 @@ def main():
     # get player profile call (single command example)
     # ----------------------
     response_dict = api.get_player()
-    print('Response dictionary (get_player): \n\r{}'.format(pprint.PrettyPrinter(indent=4).pformat(response_dict)))
+    print('Response dictionary (get_player):')
+    json_stream.dump(response_dict, sys.stdout, indent=4)
 
     # sleep due to server-side throttling
     time.sleep(0.2)
@@ -137,18 +147,11 @@ def main():
     req.get_player()
     req.get_inventory()
     response_dict = req.call()
-    print('Response dictionary (get_player + get_inventory): \n\r{}'.format(pprint.PrettyPrinter(indent=4).pformat(response_dict)))
+    print('Response dictionary (get_player + get_inventory):')
+    json_stream.dump(response_dict, sys.stdout, indent=4)
 
 def poke_id2name(id):
-    url = "https://raw.githubusercontent.com/giginet/pokedex/master/dex/dex{0}.json".format(id)
-    r = requests.get(url)
-    """
-    return {
-        'image_url': "http://www.serebii.net/pokemongo/pokemon/{0:03d}.png".format(id),
-        'name': r.json()['name']
-    }
-    """
-    return r.json()["name"]
+    return pokedex.get_pokemon_name(id)
 
 def nomore(pokemon):
     list = [
@@ -192,6 +195,8 @@ def my_main():
     config = init_config()
     if not config:
         return
+
+    pokedex.load_names()
     position = util.get_pos_by_name(config.location)
     if not position:
         log.error('Position could not be found by name')
@@ -202,6 +207,10 @@ def my_main():
 
     # instantiate pgoapi
     api = pgoapi.PGoApi()
+
+    if config.capture:
+        from pgoapi.capture import RpcCapture
+        api.add_hook(RpcCapture(config.capture))
     api.set_position(*position)
     if not api.login(config.auth_service, config.username, config.password):
         return
@@ -210,7 +219,11 @@ def my_main():
 
     # execute the RPC call
     with open("inventory.json", "w") as f:
-        json.dump(response_dict,f, indent=4, sort_keys=True)
+        json_stream.dump(response_dict, f, indent=4, sort_keys=True)
+    if config.export:
+        from pgoapi.export import ScanExporter
+        with ScanExporter(config.export) as exporter:
+            exporter.add_response(response_dict)
     inventory_items =  response_dict["responses"]["GET_INVENTORY"]["inventory_delta"]["inventory_items"]
     my_pokemons = {}
     for item in inventory_items:
@@ -228,9 +241,12 @@ def my_main():
             traceback.print_exc()
     #log.info(my_pokemons)
     with open("pokemons.json", "w") as f:
-        json.dump(my_pokemons,f, indent=4, sort_keys=True)
+        json_stream.dump(my_pokemons, f, indent=4, sort_keys=True)
 
     # 保持しているデータを処理
+    # release calls are chained, RELEASE_CHAIN_SIZE per RPC with a pause
+    # between the RPCs, every result is kept in 'responses_list'
+    release_ids = []
     for id in my_pokemons:
         owns = my_pokemons[id]
         for pokemon in owns:
@@ -238,8 +254,17 @@ def my_main():
                 log.debug(poke_id2name(id))
                 continue
             if weaker(pokemon) or nomore(pokemon):
-                time.sleep(3)
-                dict = api.release_pokemon(pokemon_id = pokemon["id"])
+                release_ids.append(pokemon["id"])
+
+    for i in range(0, len(release_ids), RELEASE_CHAIN_SIZE):
+        time.sleep(3)
+        req = api.create_request()
+        for pokemon_id in release_ids[i:i + RELEASE_CHAIN_SIZE]:
+            req.release_pokemon(pokemon_id = pokemon_id)
+        response_dict = req.call()
+        if response_dict:
+            for entry in response_dict['responses_list']:
+                log.info('%s: %s', entry['request_type'], entry['response'])
 
 
 if __name__ == '__main__':
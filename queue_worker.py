@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+# add directory of this file to PATH, so that the package will be found
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+
+from pgoapi import json_stream
+from pgoapi.supervisor import login_account
+from pgoapi.task_queue import open_task_queue, QueueWorker
+
+from supervise import load_json_list
+
+log = logging.getLogger(__name__)
+
+def init_config():
+    parser = argparse.ArgumentParser(description='Add tasks to a task queue or consume them with a set of accounts. '
+                                                 'Run it on every node with the same queue to add scan capacity.')
+    parser.add_argument("-q", "--queue", help="Task queue, 'sqlite:/path/queue.db' or a broker registered with pgoapi.task_queue", required=True)
+    parser.add_argument("-p", "--put", help="JSON or NDJSON file with tasks to add")
+    parser.add_argument("-a", "--accounts", help="JSON file with the accounts consuming tasks on this node")
+    parser.add_argument("-r", "--results", help="Write finished tasks as NDJSON into this file")
+    parser.add_argument("--lease", help="Lease time of a task in seconds", type=float, default=60)
+    parser.add_argument("--max-attempts", help="Attempts before a task is failed", type=int, default=3)
+    parser.add_argument("--exit-when-empty", help="Stop the workers once no task is queued or leased", action='store_true')
+    parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
+    return parser.parse_args()
+
+def run_workers(task_queue, accounts, exit_when_empty):
+    workers = []
+    for account in accounts:
+        api = login_account(account)
+        if api is None:
+            log.error('Login of %s failed', account['username'])
+            continue
+        worker = QueueWorker(task_queue, api, '{}/{}'.format(os.uname()[1], account['username']))
+        worker.start()
+        workers.append(worker)
+
+    if not workers:
+        log.error('No account could log in')
+        return
+
+    try:
+        while any(worker.is_alive() for worker in workers):
+            time.sleep(5)
+            counts = task_queue.get_counts()
+            log.info('Queue: %s', ', '.join('{} {}'.format(state, count) for (state, count) in sorted(counts.items())))
+            if exit_when_empty and not counts['queued'] and not counts['leased']:
+                break
+    except KeyboardInterrupt:
+        pass
+
+    for worker in workers:
+        worker.stop()
+    for worker in workers:
+        worker.join()
+    log.info('Completed %s tasks, %s failed attempts', sum(w.completed for w in workers), sum(w.failed for w in workers))
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(threadName)16s] [%(module)10s] [%(levelname)5s] %(message)s')
+    logging.getLogger("requests").setLevel(logging.WARNING)
+    logging.getLogger("pgoapi").setLevel(logging.WARNING)
+    logging.getLogger("pgoapi.task_queue").setLevel(logging.INFO)
+
+    config = init_config()
+    if config.debug:
+        logging.getLogger("pgoapi").setLevel(logging.DEBUG)
+
+    task_queue = open_task_queue(config.queue, lease_seconds=config.lease, max_attempts=config.max_attempts)
+
+    if config.put:
+        task_ids = task_queue.put_many(load_json_list(config.put))
+        log.info('Added %s tasks', len(task_ids))
+
+    if config.accounts:
+        run_workers(task_queue, load_json_list(config.accounts), config.exit_when_empty)
+
+    if config.results:
+        with open(config.results, 'w') as f:
+            json_stream.dump_lines(({'id': task_id, 'state': state, 'result' if state == 'done' else 'error': value}
+                                    for (task_id, state, value) in task_queue.iter_results()), f)
+
+    task_queue.close()
+
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,6 @@ import time
 import struct
 import pprint
 import logging
-import requests
 import argparse
 import getpass
 import traceback
@@ -21,26 +20,15 @@ sys.path.append(os.path.dirname(os.path.realpath(__file__)))
 # import Pokemon Go API lib
 from pgoapi import pgoapi
 from pgoapi import utilities as util
+from pgoapi import pokedex
 
 # other stuff
-from google.protobuf.internal import encoder
-from geopy.geocoders import GoogleV3
 from s2sphere import Cell, CellId, LatLng
 import ssl
 ssl._create_default_https_context = ssl._create_unverified_context
 
 log = logging.getLogger(__name__)
 
-def get_pos_by_name(location_name):
-    geolocator = GoogleV3()
-    loc = geolocator.geocode(location_name, timeout=10)
-    if not loc:
-        return None
-    log.info('Your given location: %s', loc.address.encode('utf-8'))
-    log.info('lat/long/alt: %s %s %s', loc.latitude, loc.longitude, loc.altitude)
-
-    return (loc.latitude, loc.longitude, loc.altitude)
-
 def get_cell_ids(lat, long, radius = 10):
     origin = CellId.from_lat_lng(LatLng.from_degrees(lat, long)).parent(15)
     walk = [origin.id()]
@@ -57,11 +45,6 @@ def get_cell_ids(lat, long, radius = 10):
     # Return everything
     return sorted(walk)
 
-def encode(cellid):
-    output = []
-    encoder._VarintEncoder()(output.append, cellid)
-    return ''.join(output)
-
 def init_config():
     parser = argparse.ArgumentParser()
     config_file = "config.json"
@@ -100,15 +83,7 @@ def init_config():
     return config
     
 def poke_id2name(id):
-    url = "https://raw.githubusercontent.com/giginet/pokedex/master/dex/dex{0}.json".format(id)
-    r = requests.get(url)
-    """
-    return {
-        'image_url': "http://www.serebii.net/pokemongo/pokemon/{0:03d}.png".format(id),
-        'name': r.json()['name']
-    }
-    """
-    return r.json()["name"]
+    return pokedex.get_pokemon_name(id)
 
 def nomore(pokemon):
     # 84: ドードー, 41: ズバット はもういらない
@@ -142,12 +117,14 @@ def main():
     if not config:
         return
 
+    pokedex.load_names()
+
     if config.debug:
         logging.getLogger("requests").setLevel(logging.DEBUG)
         logging.getLogger("pgoapi").setLevel(logging.DEBUG)
         logging.getLogger("rpc_api").setLevel(logging.DEBUG)
 
-    position = get_pos_by_name(config.location)
+    position = util.get_pos_by_name(config.location)
     if not position:
         log.error('Position could not be found by name')
         return
@@ -17,5 +17,7 @@ setup(name='pgoapi',
       url = 'https://github.com/tejado/pgoapi',
       download_url = "https://github.com/tejado/pgoapi/releases",
       packages = find_packages(),
+      package_data = {'pgoapi': ['protos/POGOProtos.desc']},
       install_requires = reqs,
+      extras_require = {'export': ['pyarrow']},
      )
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+
+# add directory of this file to PATH, so that the package will be found
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+
+from pgoapi import json_stream
+from pgoapi.supervisor import Supervisor
+
+log = logging.getLogger(__name__)
+
+# reads a JSON list or one JSON document per line
+def load_json_list(filename):
+    with open(filename) as f:
+        data = f.read()
+    if data.lstrip().startswith('['):
+        return json.loads(data)
+    return [json.loads(line) for line in data.splitlines() if line.strip()]
+
+def init_config():
+    parser = argparse.ArgumentParser(description='Run tasks for many accounts in sharded worker processes')
+    parser.add_argument("-a", "--accounts", help="JSON file with a list of accounts ({'username', 'password', 'auth_service', 'location'})", required=True)
+    parser.add_argument("-t", "--tasks", help="JSON or NDJSON file with the tasks", required=True)
+    parser.add_argument("-o", "--output", help="Write the results as NDJSON into this file (default: stdout)")
+    parser.add_argument("-w", "--workers", help="Number of worker processes (default: number of CPUs)", type=int)
+    parser.add_argument("--max-restarts", help="Restarts of a crashed worker before giving up on its accounts", type=int, default=3)
+    parser.add_argument("--task-retries", help="How often a task of a crashed worker is run again", type=int, default=1)
+    parser.add_argument("--stats-interval", help="Seconds between stats log lines", type=float, default=30)
+    parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
+    return parser.parse_args()
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(processName)16s] [%(module)10s] [%(levelname)5s] %(message)s')
+    logging.getLogger("requests").setLevel(logging.WARNING)
+    logging.getLogger("pgoapi").setLevel(logging.WARNING)
+    logging.getLogger("pgoapi.supervisor").setLevel(logging.INFO)
+
+    config = init_config()
+    if config.debug:
+        logging.getLogger("pgoapi").setLevel(logging.DEBUG)
+
+    accounts = load_json_list(config.accounts)
+    tasks = load_json_list(config.tasks)
+
+    output = open(config.output, 'w') if config.output else sys.stdout
+    writer = json_stream.JSONStreamWriter(output)
+    try:
+        supervisor = Supervisor(accounts, workers=config.workers, max_restarts=config.max_restarts,
+                                task_retries=config.task_retries, stats_interval=config.stats_interval)
+        stats = supervisor.run(tasks, writer.write_line)
+    finally:
+        writer.flush()
+        if output is not sys.stdout:
+            output.close()
+
+    log.info('Completed %s/%s tasks in %.1fs (%.1f/s), %s errors, %s retried, %s restarts',
+             stats['completed'], stats['tasks'], stats['elapsed'], stats['tasks_per_sec'], stats['errors'], stats['retried'], stats['restarts'])
+    for (error, count) in sorted(stats['errors_by_type'].items()):
+        log.info('  %s: %s', error, count)
+
+if __name__ == '__main__':
+    main()
@@ -28,12 +28,10 @@ Author: tjado <https://github.com/tejado>
 import os
 import sys
 import json
-import pprint
 import logging
 import argparse
 import getpass
 import traceback
-import requests
 import time
 
 # add directory of this file to PATH, so that the package will be found
@@ -42,6 +40,8 @@ sys.path.append(os.path.dirname(os.path.realpath(__file__)))
 # import Pokemon Go API lib
 from pgoapi import pgoapi
 from pgoapi import utilities as util
+from pgoapi import json_stream
+from pgoapi import pokedex
 
 
 log = logging.getLogger(__name__)
@@ -141,7 +141,7 @@ def main():
     response_dict = api.get_map_objects(latitude = position[0], longitude = position[1], since_timestamp_ms = timestamps, cell_id = cell_ids)
     #response_dict = api.call()
     with open("forts.json", "w") as f:
-        json.dump(response_dict,f, indent=4, sort_keys=True)
+        json_stream.dump(response_dict, f, indent=4, sort_keys=True)
     fort = response_dict["responses"]["GET_MAP_OBJECTS"]["map_cells"][0]["forts"][0]
     #cells_0 = response_dict["responses"]["GET_MAP_OBJECTS"]["map_cells"][0]
 
@@ -162,11 +162,11 @@ def main():
         #, player_latitude=util.f2i(position[0]), player_longitude=util.f2i(position[1]))
         #response_dict = api.call()
         with open("fort_details.json", "w") as f:
-            json.dump(response_dict,f, indent=4, sort_keys=True)
+            json_stream.dump(response_dict, f, indent=4, sort_keys=True)
         if not response_dict["responses"].has_key("FORT_DETAILS"):
             print "failed"
             with open("fail_fort.json", "w") as f:
-                json.dump(fort, f, indent=4, sort_keys=True)
+                json_stream.dump(fort, f, indent=4, sort_keys=True)
             return
 
         detailed = response_dict["responses"]["FORT_DETAILS"]
@@ -174,7 +174,7 @@ def main():
         time.sleep(1)
         #response_dict = api.call()
         with open("fort_search.json", "w") as f:
-            json.dump(response_dict,f, indent=4, sort_keys=True)
+            json_stream.dump(response_dict, f, indent=4, sort_keys=True)
 
     # release/transfer a pokemon and get candy for it
     # ----------------------
@@ -201,15 +201,7 @@ def main():
     # api.get_player().get_inventory().get_map_objects().download_settings(hash="05daf51635c82611d1aac95c0b051d3ec088a930").call()
 
 def poke_id2name(id):
-    url = "https://raw.githubusercontent.com/giginet/pokedex/master/dex/dex{0}.json".format(id)
-    r = requests.get(url)
-    """
-    return {
-        'image_url': "http://www.serebii.net/pokemongo/pokemon/{0:03d}.png".format(id),
-        'name': r.json()['name']
-    }
-    """
-    return r.json()["name"]
+    return pokedex.get_pokemon_name(id)
 
 def nomore(pokemon):
     # 84: ドードー, 41: ズバット はもういらない
@@ -247,6 +239,8 @@ def my_main():
     config = init_config()
     if not config:
         return
+
+    pokedex.load_names()
     position = util.get_pos_by_name(config.location)
     if not position:
         log.error('Position could not be found by name')
@@ -266,7 +260,7 @@ def my_main():
     # execute the RPC call
     #response_dict = api.call()
     with open("response.json", "w") as f:
-        json.dump(response_dict,f, indent=4, sort_keys=True)
+        json_stream.dump(response_dict, f, indent=4, sort_keys=True)
     inventory_items =  response_dict["responses"]["GET_INVENTORY"]["inventory_delta"]["inventory_items"]
     my_pokemons = {}
     for item in inventory_items:
@@ -284,7 +278,7 @@ def my_main():
             traceback.print_exc()
     #log.info(my_pokemons)
     with open("pokemons.json", "w") as f:
-        json.dump(my_pokemons,f) 
+        json_stream.dump(my_pokemons, f)
 
     # 保持しているデータを処理
     for id in my_pokemons: